@@ -1,24 +1,60 @@
-"""Utilities for visualising AST structures without shadowing stdlib ``ast``."""
+"""Utilities for visualising AST structures without shadowing stdlib ``ast``.
+
+Because this package is named ``ast``, stdlib modules such as :mod:`inspect`
+import it in place of the standard library module.  The stdlib ``ast``
+source is therefore loaded explicitly, but only when one of its names is
+first accessed: most programs import :mod:`inspect` (via
+:mod:`dataclasses`) without ever touching ``ast``.  The visualisation helpers
+are loaded on first access as well.
+"""
 from __future__ import annotations
 
+import importlib
 import importlib.util
 import os
 import sysconfig
+from typing import Any
+
+_stdlib_ast: Any = None
+
+_EXPORTS = {
+    "render_dot": ".render",
+    "render_svg": ".render",
+    "structural_hash": ".render",
+    "visualize_ast": ".visualize_ast",
+}
+
 
-# Load the standard library ``ast`` module explicitly so other modules relying
-# on it continue to work even though this package is named ``ast``.
-_stdlib_path = os.path.join(sysconfig.get_path("stdlib"), "ast.py")
-_spec = importlib.util.spec_from_file_location("_stdlib_ast", _stdlib_path)
-_stdlib_ast = importlib.util.module_from_spec(_spec)
-_spec.loader.exec_module(_stdlib_ast)  # type: ignore[attr-defined]
+def _load_stdlib_ast() -> Any:
+    """Execute the standard library ``ast`` module and copy its public names here."""
+    global _stdlib_ast
+    if _stdlib_ast is None:
+        path = os.path.join(sysconfig.get_path("stdlib"), "ast.py")
+        spec = importlib.util.spec_from_file_location("_stdlib_ast", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)  # type: ignore[union-attr]
+        namespace = globals()
+        for name in dir(module):
+            if not name.startswith("_"):
+                namespace.setdefault(name, getattr(module, name))
+        _stdlib_ast = module
+    return _stdlib_ast
 
-# Re-export all public names from the stdlib ``ast`` module
-for _name in dir(_stdlib_ast):
-    if not _name.startswith("_"):
-        globals()[_name] = getattr(_stdlib_ast, _name)
 
-del _name  # clean up temporary variable
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    if name == "__all__":
+        return [*[n for n in dir(_load_stdlib_ast()) if not n.startswith("_")], *_EXPORTS]
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        return getattr(_load_stdlib_ast(), name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
-from .visualize_ast import visualize_ast
 
-__all__ = [*[_n for _n in dir(_stdlib_ast) if not _n.startswith("_")], "visualize_ast"]
+def __dir__() -> list[str]:
+    return sorted({*globals(), *dir(_load_stdlib_ast()), *_EXPORTS})
@@ -0,0 +1,191 @@
+"""In-process DOT and SVG rendering of arithmetic ASTs.
+
+Unlike :mod:`ast.visualize_ast` this module never runs Graphviz: it walks the
+tree iteratively, lays it out in linear time and formats DOT or SVG text
+directly, so trees with hundreds of thousands of nodes render without
+recursion limits or a subprocess per call.  Both the parser's dataclass nodes
+and the legacy ``(op, left, right)`` tuples are understood.
+
+Leaves are placed left to right, each as wide as its label, and every
+operator is centred over its children; this never overlaps and needs a single
+pass in each direction.  Rendered text is cached by :func:`structural_hash`, so
+re-rendering an identical tree returns the cached string.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from html import escape
+from typing import NamedTuple, Union
+
+ASTNode = Union[object, tuple, int, float]
+
+CACHE_SIZE = 128
+COLUMN_WIDTH = 40
+ROW_HEIGHT = 56
+MARGIN = 24
+
+_cache: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class Layout(NamedTuple):
+    """Node labels in pre-order with parent index and ``(x, y)`` grid positions.
+
+    ``x`` is measured in columns of :data:`COLUMN_WIDTH` pixels (wide leaf
+    labels take more than one) and ``y`` in rows of :data:`ROW_HEIGHT`.
+    """
+
+    labels: list[str]
+    parents: list[int]
+    x: list[float]
+    y: list[int]
+    width: float
+    height: int
+
+
+def _node_kinds() -> dict[type, object]:
+    from compiler.parser import Assignment, BinOp, Number, Var
+
+    return {
+        BinOp: lambda n: (str(n.op), (n.left, n.right)),
+        Number: lambda n: (str(n.value), ()),
+        Var: lambda n: (n.name, ()),
+        Assignment: lambda n: (f"{n.name} =", (n.value,)),
+    }
+
+
+def _label_and_children(node: ASTNode, kinds: dict[type, object]) -> tuple[str, tuple]:
+    for kind, describe in kinds.items():
+        if isinstance(node, kind):
+            return describe(node)  # type: ignore[operator]
+    if isinstance(node, tuple) and len(node) == 3:
+        return str(node[0]), (node[1], node[2])
+    return str(node), ()
+
+
+def layout(node: ASTNode) -> Layout:
+    """Assign grid coordinates to every node of ``node`` in O(n)."""
+    kinds = _node_kinds()
+    labels: list[str] = []
+    parents: list[int] = []
+    y: list[int] = []
+    stack: list[tuple[ASTNode, int, int]] = [(node, -1, 0)]
+    while stack:
+        current, parent, depth = stack.pop()
+        describe = kinds.get(type(current))
+        if describe is not None:
+            label, kids = describe(current)  # type: ignore[operator]
+        else:
+            label, kids = _label_and_children(current, kinds)
+        index = len(labels)
+        labels.append(label)
+        parents.append(parent)
+        y.append(depth)
+        for child in reversed(kids):
+            stack.append((child, index, depth + 1))
+
+    # Pre-order visits leaves left to right and lists parents before their
+    # children, so a reverse sweep sees every child before its parent.
+    size = len(labels)
+    first = [-1] * size
+    last = [-1] * size
+    for index in range(size - 1, 0, -1):
+        parent = parents[index]
+        first[parent] = index
+        if last[parent] < 0:
+            last[parent] = index
+    x = [0.0] * size
+    offset = 0.0
+    for index in range(size):
+        if first[index] < 0:
+            span = max(1.0, (8 * len(labels[index]) + 20) / COLUMN_WIDTH)
+            x[index] = offset + span / 2
+            offset += span
+    for index in range(size - 1, -1, -1):
+        if first[index] >= 0:
+            x[index] = (x[first[index]] + x[last[index]]) / 2
+    return Layout(labels, parents, x, y, offset, max(y) + 1)
+
+
+def _hash_layout(tree: Layout) -> str:
+    # The pre-order label sequence together with each node's parent index
+    # determines the tree uniquely.
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\0".join(tree.labels).encode())
+    h.update(array("q", tree.parents).tobytes())
+    return h.hexdigest()
+
+
+def structural_hash(node: ASTNode) -> str:
+    """Digest of the labels and shape of ``node``; equal for trees that render alike."""
+    return _hash_layout(layout(node))
+
+
+def _cached(node: ASTNode, kind: str, fmt) -> str:
+    tree = layout(node)
+    key = (_hash_layout(tree), kind)
+    with _cache_lock:
+        text = _cache.get(key)
+        if text is not None:
+            _cache.move_to_end(key)
+            return text
+    text = fmt(tree)
+    with _cache_lock:
+        _cache[key] = text
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return text
+
+
+def _format_dot(tree: Layout) -> str:
+    lines = ["digraph AST {", "  node [shape=circle];"]
+    for index, label in enumerate(tree.labels):
+        text = label.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'  n{index} [label="{text}"];')
+    for index, parent in enumerate(tree.parents):
+        if parent >= 0:
+            lines.append(f"  n{parent} -> n{index};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _format_svg(tree: Layout) -> str:
+    width = round(tree.width * COLUMN_WIDTH) + 2 * MARGIN
+    height = (tree.height - 1) * ROW_HEIGHT + 2 * MARGIN
+    px = [round(MARGIN + x * COLUMN_WIDTH) for x in tree.x]
+    py = [MARGIN + y * ROW_HEIGHT for y in tree.y]
+    parents = tree.parents
+    # All edges go into one path; per-node markup is kept to one element pair.
+    edges = " ".join(f"M{px[p]} {py[p]}L{px[i]} {py[i]}"
+                     for i, p in enumerate(parents) if p >= 0)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="13">',
+        f'<path stroke="#555" fill="none" d="{edges}"/>',
+        '<g text-anchor="middle" dominant-baseline="central" stroke="#333" fill="#fff">',
+    ]
+    for index, label in enumerate(tree.labels):
+        x, y = px[index], py[index]
+        rx = max(14, 4 * len(label) + 8)
+        parts.append(f'<ellipse cx="{x}" cy="{y}" rx="{rx}" ry="14"/>'
+                     f'<text x="{x}" y="{y}" fill="#000" stroke="none">{escape(label, False)}</text>')
+    parts.append("</g></svg>")
+    return "\n".join(parts)
+
+
+def render_dot(node: ASTNode) -> str:
+    """Return Graphviz DOT source for ``node`` without invoking Graphviz."""
+    return _cached(node, "dot", _format_dot)
+
+
+def render_svg(node: ASTNode) -> str:
+    """Return a standalone SVG drawing of ``node``."""
+    return _cached(node, "svg", _format_svg)
+
+
+def clear_render_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,135 @@
+"""Parallel batch mode for the Image-to-Code Compiler.
+
+Images are collected from directories, glob patterns and manifest files, then
+fanned out over a :class:`multiprocessing.Pool`.  Each worker imports OpenCV,
+Tesseract bindings and the compiler once in its initializer (forcing the
+lazy imports of :mod:`utils.lazy`), so the cost of starting those libraries
+is paid per worker rather than on its first image.  Results
+are streamed back in input order and written as one JSON object per line.
+"""
+from __future__ import annotations
+
+import glob
+import json
+import multiprocessing
+import os
+import sys
+from functools import partial
+from typing import IO, Iterable, Iterator, Optional
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+
+def _iter_directory(path: str) -> Iterator[str]:
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def _iter_manifest(manifest: str) -> Iterator[str]:
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, encoding="utf-8") as fh:
+        for line in fh:
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            yield entry if os.path.isabs(entry) else os.path.join(base, entry)
+
+
+def iter_image_paths(sources: Iterable[str], manifest: Optional[str] = None) -> Iterator[str]:
+    """Yield image paths from ``sources`` followed by those in ``manifest``.
+
+    Each source may be a directory (searched recursively for image files), a
+    glob pattern or a plain file path.  Manifest entries are one path per line;
+    blank lines and ``#`` comments are skipped and relative paths are resolved
+    against the manifest's directory.
+    """
+    for source in sources:
+        if os.path.isdir(source):
+            yield from _iter_directory(source)
+        elif glob.has_magic(source):
+            yield from sorted(glob.glob(source, recursive=True))
+        else:
+            yield source
+    if manifest is not None:
+        yield from _iter_manifest(manifest)
+
+
+def _init_worker() -> None:
+    """Import the heavy dependencies once per worker process."""
+    try:
+        import cv2
+
+        # One OpenCV thread per process avoids oversubscribing the CPUs.
+        cv2.setNumThreads(1)
+    except ImportError:  # pragma: no cover - environment might not have deps
+        pass
+    import main  # noqa: F401 - loads the compiler and the parser tables
+    from ocr import extract_text
+    from utils import image_cleaner
+
+    # ``import main`` leaves the heavy dependencies lazy; load them now.
+    for module in (image_cleaner.cv2, image_cleaner.np, extract_text.pytesseract,
+                   extract_text.Image, extract_text.tesserocr):
+        bool(module)
+
+
+def _process(path: str, adaptive: bool = False, cascade: bool = False) -> dict[str, object]:
+    from main import process_image_record
+
+    try:
+        return process_image_record(path, adaptive=adaptive, cascade=cascade)
+    except Exception as exc:  # keep the batch going on unexpected failures
+        return {"path": path, "shape": None, "expression": None, "ast": None, "value": None,
+                "error": f"{type(exc).__name__}: {exc}", "timings": {}}
+
+
+def process_batch(paths: Iterable[str], *, workers: Optional[int] = None,
+                  chunksize: int = 16, adaptive: bool = False,
+                  cascade: bool = False) -> Iterator[dict[str, object]]:
+    """Yield a pipeline record for each of ``paths`` in input order.
+
+    ``workers`` defaults to the CPU count; ``workers=1`` runs in-process
+    without a pool.  ``paths`` is consumed lazily so very large inputs are not
+    materialised up front.  ``adaptive`` and ``cascade`` are passed on to
+    :func:`main.process_image_record`.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker()
+        for path in paths:
+            yield _process(path, adaptive, cascade)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        yield from pool.imap(partial(_process, adaptive=adaptive, cascade=cascade), paths, chunksize=chunksize)
+
+
+def write_jsonl(records: Iterable[dict[str, object]], fh: IO[str]) -> tuple[int, int]:
+    """Write ``records`` to ``fh`` as JSON lines and return ``(total, failed)``."""
+    total = failed = 0
+    for record in records:
+        fh.write(json.dumps(record, default=str) + "\n")
+        total += 1
+        if record.get("error") is not None:
+            failed += 1
+    fh.flush()
+    return total, failed
+
+
+def run_batch(sources: Iterable[str], output: str = "-", *, manifest: Optional[str] = None,
+              workers: Optional[int] = None, chunksize: int = 16,
+              adaptive: bool = False, cascade: bool = False) -> tuple[int, int]:
+    """Process every image found in ``sources``/``manifest`` and write JSONL to ``output``.
+
+    ``output`` is a file path or ``"-"`` for stdout.  Returns ``(total, failed)``.
+    """
+    records = process_batch(iter_image_paths(sources, manifest), workers=workers,
+                            chunksize=chunksize, adaptive=adaptive, cascade=cascade)
+    if output == "-":
+        return write_jsonl(records, sys.stdout)
+    with open(output, "w", encoding="utf-8") as fh:
+        return write_jsonl(records, fh)
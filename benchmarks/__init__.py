@@ -0,0 +1,4 @@
+"""Performance benchmarks for the compiler and image pipeline.
+
+Run ``python -m benchmarks.run --help`` for usage.
+"""
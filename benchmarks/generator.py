@@ -0,0 +1,87 @@
+"""Synthetic expression images for benchmarks.
+
+:func:`random_expression` builds a random, always-evaluable expression with a
+given number of operators and :func:`render_expression` draws it with
+OpenCV's Hershey font, optionally adding Gaussian noise and blur so the
+cleaning and OCR stages see realistic input.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:  # pragma: no cover - environment might not have deps
+    cv2 = None  # type: ignore
+    np = None  # type: ignore
+
+OPERATORS = "+-*/"
+
+
+@dataclass
+class Case:
+    """One generated expression and its rendered image."""
+
+    text: str
+    operators: int
+    image: "np.ndarray"
+
+
+def random_expression(rng: random.Random, operators: int, *, paren_probability: float = 0.2,
+                      max_number: int = 99) -> str:
+    """Return an expression with exactly ``operators`` binary operators.
+
+    Divisors are always non-zero literals so every expression evaluates.
+    """
+    # Each entry is (text, is_compound); operands are combined until one is left.
+    operands = [(str(rng.randint(0, max_number)), False) for _ in range(operators + 1)]
+    while len(operands) > 1:
+        i = rng.randrange(len(operands) - 1)
+        (left, _), (right, right_compound) = operands[i], operands[i + 1]
+        op = rng.choice(OPERATORS)
+        if op == "/" and (right_compound or right == "0"):
+            op = "*"
+        text = f"{left}{op}{right}"
+        if rng.random() < paren_probability:
+            text = f"({text})"
+        operands[i:i + 2] = [(text, True)]
+    return operands[0][0]
+
+
+def render_expression(text: str, *, font_scale: float = 1.5, thickness: int = 2, margin: int = 20,
+                      noise: float = 0.0, blur: int = 0,
+                      rng: Optional[random.Random] = None) -> "np.ndarray":
+    """Draw ``text`` as black on white and return a BGR ``uint8`` image.
+
+    ``noise`` is the standard deviation of additive Gaussian noise in grey
+    levels and ``blur`` the (odd) Gaussian kernel size; ``0`` disables either.
+    """
+    if cv2 is None:  # pragma: no cover - dependency not installed
+        raise RuntimeError("OpenCV is required to render benchmark images")
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    (width, height), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+    image = np.full((height + baseline + 2 * margin, width + 2 * margin, 3), 255, np.uint8)
+    cv2.putText(image, text, (margin, margin + height), font, font_scale, (0, 0, 0),
+                thickness, cv2.LINE_AA)
+    if noise > 0:
+        seed = (rng or random.Random()).getrandbits(32)
+        jitter = np.random.default_rng(seed).normal(0.0, noise, image.shape)
+        image = np.clip(image + jitter, 0, 255).astype(np.uint8)
+    if blur > 0:
+        kernel = blur | 1
+        image = cv2.GaussianBlur(image, (kernel, kernel), 0)
+    return image
+
+
+def generate_cases(count: int, operators: int, *, seed: int = 0, noise: float = 8.0,
+                   blur: int = 3) -> list[Case]:
+    """Return ``count`` reproducible cases with ``operators`` operators each."""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        text = random_expression(rng, operators)
+        cases.append(Case(text, operators, render_expression(text, noise=noise, blur=blur, rng=rng)))
+    return cases
@@ -0,0 +1,289 @@
+"""Run the benchmark suite, write JSON results and compare them to a baseline.
+
+Usage::
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.15 \\
+        --threshold-for process_image=0.3
+
+Every benchmark reports seconds per item (median, min and mean over
+``--repeat`` runs).  A benchmark regresses when its median exceeds the
+baseline median by more than its threshold; the exit status is then 1.
+No baseline ships with the repository, since timings depend on the
+machine: record one locally with ``--save-baseline`` (e.g. on the main
+branch) and compare later runs on the same machine against it.
+
+Absolute budgets need no baseline: ``startup`` (the time ``import main``
+adds to a bare interpreter start) must stay within :data:`DEFAULT_BUDGETS`
+and ``--max-seconds NAME=SECONDS`` sets further limits::
+
+    python -m benchmarks.run --only startup --output -
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from ocr.extract_text import OCREngine
+
+from .generator import Case, generate_cases
+
+BENCHMARKS = ("lexer", "parser", "evaluator", "clean_image", "process_image", "startup")
+DEFAULT_THRESHOLD = 0.10
+# Absolute limits on the median in seconds, checked whenever the benchmark runs.
+DEFAULT_BUDGETS = {"startup": 0.4}
+
+
+@dataclass
+class Comparison:
+    """Median of one benchmark against its baseline; ``ratio`` is current / baseline."""
+
+    name: str
+    baseline: float
+    current: float
+    ratio: float
+    threshold: float
+    regressed: bool
+
+
+def measure(fn: Callable[[], object], items: int, *, repeat: int = 5, warmup: int = 1) -> dict[str, float]:
+    """Time ``fn`` (which processes ``items`` items) and return seconds per item."""
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) / items)
+    return {"median": statistics.median(runs), "min": min(runs),
+            "mean": statistics.fmean(runs), "repeat": repeat, "items": items}
+
+
+class _ReplayEngine(OCREngine):
+    """Stand-in OCR engine returning the generated texts in call order."""
+
+    def __init__(self, texts: list[str]) -> None:
+        self.texts = texts
+        self.calls = 0
+
+    def image_to_string(self, image: object, config: str = "") -> str:
+        text = self.texts[self.calls % len(self.texts)]
+        self.calls += 1
+        return text
+
+
+def _bench_lexer(cases: list[Case], repeat: int) -> dict[str, float]:
+    from compiler.lexer import lexer
+
+    def run() -> None:
+        for case in cases:
+            lexer.input(case.text)
+            for _ in iter(lexer.token, None):
+                pass
+    return measure(run, len(cases), repeat=repeat)
+
+
+def _bench_parser(cases: list[Case], repeat: int) -> dict[str, float]:
+    from compiler.parser import parse
+
+    def run() -> None:
+        for case in cases:
+            parse(case.text)
+    return measure(run, len(cases), repeat=repeat)
+
+
+def _bench_evaluator(cases: list[Case], repeat: int) -> dict[str, float]:
+    from compiler.evaluator import evaluate
+    from compiler.parser import parse
+
+    trees = [parse(case.text) for case in cases]
+
+    def run() -> None:
+        for tree in trees:
+            evaluate(tree)
+    return measure(run, len(cases), repeat=repeat)
+
+
+def _bench_clean_image(cases: list[Case], repeat: int) -> dict[str, float]:
+    from utils.image_cleaner import clean_image
+
+    def run() -> None:
+        for case in cases:
+            clean_image(case.image)
+    return measure(run, len(cases), repeat=repeat)
+
+
+def _bench_process_image(cases: list[Case], repeat: int, ocr: str = "replay") -> dict[str, float]:
+    import cv2
+
+    from main import process_image_record
+    from ocr.cache import OCRCache, get_default_cache, set_default_cache
+    from ocr.extract_text import get_default_engine, set_default_engine
+
+    previous_cache = get_default_cache()
+    previous_engine = get_default_engine()
+    # Nothing is cached, so every run goes through cleaning and OCR.
+    set_default_cache(OCRCache(None, memory_entries=0))
+    if ocr == "replay":
+        set_default_engine(_ReplayEngine([case.text for case in cases]))  # type: ignore[arg-type]
+    elif previous_engine is None:
+        raise RuntimeError("Tesseract is required for --ocr tesseract")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, case in enumerate(cases):
+                path = os.path.join(tmp, f"case{i}.png")
+                cv2.imwrite(path, case.image)
+                paths.append(path)
+
+            def run() -> None:
+                for path in paths:
+                    process_image_record(path)
+            return measure(run, len(cases), repeat=repeat)
+    finally:
+        set_default_cache(previous_cache)
+        set_default_engine(previous_engine)
+
+
+def _bench_startup(cases: list[Case], repeat: int) -> dict[str, float]:
+    """Wall time ``import main`` adds to a fresh interpreter's start-up."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def interpreter(code: str) -> Callable[[], None]:
+        return lambda: subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+    full = measure(interpreter("import main"), 1, repeat=repeat)
+    bare = measure(interpreter("pass"), 1, repeat=repeat)
+    return {**full, **{stat: max(0.0, full[stat] - bare[stat]) for stat in ("median", "min", "mean")}}
+
+
+def run_suite(names: Iterable[str] = BENCHMARKS, *, count: int = 20, operators: int = 8,
+              seed: int = 0, noise: float = 8.0, blur: int = 3, repeat: int = 5,
+              ocr: str = "replay") -> dict[str, Any]:
+    """Run the selected benchmarks and return a JSON-serialisable result document."""
+    params = {"count": count, "operators": operators, "seed": seed, "noise": noise,
+              "blur": blur, "repeat": repeat, "ocr": ocr}
+    cases = generate_cases(count, operators, seed=seed, noise=noise, blur=blur)
+    results: dict[str, Any] = {}
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark: {name}")
+        if name == "process_image":
+            results[name] = _bench_process_image(cases, repeat, ocr)
+        else:
+            results[name] = globals()[f"_bench_{name}"](cases, repeat)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": params,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], *,
+            threshold: float = DEFAULT_THRESHOLD,
+            thresholds: Optional[dict[str, float]] = None) -> list[Comparison]:
+    """Compare median timings of benchmarks present in both result documents.
+
+    ``thresholds`` overrides ``threshold`` per benchmark name; a threshold of
+    ``0.1`` allows the median to be up to 10% slower than the baseline.
+    """
+    thresholds = thresholds or {}
+    comparisons = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        limit = thresholds.get(name, threshold)
+        ratio = result["median"] / base["median"] if base["median"] else float("inf")
+        comparisons.append(Comparison(name, base["median"], result["median"], ratio, limit,
+                                      ratio > 1 + limit))
+    return comparisons
+
+
+def over_budget(current: dict[str, Any], budgets: dict[str, float]) -> list[tuple[str, float, float]]:
+    """Return ``(name, median, budget)`` for benchmarks whose median exceeds its absolute budget."""
+    return [(name, result["median"], budgets[name]) for name, result in current["results"].items()
+            if name in budgets and result["median"] > budgets[name]]
+
+
+def _parse_threshold(value: str) -> tuple[str, float]:
+    name, _, limit = value.partition("=")
+    if not limit:
+        raise argparse.ArgumentTypeError("expected NAME=NUMBER")
+    return name, float(limit)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    ap.add_argument("--count", type=int, default=20, help="generated expressions")
+    ap.add_argument("--operators", type=int, default=8, help="operators per expression")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--noise", type=float, default=8.0, help="Gaussian noise sigma")
+    ap.add_argument("--blur", type=int, default=3, help="Gaussian blur kernel size")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--ocr", choices=("replay", "tesseract"), default="replay",
+                    help="'replay' returns the generated text instead of running Tesseract")
+    ap.add_argument("--output", default="-", help="JSON results file ('-' for stdout)")
+    ap.add_argument("--baseline", help="compare against this results file")
+    ap.add_argument("--save-baseline", metavar="PATH", help="also write results to PATH")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="allowed slowdown as a fraction (default 0.10)")
+    ap.add_argument("--threshold-for", type=_parse_threshold, action="append", default=[],
+                    metavar="NAME=FRACTION", help="per-benchmark threshold")
+    ap.add_argument("--max-seconds", type=_parse_threshold, action="append", default=[],
+                    metavar="NAME=SECONDS",
+                    help="absolute budget for a benchmark's median (default startup=%.1f)"
+                         % DEFAULT_BUDGETS["startup"])
+    args = ap.parse_args(argv)
+
+    document = run_suite(args.only, count=args.count, operators=args.operators, seed=args.seed,
+                         noise=args.noise, blur=args.blur, repeat=args.repeat, ocr=args.ocr)
+    comparisons: list[Comparison] = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        if baseline.get("meta", {}).get("params") != document["meta"]["params"]:
+            print("warning: baseline was recorded with different parameters", file=sys.stderr)
+        comparisons = compare(document, baseline, threshold=args.threshold,
+                              thresholds=dict(args.threshold_for))
+        document["comparison"] = [asdict(c) for c in comparisons]
+    exceeded = over_budget(document, {**DEFAULT_BUDGETS, **dict(args.max_seconds)})
+    if exceeded:
+        document["over_budget"] = [{"name": name, "median": median, "budget": budget}
+                                   for name, median, budget in exceeded]
+
+    text = json.dumps(document, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+    for c in comparisons:
+        status = "REGRESSED" if c.regressed else "ok"
+        print(f"{c.name:14} {c.baseline * 1e6:10.1f}us -> {c.current * 1e6:10.1f}us "
+              f"({c.ratio:5.2f}x, limit {1 + c.threshold:.2f}x) {status}", file=sys.stderr)
+    for name, median, budget in exceeded:
+        print(f"{name:14} {median * 1e3:10.1f}ms over budget of {budget * 1e3:.1f}ms", file=sys.stderr)
+    return 1 if exceeded or any(c.regressed for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
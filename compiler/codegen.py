@@ -0,0 +1,194 @@
+"""Compile arithmetic ASTs into trees of specialised Python closures.
+
+:func:`evaluate` re-dispatches on the node type and operator string for every
+node it visits.  :func:`compile_ast` does that dispatch once and returns a
+callable that can be run many times against different symbol tables::
+
+    fn = compile_ast(parser.parse("x * 2 + y"))
+    fn(table_a)
+    fn(table_b)
+
+The compiled function has the same semantics and raises the same errors as
+:func:`compiler.evaluator.evaluate`.  Subtrees shared by several parents (as
+produced by :func:`compiler.optimizer.eliminate_common_subexpressions`) are
+evaluated once per call and their value reused.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional, Union
+
+from .parser import AST, BinOp, Number, Assignment, Var
+from error_handler import EvaluationError
+from symbol_table import SymbolTable
+
+NumberLike = Union[int, float]
+# Closures take the symbol table and a per-call memo list holding the values
+# of shared subtrees (``None`` when the tree has no sharing).
+Memo = Optional[list]
+Closure = Callable[[SymbolTable, Memo], NumberLike]
+CompiledExpression = Callable[..., NumberLike]
+
+_OP_NAMES = {"add": "+", "sub": "-", "mul": "*", "div": "/"}
+_UNSET = object()
+
+
+# One factory per operator and operand shape so the hot path is a single
+# inline arithmetic bytecode rather than a call through ``_apply_op``.
+def _add(left: Closure, right: Closure) -> Closure:
+    return lambda s, m: left(s, m) + right(s, m)
+
+
+def _sub(left: Closure, right: Closure) -> Closure:
+    return lambda s, m: left(s, m) - right(s, m)
+
+
+def _mul(left: Closure, right: Closure) -> Closure:
+    return lambda s, m: left(s, m) * right(s, m)
+
+
+def _div(left: Closure, right: Closure) -> Closure:
+    return lambda s, m: left(s, m) / right(s, m)
+
+
+def _add_const(left: Closure, const: NumberLike) -> Closure:
+    return lambda s, m: left(s, m) + const
+
+
+def _sub_const(left: Closure, const: NumberLike) -> Closure:
+    return lambda s, m: left(s, m) - const
+
+
+def _mul_const(left: Closure, const: NumberLike) -> Closure:
+    return lambda s, m: left(s, m) * const
+
+
+def _div_const(left: Closure, const: NumberLike) -> Closure:
+    return lambda s, m: left(s, m) / const
+
+
+_BINARY = {"+": _add, "-": _sub, "*": _mul, "/": _div}
+_BINARY_CONST = {"+": _add_const, "-": _sub_const, "*": _mul_const, "/": _div_const}
+
+
+def _const(value: NumberLike) -> Closure:
+    return lambda s, m: value
+
+
+def _var(name: str) -> Closure:
+    def load(s: SymbolTable, m: Memo) -> NumberLike:
+        try:
+            return s.get_value(name)  # type: ignore[return-value]
+        except KeyError:
+            raise EvaluationError(f"Undefined variable '{name}'")
+    return load
+
+
+def _assign(name: str, value: Closure) -> Closure:
+    def store(s: SymbolTable, m: Memo) -> NumberLike:
+        result = value(s, m)
+        s.assign(name, result)
+        return result
+    return store
+
+
+def _shared(fn: Closure, slot: int) -> Closure:
+    def load(s: SymbolTable, m: Memo) -> NumberLike:
+        value = m[slot]  # type: ignore[index]
+        if value is _UNSET:
+            value = m[slot] = fn(s, m)  # type: ignore[index]
+        return value
+    return load
+
+
+def _find_shared(node: object) -> set[int]:
+    """Return the ids of operator nodes reachable through more than one edge."""
+    seen: set[int] = set()
+    shared: set[int] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, BinOp):
+            children: tuple = (current.left, current.right)
+        elif isinstance(current, Assignment):
+            children = (current.value,)
+        else:
+            continue
+        if id(current) in seen:
+            shared.add(id(current))
+            continue
+        seen.add(id(current))
+        stack.extend(children)
+    return shared
+
+
+class _Compiler:
+    def __init__(self, shared: set[int]) -> None:
+        self.shared = shared
+        self.slots: dict[int, Closure] = {}
+
+    def var(self, node: Var) -> Closure:
+        return _var(node.name)
+
+    def assign(self, node: Assignment, value: Closure) -> Closure:
+        return _assign(node.name, value)
+
+    def binop(self, op: str, left: Union[AST, tuple, NumberLike],
+              right: Union[AST, tuple, NumberLike]) -> Closure:
+        op = _OP_NAMES.get(op, op)
+        if op not in _BINARY:
+            raise ValueError(f"Unknown operator: {op}")
+        left_fn = self.compile(left)
+        if isinstance(right, (Number, int, float)):
+            const = right.value if isinstance(right, Number) else right
+            return _BINARY_CONST[op](left_fn, const)
+        return _BINARY[op](left_fn, self.compile(right))
+
+    def compile(self, node: Union[AST, tuple, NumberLike]) -> Closure:
+        if id(node) in self.shared:
+            fn = self.slots.get(id(node))
+            if fn is None:
+                fn = self.slots[id(node)] = _shared(self.lower(node), len(self.slots))
+            return fn
+        return self.lower(node)
+
+    def lower(self, node: Union[AST, tuple, NumberLike]) -> Closure:
+        if isinstance(node, Number):
+            return _const(node.value)
+        if isinstance(node, Var):
+            return self.var(node)
+        if isinstance(node, Assignment):
+            return self.assign(node, self.compile(node.value))
+        if isinstance(node, BinOp):
+            return self.binop(node.op, node.left, node.right)
+        if isinstance(node, (int, float)):
+            return _const(node)
+        if isinstance(node, tuple) and len(node) == 3:
+            return self.binop(*node)
+        raise EvaluationError(f"Invalid AST node: {node!r}")
+
+
+def compile_ast(node: Union[AST, tuple, NumberLike]) -> CompiledExpression:
+    """Lower ``node`` into a callable ``fn(symbols=None)`` returning its value.
+
+    Invalid nodes raise :class:`EvaluationError` and unknown operators raise
+    :class:`ValueError` at compile time; everything else is reported when the
+    compiled function runs, exactly as :func:`evaluate` would.
+    """
+    compiler = _Compiler(_find_shared(node))
+    fn = compiler.compile(node)
+    size = len(compiler.slots)
+
+    if not size:
+        def run(symbols: SymbolTable | None = None) -> NumberLike:
+            return fn(symbols if symbols is not None else SymbolTable(), None)
+    else:
+        def run(symbols: SymbolTable | None = None) -> NumberLike:
+            return fn(symbols if symbols is not None else SymbolTable(), [_UNSET] * size)
+
+    return run
+
+
+# ``compile`` mirrors the ``evaluate`` naming; import it qualified so it does
+# not shadow the builtin.
+compile = compile_ast
@@ -1,9 +1,12 @@
-"""Recursive evaluator for arithmetic AST nodes."""
+"""Evaluator for arithmetic AST nodes."""
 
-from typing import Union
+import io
+import operator
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, Optional, Union
 
-from .parser import AST, BinOp, Number, Assignment, Var
-from error_handler import EvaluationError
+from .parser import AST, BinOp, Number, Assignment, Var, parse
+from error_handler import EvaluationError, LexerError, ParserError, format_error
 from symbol_table import SymbolTable
 
 NumberLike = Union[int, float]
@@ -22,35 +25,189 @@ def _apply_op(op: str, left: NumberLike, right: NumberLike) -> NumberLike:
     raise ValueError(f"Unknown operator: {op}")
 
 
-def evaluate(node: Union[AST, tuple, NumberLike], symbols: SymbolTable | None = None) -> NumberLike:
-    """Recursively evaluate ``node`` and return its numeric result."""
+_OPS = {
+    "add": operator.add, "+": operator.add,
+    "sub": operator.sub, "-": operator.sub,
+    "mul": operator.mul, "*": operator.mul,
+    "div": operator.truediv, "/": operator.truediv,
+}
+
+# Subtrees deeper than this are handed to the explicit-stack evaluator, so the
+# Python stack used by :func:`evaluate` is bounded by a constant.
+RECURSION_BUDGET = 64
+
+
+class _Store:
+    """Stack marker: bind the top operand to ``name`` (it stays on the stack)."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def _deferred_op(op: str):
+    # Unknown operators fail only once both operands are evaluated, matching
+    # the order in which the recursive evaluator reports errors.
+    return lambda left, right: _apply_op(op, left, right)
+
+
+_BUILTIN = type(operator.add)
+_FUNCTION = type(_deferred_op)
+
+
+def evaluate_iterative(node: Union[AST, tuple, NumberLike], symbols: SymbolTable | None = None) -> NumberLike:
+    """Evaluate ``node`` with an explicit stack instead of recursion.
+
+    Semantics and errors match :func:`evaluate`, the Python stack depth is
+    constant and the running time is linear in the number of nodes, so long
+    machine-generated chains such as ``1+1+...+1`` cannot overflow the stack.
+    """
     symbols = symbols or SymbolTable()
+    values: list = []
+    push = values.append
+    pop = values.pop
+    stack: list = [node]
+    todo = stack.append
+    take = stack.pop
+    ops = _OPS
+    while stack:
+        item = take()
+        kind = type(item)
+        if kind is BinOp:
+            todo(ops.get(item.op) or _deferred_op(item.op))
+            todo(item.right)
+            todo(item.left)
+        elif kind is Number:
+            push(item.value)
+        elif kind is _BUILTIN or kind is _FUNCTION:
+            right = pop()
+            values[-1] = item(values[-1], right)
+        elif kind is Var:
+            try:
+                push(symbols.get_value(item.name))
+            except KeyError:
+                raise EvaluationError(f"Undefined variable '{item.name}'")
+        elif kind is Assignment:
+            todo(_Store(item.name))
+            todo(item.value)
+        elif kind is _Store:
+            symbols.assign(item.name, values[-1])
+        elif isinstance(item, (Number, Var, Assignment, BinOp)):
+            # Subclassed node types: evaluate a shallow copy of the node.
+            todo(_as_base_node(item))
+        elif isinstance(item, (int, float)):
+            push(item)
+        elif isinstance(item, tuple) and len(item) == 3:
+            op, left, right = item
+            todo(ops.get(op) or _deferred_op(op))
+            todo(right)
+            todo(left)
+        else:
+            raise EvaluationError(f"Invalid AST node: {item!r}")
+    return values[-1]
+
+
+def _as_base_node(node: AST) -> AST:
+    if isinstance(node, Number):
+        return Number(node.value)
+    if isinstance(node, Var):
+        return Var(node.name)
+    if isinstance(node, BinOp):
+        return BinOp(node.op, node.left, node.right)
+    return Assignment(node.name, node.value)
+
+
+def _evaluate(node: Union[AST, tuple, NumberLike], symbols: SymbolTable, budget: int) -> NumberLike:
+    """Recursive evaluation that switches to the explicit stack past ``budget``."""
+    kind = type(node)
+    if kind is Number:
+        return node.value  # type: ignore[union-attr]
+    if not budget:
+        return evaluate_iterative(node, symbols)
+    if kind is BinOp:
+        left = _evaluate(node.left, symbols, budget - 1)  # type: ignore[union-attr]
+        right = _evaluate(node.right, symbols, budget - 1)  # type: ignore[union-attr]
+        fn = _OPS.get(node.op)  # type: ignore[union-attr]
+        return fn(left, right) if fn is not None else _apply_op(node.op, left, right)  # type: ignore[union-attr]
+    if kind is Var:
+        try:
+            return symbols.get_value(node.name)  # type: ignore[union-attr,return-value]
+        except KeyError:
+            raise EvaluationError(f"Undefined variable '{node.name}'")  # type: ignore[union-attr]
     if isinstance(node, Number):
         return node.value
     if isinstance(node, Var):
         try:
-            return symbols.get_value(node.name)
+            return symbols.get_value(node.name)  # type: ignore[return-value]
         except KeyError:
             raise EvaluationError(f"Undefined variable '{node.name}'")
     if isinstance(node, Assignment):
-        value = evaluate(node.value, symbols)
-        if node.name in symbols._table:
-            symbols.set_value(node.name, value)
-        else:
-            symbols.add_variable(node.name, value)
+        value = _evaluate(node.value, symbols, budget - 1)
+        symbols.assign(node.name, value)
         return value
     if isinstance(node, BinOp):
-        left = evaluate(node.left, symbols)
-        right = evaluate(node.right, symbols)
-        return _apply_op(node.op, left, right)
-    if isinstance(node, (int, float)):
+        op, left, right = node.op, node.left, node.right
+    elif isinstance(node, (int, float)):
         return node
-    if isinstance(node, tuple) and len(node) == 3:
+    elif isinstance(node, tuple) and len(node) == 3:
         op, left, right = node
-        left_val = evaluate(left, symbols)
-        right_val = evaluate(right, symbols)
-        return _apply_op(op, left_val, right_val)
-    raise EvaluationError(f"Invalid AST node: {node!r}")
+    else:
+        raise EvaluationError(f"Invalid AST node: {node!r}")
+    left_val = _evaluate(left, symbols, budget - 1)
+    right_val = _evaluate(right, symbols, budget - 1)
+    return _apply_op(op, left_val, right_val)
+
+
+def evaluate(node: Union[AST, tuple, NumberLike], symbols: SymbolTable | None = None) -> NumberLike:
+    """Evaluate ``node`` and return its numeric result.
+
+    Shallow trees are walked recursively; subtrees nested deeper than
+    :data:`RECURSION_BUDGET` levels are finished by :func:`evaluate_iterative`,
+    so arbitrarily deep trees evaluate without :class:`RecursionError`.
+    """
+    return _evaluate(node, symbols or SymbolTable(), RECURSION_BUDGET)
+
+
+@dataclass
+class StatementResult:
+    """Outcome of one statement evaluated by :func:`evaluate_stream`."""
+
+    line: int
+    value: Optional[NumberLike]
+    error: Optional[str] = None
+
+
+def evaluate_stream(source: Union[Iterable[str], IO[str], str], symbols: SymbolTable | None = None,
+                    *, stop_on_error: bool = True, backend: str = "ply") -> Iterator[StatementResult]:
+    """Lex, parse and evaluate ``source`` one statement per line.
+
+    ``source`` may be a file object, any iterable of lines or a string.  Lines
+    are consumed lazily and evaluated into the shared ``symbols`` table, so
+    memory stays bounded regardless of input size.  Blank lines are skipped.
+
+    Errors are reported with their line number via :func:`format_error`: by
+    default the original exception type is re-raised with that message; with
+    ``stop_on_error=False`` a result carrying the message is yielded instead
+    and evaluation continues with the next line.
+    """
+    symbols = symbols or SymbolTable()
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    for lineno, line in enumerate(source, start=1):
+        text = line.strip()
+        if not text:
+            continue
+        try:
+            value = evaluate(parse(text, backend=backend), symbols)
+        except (LexerError, ParserError, EvaluationError, ZeroDivisionError) as exc:
+            error_type = EvaluationError if isinstance(exc, ZeroDivisionError) else type(exc)
+            message = format_error(lineno, str(exc))
+            if stop_on_error:
+                raise error_type(message) from exc
+            yield StatementResult(lineno, None, message)
+            continue
+        yield StatementResult(lineno, value)
 
 
 # Backwards compatibility with older code
@@ -0,0 +1,329 @@
+"""Compact postfix encoding of many ASTs with a memory-mappable file format.
+
+Every :class:`~compiler.parser.Number`, :class:`BinOp`, :class:`Var` and
+:class:`Assignment` is a Python object with its own ``__dict__``, so an
+archive of millions of parsed expressions costs gigabytes.  :func:`encode`
+flattens trees into a :class:`FlatArchive` of typed arrays instead:
+
+* ``codes`` (``uint8``) holds one opcode per node in postfix order;
+* ``args`` (``int64``) holds its operand: the value of an integer literal,
+  an index into ``floats`` (``float64``) or into the interned ``names``;
+* ``offsets`` (``uint64``) marks where each expression starts in ``codes``.
+
+That is nine bytes per node plus eight per float literal.  Expressions are
+accessed through :class:`FlatExpression` views (``__slots__``, no copies)
+that evaluate straight from the arrays with a value stack, without building
+AST objects.
+
+:meth:`FlatArchive.dump` writes the arrays as little-endian sections after a
+fixed header; :func:`load` memory-maps such a file and evaluates from the
+mapped pages, so opening an archive costs only reading its name table.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from .parser import AST, BinOp, Number, Assignment, Var
+from error_handler import EvaluationError
+from symbol_table import SymbolTable
+
+NumberLike = Union[int, float]
+
+# Opcodes; binary operators pop two values and push one, STORE binds the top.
+INT, FLOAT, LOAD, STORE, ADD, SUB, MUL, DIV = range(8)
+
+_BINARY = {"+": ADD, "add": ADD, "-": SUB, "sub": SUB,
+           "*": MUL, "mul": MUL, "/": DIV, "div": DIV}
+_SYMBOLS = {ADD: "+", SUB: "-", MUL: "*", DIV: "/"}
+_INT64 = (-(1 << 63), (1 << 63) - 1)
+
+MAGIC = b"ITCFLAT\0"
+VERSION = 1
+# magic, version, flags, expressions, nodes, floats, name-table bytes
+_HEADER = struct.Struct("<8sIIQQQQ")
+
+Buffer = Union[array, memoryview]
+
+
+class FlatExpression:
+    """View of expression ``index`` in ``archive``."""
+
+    __slots__ = ("archive", "index", "start", "stop")
+
+    def __init__(self, archive: "FlatArchive", index: int) -> None:
+        self.archive = archive
+        self.index = index
+        self.start = archive.offsets[index]
+        self.stop = archive.offsets[index + 1]
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __repr__(self) -> str:
+        return f"<FlatExpression {self.index} ({len(self)} nodes)>"
+
+    def evaluate(self, symbols: SymbolTable | None = None) -> NumberLike:
+        """Evaluate straight from the arrays; semantics match :func:`~compiler.evaluator.evaluate`."""
+        symbols = symbols or SymbolTable()
+        archive = self.archive
+        floats = archive.floats
+        names = archive.names
+        stack: list = []
+        push = stack.append
+        pop = stack.pop
+        for code, arg in zip(archive.codes[self.start:self.stop], archive.args[self.start:self.stop]):
+            if code == INT:
+                push(arg)
+            elif code == ADD:
+                right = pop()
+                stack[-1] += right
+            elif code == SUB:
+                right = pop()
+                stack[-1] -= right
+            elif code == MUL:
+                right = pop()
+                stack[-1] *= right
+            elif code == DIV:
+                right = pop()
+                stack[-1] /= right
+            elif code == FLOAT:
+                push(floats[arg])
+            elif code == LOAD:
+                try:
+                    push(symbols.get_value(names[arg]))
+                except KeyError:
+                    raise EvaluationError(f"Undefined variable '{names[arg]}'")
+            elif code == STORE:
+                symbols.assign(names[arg], stack[-1])
+            else:
+                raise EvaluationError(f"Invalid opcode {code} in flat expression {self.index}")
+        return stack[-1]
+
+    def to_ast(self) -> AST:
+        """Rebuild the dataclass tree."""
+        archive = self.archive
+        stack: list = []
+        for code, arg in zip(archive.codes[self.start:self.stop], archive.args[self.start:self.stop]):
+            if code == INT:
+                stack.append(Number(arg))
+            elif code == FLOAT:
+                stack.append(Number(archive.floats[arg]))
+            elif code == LOAD:
+                stack.append(Var(archive.names[arg]))
+            elif code == STORE:
+                stack[-1] = Assignment(archive.names[arg], stack[-1])
+            else:
+                right = stack.pop()
+                stack[-1] = BinOp(_SYMBOLS[code], stack[-1], right)
+        return stack[-1]
+
+
+class FlatArchive:
+    """Expressions stored as typed arrays; index it for :class:`FlatExpression` views.
+
+    Archives returned by :func:`load` are backed by a memory map; close them
+    (or use them as a context manager) once all views are discarded.
+    """
+
+    def __init__(self, offsets: Buffer, codes: Buffer, args: Buffer, floats: Buffer,
+                 names: Sequence[str], *, mapping: Optional[mmap.mmap] = None) -> None:
+        self.offsets = offsets
+        self.codes = codes
+        self.args = args
+        self.floats = floats
+        self.names = tuple(names)
+        self._mapping = mapping
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> FlatExpression:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("flat expression index out of range")
+        return FlatExpression(self, index)
+
+    def __iter__(self) -> Iterator[FlatExpression]:
+        for index in range(len(self)):
+            yield FlatExpression(self, index)
+
+    def __enter__(self) -> "FlatArchive":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the array data (excluding the name table)."""
+        return sum(len(buf) * buf.itemsize for buf in (self.offsets, self.codes, self.args, self.floats))
+
+    def evaluate_all(self, symbols: SymbolTable | None = None) -> list[NumberLike]:
+        """Evaluate every expression in order into one shared symbol table."""
+        symbols = symbols or SymbolTable()
+        return [expression.evaluate(symbols) for expression in self]
+
+    def to_bytes(self) -> bytes:
+        """Serialise to the format read by :func:`load` and :func:`from_bytes`."""
+        names = "\0".join(self.names).encode("utf-8")
+        parts = [_HEADER.pack(MAGIC, VERSION, 0, len(self), len(self.codes), len(self.floats), len(names))]
+        for buf in (self.offsets, self.args, self.floats, self.codes):
+            data = buf.tobytes()
+            if sys.byteorder != "little":  # pragma: no cover - big-endian hosts
+                swapped = array(buf.format if isinstance(buf, memoryview) else buf.typecode)
+                swapped.frombytes(data)
+                swapped.byteswap()
+                data = swapped.tobytes()
+            parts.append(data)
+        parts.append(b"\0" * (-len(self.codes) % 8))
+        parts.append(names)
+        return b"".join(parts)
+
+    def dump(self, path: Union[str, os.PathLike]) -> None:
+        with open(path, "wb") as fh:
+            fh.write(self.to_bytes())
+
+    def close(self) -> None:
+        """Release the memory map, if any; views become unusable."""
+        if self._mapping is not None:
+            for name in ("offsets", "codes", "args", "floats"):
+                buf = getattr(self, name)
+                if isinstance(buf, memoryview):
+                    buf.release()
+            self._mapping.close()
+            self._mapping = None
+
+
+class FlatBuilder:
+    """Append ASTs to growing arrays, interning variable names."""
+
+    def __init__(self) -> None:
+        self.offsets = array("Q", [0])
+        self.codes = array("B")
+        self.args = array("q")
+        self.floats = array("d")
+        self.names: list[str] = []
+        self._name_index: dict[str, int] = {}
+
+    def _name(self, name: str) -> int:
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def add(self, tree: Union[AST, tuple, NumberLike]) -> int:
+        """Append ``tree`` in postfix order and return its index."""
+        codes, args = self.codes, self.args
+        # Explicit stack of (node, children_done) so deep trees cannot overflow.
+        stack: list = [(tree, False)]
+        while stack:
+            node, done = stack.pop()
+            if isinstance(node, Number):
+                node = node.value
+            if isinstance(node, bool) or not isinstance(node, (int, float, Var, BinOp, Assignment, tuple)):
+                raise EvaluationError(f"Invalid AST node: {node!r}")
+            if isinstance(node, int):
+                if not _INT64[0] <= node <= _INT64[1]:
+                    raise ValueError(f"Integer literal {node} does not fit in 64 bits")
+                codes.append(INT)
+                args.append(node)
+            elif isinstance(node, float):
+                codes.append(FLOAT)
+                args.append(len(self.floats))
+                self.floats.append(node)
+            elif isinstance(node, Var):
+                codes.append(LOAD)
+                args.append(self._name(node.name))
+            elif isinstance(node, Assignment):
+                if done:
+                    codes.append(STORE)
+                    args.append(self._name(node.name))
+                else:
+                    stack.append((node, True))
+                    stack.append((node.value, False))
+            else:
+                op, left, right = (node.op, node.left, node.right) if isinstance(node, BinOp) else node
+                if op not in _BINARY:
+                    raise ValueError(f"Unknown operator: {op}")
+                if done:
+                    codes.append(_BINARY[op])
+                    args.append(0)
+                else:
+                    stack.append((node, True))
+                    stack.append((right, False))
+                    stack.append((left, False))
+        self.offsets.append(len(codes))
+        return len(self.offsets) - 2
+
+    def build(self) -> FlatArchive:
+        return FlatArchive(self.offsets, self.codes, self.args, self.floats, self.names)
+
+
+def encode(trees: Iterable[Union[AST, tuple, NumberLike]]) -> FlatArchive:
+    """Flatten ``trees`` (dataclass ASTs, legacy tuples or numbers) into an archive."""
+    builder = FlatBuilder()
+    for tree in trees:
+        builder.add(tree)
+    return builder.build()
+
+
+def _sections(buffer: Union[bytes, mmap.mmap]) -> tuple[memoryview, ...]:
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Not a flat AST archive: file too short")
+    magic, version, _flags, count, nodes, floats, name_bytes = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a flat AST archive: bad magic")
+    if version != VERSION:
+        raise ValueError(f"Unsupported flat AST archive version {version}")
+    view = memoryview(buffer)
+    sections = []
+    position = _HEADER.size
+    for length, typecode in ((count + 1, "Q"), (nodes, "q"), (floats, "d"), (nodes, "B")):
+        size = length * struct.calcsize(typecode)
+        if position + size > len(buffer):
+            raise ValueError("Not a flat AST archive: truncated")
+        sections.append(view[position:position + size].cast(typecode))
+        position += size + (-size % 8)
+    sections.append(view[position:position + name_bytes])
+    return tuple(sections)
+
+
+def from_bytes(data: bytes) -> FlatArchive:
+    """Read an archive serialised by :meth:`FlatArchive.to_bytes` (zero-copy on little-endian hosts)."""
+    offsets, args, floats, codes, names = _sections(data)
+    return _archive(offsets, codes, args, floats, names, None)
+
+
+def load(path: Union[str, os.PathLike]) -> FlatArchive:
+    """Memory-map the archive at ``path``; expressions evaluate from the mapped pages."""
+    with open(path, "rb") as fh:
+        mapping = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        offsets, args, floats, codes, names = _sections(mapping)
+    except ValueError:
+        mapping.close()
+        raise
+    return _archive(offsets, codes, args, floats, names, mapping)
+
+
+def _archive(offsets: memoryview, codes: memoryview, args: memoryview, floats: memoryview,
+             names: memoryview, mapping: Optional[mmap.mmap]) -> FlatArchive:
+    table = [sys.intern(name) for name in bytes(names).decode("utf-8").split("\0")] if len(names) else []
+    names.release()
+    if sys.byteorder != "little":  # pragma: no cover - big-endian hosts copy and swap
+        converted = []
+        for buf in (offsets, codes, args, floats):
+            data = array(buf.format, buf.tobytes())
+            data.byteswap()
+            buf.release()
+            converted.append(data)
+        offsets, codes, args, floats = converted
+    return FlatArchive(offsets, codes, args, floats, table, mapping=mapping)
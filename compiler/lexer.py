@@ -1,4 +1,12 @@
-"""Lexical analyzer for arithmetic expressions using :mod:`ply`."""
+"""Lexical analyzer for arithmetic expressions using :mod:`ply`.
+
+:data:`lexer` is a module-level singleton whose input buffer and position
+are shared by every caller.  Code that may run on several threads should use
+:func:`get_lexer`, which hands each thread its own clone of the prebuilt
+lexer instead of rebuilding the regular expressions with ``lex.lex()``.
+"""
+
+import threading
 
 import ply.lex as lex
 
@@ -50,4 +58,19 @@ def t_error(t):
     raise LexerError(msg)
 
 
-lexer = lex.lex()
+# Optimised mode reads the master regex from the shipped ``lextab.py``
+# instead of validating and compiling every rule at import.  Delete that file
+# after changing the token rules and it is regenerated on the next import.
+lexer = lex.lex(optimize=True, lextab="compiler.lextab")
+
+# Never fed any input, so clones start from a clean state.
+_template = lexer.clone()
+_local = threading.local()
+
+
+def get_lexer() -> lex.Lexer:
+    """Return this thread's lexer, cloned once from the prebuilt tables."""
+    clone = getattr(_local, "lexer", None)
+    if clone is None:
+        clone = _local.lexer = _template.clone()
+    return clone
@@ -0,0 +1,168 @@
+"""AST optimisation passes run between :func:`parse` and evaluation.
+
+Three passes are provided and combined by :func:`optimize`:
+
+* :func:`fold_constants` evaluates ``BinOp`` nodes whose operands are both
+  numbers, so ``(2*3)+(2*3)*x`` becomes ``6+6*x``.
+* :func:`simplify` removes integer identities such as ``x*1`` and ``x+0``.
+* :func:`eliminate_common_subexpressions` hash-conses the tree so that
+  structurally equal subtrees become one shared node, turning the tree into
+  a DAG.  :func:`compiler.codegen.compile_ast` evaluates each shared node
+  only once per call.
+
+All passes walk the tree iteratively, so very deep generated expressions do
+not hit the recursion limit, and none of them change the value or the error
+an expression produces.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from .parser import AST, BinOp, Number, Assignment, Var
+
+Pass = Callable[[AST], AST]
+
+_FOLD = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b,
+}
+
+
+def _children(node: AST) -> tuple[AST, ...]:
+    if isinstance(node, BinOp):
+        return node.left, node.right
+    if isinstance(node, Assignment):
+        return (node.value,)
+    return ()
+
+
+def _rewrite(node: AST, rule: Callable[[AST, list[AST]], AST]) -> AST:
+    """Rebuild ``node`` bottom-up, calling ``rule(node, new_children)`` per node.
+
+    Nodes reachable more than once are rewritten once, preserving sharing.
+    """
+    done: dict[int, AST] = {}
+    stack: list[tuple[AST, bool]] = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if id(current) in done:
+            continue
+        children = _children(current)
+        if expanded or not children:
+            done[id(current)] = rule(current, [done[id(c)] for c in children])
+            continue
+        stack.append((current, True))
+        stack.extend((child, False) for child in reversed(children))
+    return done[id(node)]
+
+
+def count_nodes(node: AST) -> int:
+    """Return the number of distinct nodes reachable from ``node``."""
+    seen: set[int] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        stack.extend(_children(current))
+    return len(seen)
+
+
+def _rebuild(node: AST, children: list[AST]) -> AST:
+    if isinstance(node, BinOp):
+        left, right = children
+        if left is node.left and right is node.right:
+            return node
+        return BinOp(node.op, left, right)
+    if isinstance(node, Assignment):
+        (value,) = children
+        return node if value is node.value else Assignment(node.name, value)
+    return node
+
+
+def _fold_rule(node: AST, children: list[AST]) -> AST:
+    node = _rebuild(node, children)
+    if isinstance(node, BinOp) and isinstance(node.left, Number) and isinstance(node.right, Number):
+        fold = _FOLD.get(node.op)
+        if fold is not None and not (node.op == "/" and node.right.value == 0):
+            return Number(fold(node.left.value, node.right.value))
+    return node
+
+
+def _is_int(node: AST, value: int) -> bool:
+    return isinstance(node, Number) and type(node.value) is int and node.value == value
+
+
+def _simplify_rule(node: AST, children: list[AST]) -> AST:
+    node = _rebuild(node, children)
+    if not isinstance(node, BinOp):
+        return node
+    # Only integer identities are removed: ``x + 0.0`` would turn an int into
+    # a float, so dropping it could change the result's type.
+    if node.op in ("+", "-") and _is_int(node.right, 0):
+        return node.left
+    if node.op == "+" and _is_int(node.left, 0):
+        return node.right
+    # ``x / 1`` is kept too since true division always yields a float.
+    if node.op == "*" and _is_int(node.right, 1):
+        return node.left
+    if node.op == "*" and _is_int(node.left, 1):
+        return node.right
+    return node
+
+
+def fold_constants(node: AST) -> AST:
+    """Replace operations on two number literals by their result.
+
+    Division by a zero literal is left in place so it still fails at run time.
+    """
+    return _rewrite(node, _fold_rule)
+
+
+def simplify(node: AST) -> AST:
+    """Remove additive and multiplicative integer identities."""
+    return _rewrite(node, _simplify_rule)
+
+
+def eliminate_common_subexpressions(node: AST) -> AST:
+    """Return a DAG in which structurally equal subtrees are a single node."""
+    table: dict[tuple, AST] = {}
+
+    def intern(current: AST, children: list[AST]) -> AST:
+        if isinstance(current, Number):
+            key: tuple = ("num", type(current.value).__name__, current.value)
+        elif isinstance(current, Var):
+            key = ("var", current.name)
+        elif isinstance(current, BinOp):
+            key = ("bin", current.op, id(children[0]), id(children[1]))
+        else:
+            return _rebuild(current, children)
+        canonical = table.get(key)
+        if canonical is None:
+            canonical = table[key] = _rebuild(current, children)
+        return canonical
+
+    return _rewrite(node, intern)
+
+
+DEFAULT_PASSES: tuple[Pass, ...] = (fold_constants, simplify, eliminate_common_subexpressions)
+
+
+@dataclass
+class OptimizationResult:
+    ast: AST
+    nodes_before: int
+    nodes_after: int
+
+
+def optimize(node: AST, passes: Iterable[Pass] = DEFAULT_PASSES) -> OptimizationResult:
+    """Run ``passes`` over ``node`` and report node counts before and after."""
+    before = count_nodes(node)
+    for optimization in passes:
+        node = optimization(node)
+    return OptimizationResult(node, before, count_nodes(node))
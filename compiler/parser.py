@@ -3,17 +3,25 @@
 This module defines a grammar for simple arithmetic and constructs an
 Abstract Syntax Tree (AST) from a source string.  The exposed ``parser``
 object can be used directly via ``parser.parse(text, lexer=lexer)`` or
-through the convenience :func:`parse` wrapper defined below.
+through the convenience :func:`parse` wrapper defined below, which can also
+dispatch to the hand-written backend in :mod:`compiler.pratt`.
+
+PLY keeps the parse stacks on the parser object, so the shared ``parser``
+must not be used from several threads at once.  :func:`parse` uses
+:func:`get_parser` and :func:`~compiler.lexer.get_lexer`, which give every
+thread its own shallow copy sharing the read-only LALR tables.
 """
 
 from __future__ import annotations
 
+import copy
+import threading
 from dataclasses import dataclass
 from typing import Union
 
 import ply.yacc as yacc
 
-from .lexer import lexer, tokens
+from .lexer import get_lexer, lexer, tokens
 from error_handler import ParserError
 
 
@@ -97,10 +105,37 @@ def p_statement_expr(p):
     p[0] = p[1]
 
 
-parser = yacc.yacc(start="statement")
+# The LALR tables ship as ``parsetab.py``; they are only rebuilt (and the
+# file rewritten) when the grammar's signature no longer matches.
+parser = yacc.yacc(start="statement", debug=False, tabmodule="compiler.parsetab")
+
+_local = threading.local()
+
+
+def get_parser() -> yacc.LRParser:
+    """Return this thread's parser; copies share the LALR tables with :data:`parser`."""
+    clone = getattr(_local, "parser", None)
+    if clone is None:
+        clone = _local.parser = copy.copy(parser)
+    return clone
+
+
+BACKENDS = ("ply", "pratt")
+
+
+def parse(text: str, *, lexer_obj=None, backend: str = "ply") -> AST:
+    """Parse ``text`` into an AST; safe to call from several threads.
 
+    ``backend="ply"`` uses this thread's PLY parser with ``lexer_obj``
+    (defaults to :func:`~compiler.lexer.get_lexer`); ``backend="pratt"`` uses
+    the hand-written tokenizer and precedence-climbing parser, which is faster
+    on short expressions.
+    """
+    if backend == "ply":
+        return get_parser().parse(text, lexer=lexer_obj or get_lexer())
+    if backend == "pratt":
+        from .pratt import parse as pratt_parse
 
-def parse(text: str, *, lexer_obj=lexer) -> AST:
-    """Parse ``text`` into an AST using ``lexer_obj`` (defaults to :data:`lexer`)."""
-    return parser.parse(text, lexer=lexer_obj)
+        return pratt_parse(text)
+    raise ValueError(f"Unknown parser backend: {backend!r}")
 
@@ -0,0 +1,41 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'statementASSIGN DIVIDE ID LPAREN MINUS NUMBER PLUS RPAREN TIMESexpression : expression PLUS term\n                  | expression MINUS termexpression : termterm : term TIMES factor\n            | term DIVIDE factorterm : factorfactor : NUMBERfactor : IDfactor : LPAREN expression RPARENstatement : ID ASSIGN expressionstatement : expression'
+    
+_lr_action_items = {'ID':([0,7,8,9,10,11,12,],[2,14,14,14,14,14,14,]),'NUMBER':([0,7,8,9,10,11,12,],[6,6,6,6,6,6,6,]),'LPAREN':([0,7,8,9,10,11,12,],[7,7,7,7,7,7,7,]),'$end':([1,2,3,4,5,6,14,15,16,17,18,19,20,],[0,-8,-11,-3,-6,-7,-8,-10,-1,-2,-4,-5,-9,]),'ASSIGN':([2,],[8,]),'TIMES':([2,4,5,6,14,16,17,18,19,20,],[-8,11,-6,-7,-8,11,11,-4,-5,-9,]),'DIVIDE':([2,4,5,6,14,16,17,18,19,20,],[-8,12,-6,-7,-8,12,12,-4,-5,-9,]),'PLUS':([2,3,4,5,6,13,14,15,16,17,18,19,20,],[-8,9,-3,-6,-7,9,-8,9,-1,-2,-4,-5,-9,]),'MINUS':([2,3,4,5,6,13,14,15,16,17,18,19,20,],[-8,10,-3,-6,-7,10,-8,10,-1,-2,-4,-5,-9,]),'RPAREN':([4,5,6,13,14,16,17,18,19,20,],[-3,-6,-7,20,-8,-1,-2,-4,-5,-9,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'statement':([0,],[1,]),'expression':([0,7,8,],[3,13,15,]),'term':([0,7,8,9,10,],[4,4,4,16,17,]),'factor':([0,7,8,9,10,11,12,],[5,5,5,5,5,18,19,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> statement","S'",1,None,None,None),
+  ('expression -> expression PLUS term','expression',3,'p_expression_binop','parser.py',55),
+  ('expression -> expression MINUS term','expression',3,'p_expression_binop','parser.py',56),
+  ('expression -> term','expression',1,'p_expression_term','parser.py',61),
+  ('term -> term TIMES factor','term',3,'p_term_binop','parser.py',66),
+  ('term -> term DIVIDE factor','term',3,'p_term_binop','parser.py',67),
+  ('term -> factor','term',1,'p_term_factor','parser.py',72),
+  ('factor -> NUMBER','factor',1,'p_factor_number','parser.py',77),
+  ('factor -> ID','factor',1,'p_factor_id','parser.py',82),
+  ('factor -> LPAREN expression RPAREN','factor',3,'p_factor_group','parser.py',87),
+  ('statement -> ID ASSIGN expression','statement',3,'p_statement_assign','parser.py',99),
+  ('statement -> expression','statement',1,'p_statement_expr','parser.py',104),
+]
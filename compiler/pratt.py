@@ -0,0 +1,150 @@
+"""Hand-written tokenizer and precedence-climbing parser.
+
+This is an alternative to the PLY backend in :mod:`compiler.lexer` and
+:mod:`compiler.parser`.  It accepts exactly the same language, builds the
+same :class:`Number`/:class:`BinOp`/:class:`Var`/:class:`Assignment` nodes
+and raises the same :class:`LexerError`/:class:`ParserError` messages, but
+scans the input in a single pass and parses it with a loop per precedence
+level instead of running PLY's master regex and LALR table interpreter.
+
+Select it with ``parse(text, backend="pratt")``.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Union
+
+from .parser import AST, BinOp, Number, Assignment, Var
+from error_handler import LexerError, ParserError
+
+# Tokens are plain ``(type, value, position)`` tuples using PLY's token names.
+Token = tuple[str, Union[int, float, str, None], int]
+
+_PUNCTUATION = {
+    "+": "PLUS",
+    "-": "MINUS",
+    "*": "TIMES",
+    "/": "DIVIDE",
+    "(": "LPAREN",
+    ")": "RPAREN",
+    "=": "ASSIGN",
+}
+_IGNORE = frozenset(" \t\n")
+_ID_START = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+_ID_CHARS = _ID_START | frozenset("0123456789")
+_EOF: Token = ("$end", None, -1)
+
+# Binding power of each binary operator; all of them are left-associative.
+_BINDING = {"PLUS": 10, "MINUS": 10, "TIMES": 20, "DIVIDE": 20}
+
+
+def tokenize(text: str) -> Iterator[Token]:
+    """Yield tokens for ``text`` lazily, raising :class:`LexerError` on bad input.
+
+    Mirrors :mod:`compiler.lexer`: spaces, tabs and newlines are skipped,
+    numbers are ``\\d+(\\.\\d+)?`` and identifiers ``[a-zA-Z_][a-zA-Z0-9_]*``.
+    """
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch in _IGNORE:
+            i += 1
+            continue
+        kind = _PUNCTUATION.get(ch)
+        if kind is not None:
+            yield kind, ch, i
+            i += 1
+            continue
+        if ch in _ID_START:
+            j = i + 1
+            while j < n and text[j] in _ID_CHARS:
+                j += 1
+            yield "ID", text[i:j], i
+            i = j
+            continue
+        if ch.isdecimal():
+            j = i + 1
+            while j < n and text[j].isdecimal():
+                j += 1
+            if j + 1 < n and text[j] == "." and text[j + 1].isdecimal():
+                j += 2
+                while j < n and text[j].isdecimal():
+                    j += 1
+                yield "NUMBER", float(text[i:j]), i
+            else:
+                yield "NUMBER", int(text[i:j]), i
+            i = j
+            continue
+        raise LexerError(f"Illegal character {ch!r} at position {i}")
+
+
+def _syntax_error(tok: Token) -> ParserError:
+    if tok is _EOF:
+        return ParserError("Syntax error at EOF")
+    return ParserError(f"Syntax error at {tok[1]!r}")
+
+
+class _Parser:
+    __slots__ = ("tokens", "tok")
+
+    def __init__(self, text: str) -> None:
+        self.tokens = tokenize(text)
+        self.tok = next(self.tokens, _EOF)
+
+    def advance(self) -> None:
+        self.tok = next(self.tokens, _EOF)
+
+    def primary(self) -> AST:
+        kind, value, _ = self.tok
+        if kind == "NUMBER":
+            self.advance()
+            return Number(value)  # type: ignore[arg-type]
+        if kind == "ID":
+            self.advance()
+            return Var(value)  # type: ignore[arg-type]
+        if kind == "LPAREN":
+            self.advance()
+            node = self.expression(self.primary(), 0)
+            if self.tok[0] != "RPAREN":
+                raise _syntax_error(self.tok)
+            self.advance()
+            return node
+        raise _syntax_error(self.tok)
+
+    def expression(self, left: AST, min_binding: int) -> AST:
+        """Extend ``left`` with operators binding at least ``min_binding``."""
+        while True:
+            kind, op, _ = self.tok
+            binding = _BINDING.get(kind)
+            if binding is None or binding < min_binding:
+                return left
+            self.advance()
+            right = self.primary()
+            # Fold in tighter-binding operators before combining with ``left``.
+            while True:
+                next_binding = _BINDING.get(self.tok[0])
+                if next_binding is None or next_binding <= binding:
+                    break
+                right = self.expression(right, next_binding)
+            left = BinOp(op, left, right)  # type: ignore[arg-type]
+
+    def statement(self) -> AST:
+        if self.tok[0] == "ID":
+            name = self.tok[1]
+            self.advance()
+            if self.tok[0] == "ASSIGN":
+                self.advance()
+                node: AST = Assignment(name, self.expression(self.primary(), 0))  # type: ignore[arg-type]
+            else:
+                node = self.expression(Var(name), 0)  # type: ignore[arg-type]
+        else:
+            node = self.expression(self.primary(), 0)
+        if self.tok is not _EOF:
+            raise _syntax_error(self.tok)
+        return node
+
+
+def parse(text: str) -> AST:
+    """Parse ``text`` into an AST with the hand-written backend."""
+    return _Parser(text).statement()
@@ -0,0 +1,199 @@
+"""Reactive symbol table that recomputes only the formulas affected by a change.
+
+:class:`ReactiveSymbolTable` records, for every assignment registered with
+:meth:`~ReactiveSymbolTable.define`, which variables its right-hand side
+reads.  Formulas are kept in topological order (updated incrementally, only
+for the new formula and its dependents), so when a value is set only
+the assignments that transitively depend on it are re-evaluated, in an order
+where every formula sees up-to-date inputs::
+
+    table = ReactiveSymbolTable()
+    table.add_variable("x", 1)
+    table.define("y = x * 2")
+    table.define("z = y + x")
+    table.set_value("x", 5)   # recomputes y, then z
+
+Cycles such as ``a = b + 1`` / ``b = a * 2`` are rejected with
+:class:`DependencyCycleError` when the closing formula is defined.  A
+definition or update that fails to evaluate (including division by zero)
+raises :class:`EvaluationError` and leaves the table as it was.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Union
+
+from .codegen import compile_ast
+from .parser import AST, BinOp, Assignment, Var, parse
+from error_handler import DependencyCycleError, EvaluationError
+from symbol_table import SymbolTable
+
+_MISSING = object()
+
+
+def free_variables(node: AST) -> set[str]:
+    """Return the names of all variables read by ``node``."""
+    names: set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Var):
+            names.add(current.name)
+        elif isinstance(current, BinOp):
+            stack.append(current.left)
+            stack.append(current.right)
+        elif isinstance(current, Assignment):
+            stack.append(current.value)
+    return names
+
+
+class ReactiveSymbolTable(SymbolTable):
+    """Symbol table whose assignments are kept up to date incrementally.
+
+    Formulas live in this table's own scope.  Variables they read from parent
+    scopes are looked up normally, but changes made directly on a parent table
+    are not tracked.  Setting a formula's variable with :meth:`set_value`
+    replaces the formula by a plain value.
+    """
+
+    def __init__(self, parent: SymbolTable | None = None) -> None:
+        super().__init__(parent)
+        self._formulas: dict[str, object] = {}
+        self._reads: dict[str, frozenset[str]] = {}
+        self._readers: defaultdict[str, set[str]] = defaultdict(set)
+        self._rank: dict[str, int] = {}
+
+    def define(self, statement: Union[Assignment, str]) -> object:
+        """Register the assignment ``statement`` and return its current value."""
+        node = parse(statement) if isinstance(statement, str) else statement
+        if not isinstance(node, Assignment):
+            raise EvaluationError("Only assignments can be defined reactively")
+        name = node.name
+        reads = frozenset(free_variables(node.value))
+        previous = (self._formulas.get(name), self._reads.get(name), self._rank.get(name),
+                    self._table.get(name, _MISSING))
+
+        self._link(name, compile_ast(node.value), reads)
+        try:
+            self._update_ranks(name)
+            value = self._table[name] = self._evaluate(name)
+            self._recompute(name)
+        except EvaluationError:
+            self._unlink(name)
+            self._rank.pop(name, None)
+            if previous[0] is not None:
+                self._link(name, previous[0], previous[1])  # type: ignore[arg-type]
+                self._rank[name] = previous[2]  # type: ignore[assignment]
+            if previous[3] is _MISSING:
+                self._table.pop(name, None)
+            else:
+                self._table[name] = previous[3]
+            raise
+        return value
+
+    def add_variable(self, name: str, value: object) -> None:
+        super().add_variable(name, value)
+        try:
+            self._recompute(name)
+        except EvaluationError:
+            del self._table[name]
+            raise
+
+    def set_value(self, name: str, value: object) -> None:
+        old = self.get_value(name)
+        formula = (self._formulas.get(name), self._reads.get(name), self._rank.get(name))
+        if formula[0] is not None:
+            self._unlink(name)
+            self._rank.pop(name)
+        super().set_value(name, value)
+        try:
+            self._recompute(name)
+        except EvaluationError:
+            super().set_value(name, old)
+            if formula[0] is not None:
+                self._link(name, formula[0], formula[1])  # type: ignore[arg-type]
+                self._rank[name] = formula[2]  # type: ignore[assignment]
+            raise
+
+    def dependents(self, name: str) -> list[str]:
+        """Return the formulas affected by a change to ``name``, in update order."""
+        affected: set[str] = set()
+        stack = list(self._readers.get(name, ()))
+        while stack:
+            current = stack.pop()
+            if current in affected:
+                continue
+            affected.add(current)
+            stack.extend(self._readers.get(current, ()))
+        return sorted(affected, key=self._rank.__getitem__)
+
+    # -- internals --------------------------------------------------------
+    def _link(self, name: str, fn: object, reads: frozenset[str]) -> None:
+        self._unlink(name)
+        self._formulas[name] = fn
+        self._reads[name] = reads
+        for dependency in reads:
+            self._readers[dependency].add(name)
+
+    def _unlink(self, name: str) -> None:
+        self._formulas.pop(name, None)
+        for dependency in self._reads.pop(name, ()):
+            self._readers[dependency].discard(name)
+
+    def _update_ranks(self, name: str) -> None:
+        """Rank ``name`` above the formulas it reads and push its dependents above it.
+
+        A formula's rank only has to exceed the ranks of its inputs, so ranks
+        only ever grow: defining a formula touches just it and the formulas
+        downstream of it, and unlinking one leaves the others valid.
+        """
+        ranks = self._rank
+        updates = {name: 1 + max((ranks.get(dep, -1) for dep in self._reads[name]
+                                  if dep in self._formulas), default=-1)}
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            for reader in self._readers.get(current, ()):
+                if reader == name:
+                    raise DependencyCycleError(
+                        f"Dependency cycle between {', '.join(self._cycle_through(name))}")
+                if updates.get(reader, ranks[reader]) <= updates[current]:
+                    updates[reader] = updates[current] + 1
+                    stack.append(reader)
+        ranks.update(updates)
+
+    def _cycle_through(self, name: str) -> list[str]:
+        """Return the formulas on dependency cycles through ``name``, sorted."""
+        upstream: set[str] = set()
+        stack = [name]
+        while stack:
+            for dependency in self._reads.get(stack.pop(), ()):
+                if dependency in self._formulas and dependency not in upstream:
+                    upstream.add(dependency)
+                    stack.append(dependency)
+        downstream: set[str] = set()
+        stack = [name]
+        while stack:
+            for reader in self._readers.get(stack.pop(), ()):
+                if reader not in downstream:
+                    downstream.add(reader)
+                    stack.append(reader)
+        return sorted(upstream & downstream | {name})
+
+    def _evaluate(self, name: str) -> object:
+        try:
+            return self._formulas[name](self)  # type: ignore[operator]
+        except ZeroDivisionError as exc:
+            raise EvaluationError(f"Division by zero while computing '{name}'") from exc
+
+    def _recompute(self, name: str) -> None:
+        """Update the dependents of ``name``; if one fails, restore them all and raise."""
+        saved: dict[str, object] = {}
+        try:
+            for formula in self.dependents(name):
+                saved[formula] = self._table[formula]
+                self._table[formula] = self._evaluate(formula)
+        except EvaluationError:
+            self._table.update(saved)
+            raise
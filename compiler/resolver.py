@@ -0,0 +1,245 @@
+"""Static name resolution into array-backed frames.
+
+:class:`SymbolTable` looks names up with a dict probe per scope level.  For
+expressions evaluated many times, :func:`resolve` instead maps every
+:class:`Var` and :class:`Assignment` to a ``(depth, slot)`` address ahead of
+time: ``depth`` counts parent hops and ``slot`` indexes that level's value
+list.  :func:`compile_resolved` turns those addresses into indexed loads and
+stores on :class:`Frame` objects::
+
+    scope = Scope(["x", "y"])
+    fn = compile_resolved(parser.parse("z = x * 2 + y"), scope)
+    frame = Frame(scope, [3, 4])
+    fn(frame)                 # 10, stored in frame slot 2
+
+Assignments follow :func:`evaluate`: the target is declared in the
+innermost scope if it is not local yet, and a read of a name declared at
+several levels uses the innermost bound one, so ``x = x + 1`` reads the
+parent's ``x`` until the local slot has been assigned.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from .codegen import _UNSET, Memo, NumberLike, _Compiler, _find_shared
+from .parser import AST, BinOp, Assignment, Var
+from error_handler import EvaluationError
+from symbol_table import SymbolTable
+
+Address = tuple[int, int]
+
+_UNBOUND = object()
+
+
+class Scope:
+    """Compile-time layout of one frame: its variable names in slot order."""
+
+    __slots__ = ("names", "slots", "parent")
+
+    def __init__(self, names: Iterable[str] = (), parent: Optional["Scope"] = None) -> None:
+        self.names: list[str] = []
+        self.slots: dict[str, int] = {}
+        self.parent = parent
+        for name in names:
+            self.declare(name)
+
+    def declare(self, name: str) -> int:
+        """Return the slot of ``name`` in this scope, adding it if needed."""
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+        return slot
+
+    def lookup(self, name: str) -> Optional[Address]:
+        """Return the ``(depth, slot)`` address of ``name`` or ``None``."""
+        scope: Optional[Scope] = self
+        depth = 0
+        while scope is not None:
+            slot = scope.slots.get(name)
+            if slot is not None:
+                return depth, slot
+            scope = scope.parent
+            depth += 1
+        return None
+
+    def lookup_all(self, name: str) -> list[Address]:
+        """Return the addresses of every level declaring ``name``, innermost first."""
+        addresses = []
+        scope: Optional[Scope] = self
+        depth = 0
+        while scope is not None:
+            slot = scope.slots.get(name)
+            if slot is not None:
+                addresses.append((depth, slot))
+            scope = scope.parent
+            depth += 1
+        return addresses
+
+    @classmethod
+    def from_symbol_table(cls, table: SymbolTable) -> "Scope":
+        """Build a scope chain with the same levels and names as ``table``."""
+        parent = cls.from_symbol_table(table.parent) if table.parent is not None else None
+        return cls(table._table, parent)
+
+
+class Frame:
+    """Run-time values for one :class:`Scope`, stored in a plain list.
+
+    ``chain`` holds this frame followed by all of its ancestors (a "display"),
+    so a variable ``depth`` levels up is reached with one index operation.
+    """
+
+    __slots__ = ("scope", "values", "parent", "chain")
+
+    def __init__(self, scope: Scope, values: Sequence[object] = (),
+                 parent: Optional["Frame"] = None) -> None:
+        self.scope = scope
+        self.values = list(values)
+        self.parent = parent
+        self.chain: tuple[Frame, ...] = (self,) + (parent.chain if parent is not None else ())
+        self.ensure_size()
+
+    def ensure_size(self) -> None:
+        """Grow every level to fit slots declared since the frame was built."""
+        frame: Optional[Frame] = self
+        while frame is not None:
+            missing = len(frame.scope.names) - len(frame.values)
+            if missing > 0:
+                frame.values.extend([_UNBOUND] * missing)
+            frame = frame.parent
+
+    def get(self, name: str) -> object:
+        """Return the value of ``name`` by walking the frame chain."""
+        address = self.scope.lookup(name)
+        if address is None:
+            raise KeyError(f"Variable '{name}' not found")
+        value = self.chain[address[0]].values[address[1]]
+        if value is _UNBOUND:
+            raise KeyError(f"Variable '{name}' not found")
+        return value
+
+    @classmethod
+    def from_symbol_table(cls, table: SymbolTable, scope: Scope) -> "Frame":
+        """Copy the values of ``table`` into a frame chain laid out by ``scope``."""
+        parent = None
+        if table.parent is not None and scope.parent is not None:
+            parent = cls.from_symbol_table(table.parent, scope.parent)
+        values = [table._table.get(name, _UNBOUND) for name in scope.names]
+        return cls(scope, values, parent)
+
+
+def resolve(node: AST, scope: Scope,
+            fallbacks: Optional[dict[int, list[Address]]] = None) -> dict[int, Address]:
+    """Map ``id()`` of each :class:`Var`/:class:`Assignment` in ``node`` to its address.
+
+    Assignment targets are declared in ``scope`` as a side effect.  Reading a
+    name that no scope level declares raises :class:`EvaluationError`.  When
+    a read name is declared at several levels (typically ``x = x + 1`` with
+    ``x`` in a parent), its innermost address is returned and ``fallbacks``,
+    if given, receives the outer addresses to try while that slot is unbound.
+    """
+    addresses: dict[int, Address] = {}
+    reads: list[Var] = []
+    stack: list[tuple[object, bool]] = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if isinstance(current, Var):
+            if scope.lookup(current.name) is None:
+                raise EvaluationError(f"Undefined variable '{current.name}'")
+            reads.append(current)
+        elif isinstance(current, BinOp):
+            stack.append((current.right, False))
+            stack.append((current.left, False))
+        elif isinstance(current, Assignment):
+            if expanded:
+                addresses[id(current)] = (0, scope.declare(current.name))
+            else:
+                stack.append((current, True))
+                stack.append((current.value, False))
+    # Reads are addressed once every target is declared, so a name assigned
+    # here resolves to the local slot first.
+    for var in reads:
+        first, *outer = scope.lookup_all(var.name)
+        addresses[id(var)] = first
+        if outer and fallbacks is not None:
+            fallbacks[id(var)] = outer
+    return addresses
+
+
+def _undefined(name: str) -> NumberLike:
+    raise EvaluationError(f"Undefined variable '{name}'")
+
+
+def _load(name: str, depth: int, slot: int) -> Callable[[Frame, Memo], NumberLike]:
+    if depth == 0:
+        def load(f: Frame, m: Memo) -> NumberLike:
+            value = f.values[slot]
+            return _undefined(name) if value is _UNBOUND else value  # type: ignore[return-value]
+    elif depth == 1:
+        def load(f: Frame, m: Memo) -> NumberLike:
+            value = f.parent.values[slot]  # type: ignore[union-attr]
+            return _undefined(name) if value is _UNBOUND else value  # type: ignore[return-value]
+    else:
+        def load(f: Frame, m: Memo) -> NumberLike:
+            value = f.chain[depth].values[slot]
+            return _undefined(name) if value is _UNBOUND else value  # type: ignore[return-value]
+    return load
+
+
+def _load_shadowed(name: str, addresses: list[Address]) -> Callable[[Frame, Memo], NumberLike]:
+    def load(f: Frame, m: Memo) -> NumberLike:
+        chain = f.chain
+        for depth, slot in addresses:
+            value = chain[depth].values[slot]
+            if value is not _UNBOUND:
+                return value  # type: ignore[return-value]
+        return _undefined(name)
+    return load
+
+
+def _store(slot: int, value_fn: Callable[[Frame, Memo], NumberLike]) -> Callable[[Frame, Memo], NumberLike]:
+    def store(f: Frame, m: Memo) -> NumberLike:
+        result = f.values[slot] = value_fn(f, m)
+        return result
+    return store
+
+
+class _ResolvedCompiler(_Compiler):
+    def __init__(self, shared: set[int], addresses: dict[int, Address],
+                 fallbacks: dict[int, list[Address]]) -> None:
+        super().__init__(shared)
+        self.addresses = addresses
+        self.fallbacks = fallbacks
+
+    def var(self, node: Var):  # type: ignore[override]
+        address = self.addresses[id(node)]
+        outer = self.fallbacks.get(id(node))
+        if outer:
+            return _load_shadowed(node.name, [address, *outer])
+        return _load(node.name, *address)
+
+    def assign(self, node: Assignment, value):  # type: ignore[override]
+        return _store(self.addresses[id(node)][1], value)
+
+
+def compile_resolved(node: Union[AST, tuple, NumberLike], scope: Scope) -> Callable[[Frame], NumberLike]:
+    """Compile ``node`` against ``scope`` into a callable taking a :class:`Frame`.
+
+    The frame passed in must be laid out by ``scope`` (or a scope chain of the
+    same shape); slots declared by assignments are added on demand.
+    """
+    fallbacks: dict[int, list[Address]] = {}
+    addresses = resolve(node, scope, fallbacks)  # type: ignore[arg-type]
+    compiler = _ResolvedCompiler(_find_shared(node), addresses, fallbacks)
+    fn = compiler.compile(node)
+    size = len(compiler.slots)
+    width = len(scope.names)
+
+    def run(frame: Frame) -> NumberLike:
+        if len(frame.values) < width:
+            frame.ensure_size()
+        return fn(frame, [_UNSET] * size if size else None)  # type: ignore[arg-type]
+
+    return run
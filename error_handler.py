@@ -13,6 +13,11 @@ class EvaluationError(Exception):
     pass
 
 
+class DependencyCycleError(EvaluationError):
+    """Error raised when reactive assignments depend on each other cyclically."""
+    pass
+
+
 def format_error(line: int, message: str) -> str:
     """Return a formatted error string with line information."""
     return f"Error at line {line}: {message}"
@@ -6,7 +6,8 @@ through OCR, parses the resulting text into an AST and evaluates it.
 The pipeline consists of the following steps:
 
 1. **OCR** using :func:`ocr.extract_text.get_expression_from_image` which
-   relies on Tesseract.
+   relies on Tesseract; look-alike characters are repaired by
+   :func:`ocr.correction.correct_expression`.
 2. **Image cleaning** performed by :func:`utils.image_cleaner.preprocess_image` to
 
    improve OCR accuracy.
@@ -19,80 +20,234 @@ The pipeline consists of the following steps:
 from __future__ import annotations
 
 import argparse
+import sys
+import time
 from typing import Optional
 
-from ocr.extract_text import get_expression_from_image, extract_text_from_image
-from utils.image_cleaner import preprocess_image
+from ocr.cache import get_default_cache
+from ocr.cascade import get_default_runner
+from ocr.correction import correct
+from ocr.document import evaluate_document
+from ocr.extract_text import EXPRESSION_SETTINGS, get_expression_from_image, extract_text_from_image
+from utils.image_cleaner import load_image, preprocess_image
+from utils.metrics import Metrics, get_metrics, log_json_to, set_metrics
 from symbol_table import SymbolTable
 from error_handler import LexerError, ParserError, EvaluationError
 
-from compiler import lexer  # noqa:F401 - ensure lexer is registered
-from compiler.parser import parser
+from compiler.lexer import get_lexer
+from compiler.parser import get_parser, parse
 from compiler.evaluator import evaluate
-from textblob import TextBlob
-import ply.lex as lex
-import compiler.lexer as lex_module
 
 
 def run_pipeline(image_path: str) -> Optional[float]:
     """Complete OCR-to-evaluation pipeline."""
-    raw_text = extract_text_from_image(image_path)
+    metrics = get_metrics()
+    with metrics.stage("ocr"):
+        raw_text = extract_text_from_image(image_path, cache=get_default_cache())
     if not raw_text:
         print("OCR produced no text")
+        metrics.error("EmptyOCRResult", "ocr")
         return None
 
-    cleaned_text = str(TextBlob(raw_text).correct())
+    cleaned_text = correct(raw_text, names=())
     print(f"Corrected text: {cleaned_text}")
 
-    temp_lexer = lex.lex(module=lex_module)
-    temp_lexer.input(cleaned_text)
-    tokens = list(temp_lexer)
+    with metrics.stage("lex"):
+        lexer = get_lexer()
+        lexer.input(cleaned_text)
+        tokens = list(lexer)
     print(f"Tokens: {[t.type for t in tokens]}")
 
-    ast = parser.parse(cleaned_text)
-    result = evaluate(ast)
+    with metrics.stage("parse"):
+        ast = parse(cleaned_text)
+    with metrics.stage("evaluate"):
+        result = evaluate(ast)
     print(f"Result: {result}")
     return result
 
 
-def process_image(image_path: str) -> Optional[float]:
-    """Process ``image_path`` and return the evaluated result."""
-    cleaned = preprocess_image(image_path)
-    if cleaned is None:
-        print("Failed to load image or OpenCV unavailable")
-        return None
-    print(f"Preprocessed image shape: {getattr(cleaned, 'shape', '?')}")
+def process_image_record(image_path: str, *, adaptive: bool = False,
+                         cascade: bool = False) -> dict[str, object]:
+    """Run the pipeline on ``image_path`` without printing.
+
+    Returns a JSON-serialisable record with the extracted ``expression``, the
+    ``ast`` repr, the evaluated ``value``, an ``error`` message (``None`` on
+    success) and per-stage ``timings`` in seconds.  OCR results are cached by
+    the image's content hash, so a repeated image skips cleaning and OCR.
+    ``adaptive`` crops to the text and scales by glyph height when cleaning
+    (see :func:`utils.image_cleaner.clean_image`).  ``cascade`` runs OCR
+    through :class:`ocr.cascade.CascadeRunner` instead, starting with the
+    cheapest preprocessing, and records the resolving ``tier``.
+    """
+    record: dict[str, object] = {
+        "path": image_path,
+        "cached": False,
+        "shape": None,
+        "expression": None,
+        "ast": None,
+        "value": None,
+        "error": None,
+        "timings": {},
+    }
+    timings: dict[str, float] = record["timings"]  # type: ignore[assignment]
 
-    text = get_expression_from_image(cleaned)
-    print(f"Extracted text: {text!r}")
+    metrics = get_metrics()
+    cache = get_default_cache()
+    runner = get_default_runner() if cascade else None
+    settings = runner.settings if runner is not None else {**EXPRESSION_SETTINGS, "adaptive": adaptive}
+    key = cache.key_for(image_path, settings)
+    text = cache.get(key)
+    if text is not None:
+        record["cached"] = True
+    elif runner is not None:
+        record["tier"] = None
+        with metrics.stage("load", timings):
+            image = load_image(image_path)
+        if image is None:
+            record["error"] = "Failed to load image or OpenCV unavailable"
+            metrics.error("ImageLoadError", "load")
+            return record
+        with metrics.stage("ocr", timings):
+            outcome = runner.run(image)
+        record["tier"] = outcome.tier
+        text = outcome.text
+        if outcome.valid:
+            cache.put(key, text)  # type: ignore[arg-type]
+    else:
+        with metrics.stage("load", timings):
+            image = load_image(image_path)
+        if image is None:
+            record["error"] = "Failed to load image or OpenCV unavailable"
+            metrics.error("ImageLoadError", "load")
+            return record
+        with metrics.stage("clean", timings):
+            cleaned = preprocess_image(image, adaptive=adaptive)
+        shape = getattr(cleaned, "shape", None)
+        record["shape"] = list(shape) if shape is not None else None
+
+        with metrics.stage("ocr", timings):
+            text = get_expression_from_image(cleaned, preprocessed=True)
+        if text:
+            cache.put(key, text)
+    record["expression"] = text
     if not text:
-        print("OCR failed or returned no text")
-        return None
+        record["error"] = "OCR failed or returned no text"
+        metrics.error("EmptyOCRResult", "ocr")
+        return record
 
     symbols = SymbolTable()
     try:
-        ast = parser.parse(text)
-        print(f"Parsed AST: {ast}")
-        result = evaluate(ast, symbols)
-        print(f"Evaluated result: {result}")
-        return result
-
-    except (LexerError, ParserError, EvaluationError) as exc:  # pragma: no cover
-        print(f"Failed to evaluate expression: {exc}")
+        # Lex up front so lexing and parsing are timed separately; the parser
+        # then consumes the prepared tokens instead of lexing again.
+        lexer = get_lexer()
+        with metrics.stage("lex", timings):
+            lexer.input(text)
+            tokens = list(iter(lexer.token, None))
+        with metrics.stage("parse", timings):
+            remaining = iter(tokens)
+            ast = get_parser().parse(text, lexer=lexer, tokenfunc=lambda: next(remaining, None))
+        record["ast"] = repr(ast)
+
+        with metrics.stage("evaluate", timings):
+            record["value"] = evaluate(ast, symbols)
+    except (LexerError, ParserError, EvaluationError) as exc:
+        record["error"] = f"Failed to evaluate expression: {exc}"
+    return record
+
+
+def process_image(image_path: str, *, adaptive: bool = False,
+                  cascade: bool = False) -> Optional[float]:
+    """Process ``image_path`` and return the evaluated result."""
+    record = process_image_record(image_path, adaptive=adaptive, cascade=cascade)
+    if record["shape"] is not None:
+        print(f"Preprocessed image shape: {tuple(record['shape'])}")
+    if record["cached"]:
+        print("Using cached OCR result")
+    if record["cached"] or "ocr" in record["timings"]:  # type: ignore[operator]
+        print(f"Extracted text: {record['expression']!r}")
+    if record["ast"] is not None:
+        print(f"Parsed AST: {record['ast']}")
+    if record["error"] is not None:
+        print(record["error"])
         return None
+    print(f"Evaluated result: {record['value']}")
+    return record["value"]  # type: ignore[return-value]
+
+
+def process_document(image_path: str, *, workers: Optional[int] = None) -> bool:
+    """Evaluate every text line of ``image_path`` in order; ``False`` on any error."""
+    results = evaluate_document(image_path, workers=workers, cache=get_default_cache())
+    if results is None:
+        print("Failed to load image or OCR unavailable")
+        return False
+    if not results:
+        print("No text lines found")
+        return False
+    for result in results:
+        if result.error is not None:
+            print(f"{result.line}: {result.text!r} -> {result.error}")
+        else:
+            print(f"{result.line}: {result.text} -> {result.value}")
+    return all(result.error is None for result in results)
 
 
 def main(argv: Optional[list[str]] = None) -> int:
     parser_ = argparse.ArgumentParser(description=__doc__)
     parser_.add_argument("image", nargs="?", help="path to the image file")
+    parser_.add_argument("--batch", nargs="+", metavar="SOURCE",
+                         help="directories, glob patterns or image paths to process in batch mode")
+    parser_.add_argument("--manifest", help="file listing one image path per line (batch mode)")
+    parser_.add_argument("--workers", type=int, default=None,
+                         help="number of worker processes, or OCR threads with --document "
+                              "(default: CPU count)")
+    parser_.add_argument("--chunksize", type=int, default=16,
+                         help="images handed to a worker per dispatch")
+    parser_.add_argument("--output", default="-", help="JSONL output path, '-' for stdout")
+    parser_.add_argument("--adaptive", action="store_true",
+                         help="crop to the text region and scale by glyph height before OCR")
+    parser_.add_argument("--cascade", action="store_true",
+                         help="try cheap OCR first and escalate preprocessing only if parsing fails")
+    parser_.add_argument("--document", action="store_true",
+                         help="treat the image as several statements, one per text line")
+    parser_.add_argument("--metrics-log", metavar="PATH",
+                         help="append per-stage JSON metric events to PATH "
+                              "(batch mode only with --workers 1)")
+    parser_.add_argument("--metrics", metavar="PATH",
+                         help="write Prometheus text metrics to PATH when done")
     args = parser_.parse_args(argv)
 
+    if args.metrics_log or args.metrics:
+        if not get_metrics().enabled:
+            set_metrics(Metrics())
+        if args.metrics_log:
+            log_json_to(args.metrics_log)
+    try:
+        return _run(args, parser_)
+    finally:
+        if args.metrics:
+            with open(args.metrics, "w", encoding="utf-8") as fh:
+                fh.write(get_metrics().prometheus())
+
+
+def _run(args: argparse.Namespace, parser_: argparse.ArgumentParser) -> int:
+    if args.batch or args.manifest:
+        from batch import run_batch
+
+        total, failed = run_batch(args.batch or [], args.output, manifest=args.manifest,
+                                  workers=args.workers, chunksize=args.chunksize,
+                                  adaptive=args.adaptive, cascade=args.cascade)
+        print(f"Processed {total} image(s), {failed} failed", file=sys.stderr)
+        return 0 if total and not failed else 1
+
     if not args.image:
         parser_.print_usage()
         return 1
 
+    if args.document:
+        return 0 if process_document(args.image, workers=args.workers) else 1
+
     print(f"Cleaning image: {args.image}")
-    result = process_image(args.image)
+    result = process_image(args.image, adaptive=args.adaptive, cascade=args.cascade)
     if result is None:
         return 1
     print(f"Result: {result}")
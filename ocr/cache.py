@@ -0,0 +1,229 @@
+"""Content-addressed cache for OCR results.
+
+Keys are SHA-256 digests of the image bytes combined with the preprocessing
+and Tesseract settings used to produce the text, so a byte-identical image
+processed the same way never reaches Tesseract twice.  Lookups go through a
+small in-memory LRU tier first and fall back to one file per entry on disk.
+The disk tier is bounded by total size and evicts the least recently used
+entries (tracked via file modification times) when it grows past the limit.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Mapping, Optional, Union
+
+from utils.lazy import lazy_import
+from utils.metrics import get_metrics
+
+# Only needed for ndarray sources, which imply NumPy is already loaded.
+np = lazy_import("numpy", globals(), "np")
+
+CacheSource = Union[str, bytes, bytearray, memoryview, "np.ndarray"]
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MEMORY_ENTRIES = 1024
+_SUFFIX = ".txt"
+
+
+class OCRCache:
+    """Two-tier (memory + disk) LRU cache mapping image digests to OCR text.
+
+    ``directory=None`` keeps the cache in memory only.  ``max_bytes`` bounds
+    the disk tier and ``memory_entries`` the in-memory tier.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str] | None = None, *,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self._entries())
+
+    # -- keys -------------------------------------------------------------
+    @staticmethod
+    def make_key(data: bytes | memoryview, settings: Mapping[str, Any]) -> str:
+        """Return the cache key for raw ``data`` processed with ``settings``."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def key_for(self, src: CacheSource, settings: Mapping[str, Any]) -> Optional[str]:
+        """Return the key for ``src`` (a path, bytes or ndarray), or ``None``."""
+        if isinstance(src, str):
+            try:
+                with open(src, "rb") as fh:
+                    data = fh.read()
+            except OSError:
+                return None
+            return self.make_key(data, settings)
+        if isinstance(src, (bytes, bytearray, memoryview)):
+            return self.make_key(bytes(src), settings)
+        if np and isinstance(src, np.ndarray):
+            arr = np.ascontiguousarray(src)
+            meta = {**settings, "shape": arr.shape, "dtype": str(arr.dtype)}
+            return self.make_key(memoryview(arr).cast("B"), meta)
+        return None
+
+    # -- lookups ----------------------------------------------------------
+    def get(self, key: Optional[str]) -> Optional[str]:
+        """Return the cached text for ``key`` or ``None`` on a miss."""
+        if key is None:
+            return None
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                get_metrics().cache(True)
+                return text
+        text = self._read_disk(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, text)
+        get_metrics().cache(text is not None)
+        return text
+
+    def put(self, key: Optional[str], text: str) -> None:
+        """Store ``text`` under ``key`` in both tiers."""
+        if key is None:
+            return
+        with self._lock:
+            self._remember(key, text)
+        self._write_disk(key, text)
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and current tier sizes."""
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+        }
+
+    # -- internals --------------------------------------------------------
+    def _remember(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _entries(self) -> list[Path]:
+        if self.directory is None:
+            return []
+        return list(self.directory.glob(f"*{_SUFFIX}"))
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)  # bump recency for LRU eviction
+        except OSError:
+            return None
+        return text
+
+    def _write_disk(self, key: str, text: str) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        data = text.encode("utf-8")
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            existed = path.exists()
+            old_size = path.stat().st_size if existed else 0
+            os.replace(tmp, path)
+        except OSError:  # pragma: no cover - disk full or read-only cache dir
+            return
+        with self._lock:
+            self._disk_bytes += len(data) - old_size
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        entries.sort(key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._memory.pop(path.stem, None)
+            total -= size
+        self._disk_bytes = total
+
+
+_default_cache: Optional[OCRCache] = None
+
+
+def get_default_cache() -> OCRCache:
+    """Return the process-wide cache used by the CLI and Streamlit app.
+
+    The location defaults to ``~/.cache/itc-compiler/ocr`` and can be changed
+    with ``ITC_OCR_CACHE_DIR``; set it to an empty string for a memory-only
+    cache.  ``ITC_OCR_CACHE_MAX_BYTES`` bounds the disk tier.
+    """
+    global _default_cache
+    if _default_cache is None:
+        directory = os.environ.get(
+            "ITC_OCR_CACHE_DIR",
+            os.path.join(os.path.expanduser("~"), ".cache", "itc-compiler", "ocr"),
+        )
+        max_bytes = int(os.environ.get("ITC_OCR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        try:
+            _default_cache = OCRCache(directory or None, max_bytes=max_bytes)
+        except OSError:  # pragma: no cover - unwritable home directory
+            _default_cache = OCRCache(None, max_bytes=max_bytes)
+    return _default_cache
+
+
+def set_default_cache(cache: Optional[OCRCache]) -> None:
+    """Replace the process-wide cache; ``None`` rebuilds it from the environment."""
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,163 @@
+"""Cost-escalating OCR cascade with parse-validated early exit.
+
+Most expression images are clean enough for a single cheap OCR pass.
+:class:`CascadeRunner` therefore tries a list of :class:`Tier` objects in
+order of cost.  The cheapest tier OCRs the raw grayscale image as a single
+text line with a character whitelist.  A tier's text is accepted as soon as
+it parses (after :func:`~ocr.correction.correct_expression`); heavier
+preprocessing runs only when the cheaper tiers fail.  :class:`CascadeStats`
+records which tier resolved each image and how long the attempts took, so
+the tier order can be tuned for average rather than worst-case latency.
+"""
+from __future__ import annotations
+
+import string
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Optional, Sequence
+
+from utils.image_cleaner import ImageSource, clean_image, load_image, to_grayscale
+
+from .correction import correct_expression
+from .extract_text import OCREngine, get_default_engine
+
+# Characters the lexer accepts.  Identifier characters must stay: Tesseract
+# forces every glyph onto the whitelist, so without them "y = 2*3" would be
+# read as a valid "x = 2*3".
+ARITHMETIC_WHITELIST = "0123456789.+-*/=()_" + string.ascii_letters
+LINE_CONFIG = f"--psm 7 -c tessedit_char_whitelist={ARITHMETIC_WHITELIST}"
+
+
+@dataclass(frozen=True)
+class Tier:
+    """One cascade step: how to prepare the image and which Tesseract config to use.
+
+    Tiers sharing the same ``prepare`` callable reuse its output within a run.
+    """
+
+    name: str
+    prepare: Callable[[Any], Any]
+    config: str = ""
+
+
+DEFAULT_TIERS: tuple[Tier, ...] = (
+    Tier("gray-line", to_grayscale, LINE_CONFIG),
+    Tier("clean-line", clean_image, LINE_CONFIG),
+    Tier("clean", clean_image, ""),
+    Tier("adaptive", partial(clean_image, adaptive=True), "--psm 6"),
+)
+
+
+@dataclass
+class CascadeResult:
+    """Outcome of :meth:`CascadeRunner.run`.
+
+    ``tier`` names the tier whose text parsed, or is ``None`` when all failed;
+    ``text`` is then the corrected text of the last tier that produced any.
+    ``attempts`` lists ``(tier, text, seconds)`` for every tier tried.
+    """
+
+    text: Optional[str]
+    tier: Optional[str]
+    attempts: list[tuple[str, str, float]] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return self.tier is not None
+
+
+class CascadeStats:
+    """Thread-safe counts of resolving tiers and time spent per tier."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.images = 0
+        self.failed = 0
+        self.resolved: dict[str, int] = {}
+        self.tried: dict[str, int] = {}
+        self.seconds: dict[str, float] = {}
+        self.total_seconds = 0.0
+
+    def record(self, result: CascadeResult) -> None:
+        with self._lock:
+            self.images += 1
+            if result.tier is None:
+                self.failed += 1
+            else:
+                self.resolved[result.tier] = self.resolved.get(result.tier, 0) + 1
+            for tier, _, seconds in result.attempts:
+                self.tried[tier] = self.tried.get(tier, 0) + 1
+                self.seconds[tier] = self.seconds.get(tier, 0.0) + seconds
+                self.total_seconds += seconds
+
+    def summary(self) -> dict[str, Any]:
+        """Per-tier resolve counts, attempts and mean attempt time, plus overall latency."""
+        with self._lock:
+            return {
+                "images": self.images,
+                "failed": self.failed,
+                "mean_seconds": self.total_seconds / self.images if self.images else 0.0,
+                "tiers": {
+                    tier: {
+                        "tried": tried,
+                        "resolved": self.resolved.get(tier, 0),
+                        "mean_seconds": self.seconds[tier] / tried,
+                    }
+                    for tier, tried in self.tried.items()
+                },
+            }
+
+
+class CascadeRunner:
+    """Run ``tiers`` in order on an image until one yields text that parses."""
+
+    def __init__(self, tiers: Sequence[Tier] = DEFAULT_TIERS, *,
+                 engine: Optional[OCREngine] = None) -> None:
+        self.tiers = tuple(tiers)
+        self.engine = engine
+        self.stats = CascadeStats()
+
+    @property
+    def settings(self) -> dict[str, Any]:
+        """Cache-key settings describing this cascade."""
+        return {"mode": "cascade", "tiers": [(t.name, t.config) for t in self.tiers],
+                "correction": "confusion"}
+
+    def run(self, src: ImageSource) -> CascadeResult:
+        """OCR ``src`` (a path, encoded bytes or array) through the cascade."""
+        result = CascadeResult(None, None)
+        engine = self.engine or get_default_engine()
+        image = load_image(src)
+        if engine is None or image is None:
+            self.stats.record(result)
+            return result
+
+        prepared: dict[Callable[[Any], Any], Any] = {}
+        for tier in self.tiers:
+            start = time.perf_counter()
+            if tier.prepare not in prepared:
+                prepared[tier.prepare] = tier.prepare(image)
+            img = prepared[tier.prepare]
+            raw = engine.image_to_string(img, config=tier.config) if img is not None else ""
+            correction = correct_expression(raw, names=())
+            result.attempts.append((tier.name, correction.text, time.perf_counter() - start))
+            if correction.text:
+                result.text = correction.text
+            if correction.valid and correction.text:
+                result.tier = tier.name
+                break
+        self.stats.record(result)
+        return result
+
+
+_default_runner: Optional[CascadeRunner] = None
+
+
+def get_default_runner() -> CascadeRunner:
+    """Return the process-wide runner with :data:`DEFAULT_TIERS`."""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = CascadeRunner()
+    return _default_runner
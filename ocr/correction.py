@@ -0,0 +1,179 @@
+"""Grammar-aware correction of OCR'd expressions.
+
+Tesseract confuses characters that look alike: ``x`` for ``*``, ``l`` or
+``|`` for ``1``, ``O`` for ``0``, ``S`` for ``5`` and so on.  Instead of
+replacing such characters everywhere, :func:`correct_expression` treats each
+one as a choice between keeping it and the rewrites listed in
+:data:`CONFUSIONS`, each with a cost.  Candidate strings are tried in order
+of increasing total cost, and the first one that the parser accepts wins, so
+``2x3`` becomes ``2*3`` while ``x = 5`` is left alone.
+
+Costs are lowered when a rewrite fits the lexer token class of its
+neighbours: a digit next to digits, or an operator between two operands.
+At most ``max_attempts`` candidates are parsed, so the cost per string is
+bounded by ``max_attempts`` times its length.
+"""
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Container, Optional
+
+from compiler.parser import AST, BinOp, Assignment, Var
+from compiler.pratt import parse
+from error_handler import LexerError, ParserError
+
+# Unambiguous look-alikes, always rewritten before the search.
+CANONICAL = str.maketrans({
+    "×": "*", "÷": "/", "−": "-", "–": "-", "—": "-", "‐": "-",
+    "（": "(", "）": ")", "＝": "=", "＋": "+", "\n": " ", "\r": " ", "\t": " ",
+})
+
+# character -> ((replacement, cost), ...); "" deletes the character.
+CONFUSIONS: dict[str, tuple[tuple[str, float], ...]] = {
+    "x": (("*", 1.0),), "X": (("*", 1.0),),
+    "l": (("1", 1.0),), "I": (("1", 1.0),), "|": (("1", 1.0),), "i": (("1", 1.5),),
+    "!": (("1", 1.5),), "]": ((")", 1.0), ("1", 2.5)), "[": (("(", 1.0),),
+    "O": (("0", 1.0),), "o": (("0", 1.0),), "D": (("0", 1.5),), "Q": (("0", 1.5),),
+    "S": (("5", 1.0),), "s": (("5", 1.5),), "Z": (("2", 1.0),), "z": (("2", 1.5),),
+    "B": (("8", 1.0),), "g": (("9", 1.5),), "q": (("9", 1.5),), "G": (("6", 1.5),),
+    "b": (("6", 1.5),), "T": (("7", 1.5),), "A": (("4", 1.5),),
+    "t": (("+", 1.0),), "_": (("-", 1.0),), "~": (("-", 1.0),),
+    "{": (("(", 1.0),), "}": ((")", 1.0),), ":": (("/", 1.5),), "\\": (("/", 1.0),),
+    ",": ((".", 1.0), ("", 1.0)), "'": (("", 1.0),), "`": (("", 1.0),),
+    '"': (("", 1.0),), "‘": (("", 1.0),), "’": (("", 1.0),), "“": (("", 1.0),),
+    "”": (("", 1.0),), ";": (("", 1.0),), "?": (("7", 2.0), ("", 1.5)),
+}
+
+# Lexer token classes of single characters, used to score rewrites in context.
+DIGIT, LETTER, OPERATOR, OPEN, CLOSE, OTHER = range(6)
+_OPERATORS = frozenset("+-*/=")
+
+
+def _char_class(ch: str) -> int:
+    if ch.isdecimal() or ch == ".":
+        return DIGIT
+    if ch.isascii() and (ch.isalpha() or ch == "_"):
+        return LETTER
+    if ch in _OPERATORS:
+        return OPERATOR
+    if ch == "(":
+        return OPEN
+    if ch == ")":
+        return CLOSE
+    return OTHER
+
+
+_LEXABLE = frozenset("0123456789.+-*/=() abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+_OPERAND_BEFORE = frozenset((DIGIT, LETTER, CLOSE))
+_OPERAND_AFTER = frozenset((DIGIT, LETTER, OPEN))
+
+
+@dataclass
+class Correction:
+    """Result of :func:`correct_expression`.
+
+    ``valid`` is ``False`` when no candidate within the budget parsed; ``text``
+    is then the normalised input.
+    """
+
+    text: str
+    cost: float
+    attempts: int
+    valid: bool
+
+
+def _neighbour_class(text: str, index: int, step: int) -> int:
+    index += step
+    while 0 <= index < len(text) and text[index] == " ":
+        index += step
+    return _char_class(text[index]) if 0 <= index < len(text) else OTHER
+
+
+def _options(text: str, index: int) -> list[tuple[float, str]]:
+    """Cost-sorted choices for ``text[index]``, keeping it first if it lexes."""
+    ch = text[index]
+    before = _neighbour_class(text, index, -1)
+    after = _neighbour_class(text, index, 1)
+    options = [(0.0, ch)] if ch in _LEXABLE else []
+    for replacement, cost in CONFUSIONS.get(ch, ()):
+        kind = _char_class(replacement) if replacement else OTHER
+        if kind == DIGIT and DIGIT in (before, after):
+            cost *= 0.5
+        elif kind == OPERATOR and before in _OPERAND_BEFORE and after in _OPERAND_AFTER:
+            cost *= 0.5
+        options.append((cost, replacement))
+    if not options:
+        options.append((2.0, ""))  # unknown junk: drop it
+    options.sort()
+    return options
+
+
+def _reads_only(node: AST, names: Container[str]) -> bool:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Var):
+            if current.name not in names:
+                return False
+        elif isinstance(current, BinOp):
+            stack.append(current.left)
+            stack.append(current.right)
+        elif isinstance(current, Assignment):
+            stack.append(current.value)
+    return True
+
+
+def correct_expression(text: str, *, names: Optional[Container[str]] = None,
+                       max_attempts: int = 64, max_positions: int = 32) -> Correction:
+    """Return the cheapest rewrite of ``text`` that parses.
+
+    ``names`` restricts which variables a candidate may read (assignment
+    targets are always allowed); ``None`` accepts any identifier.  At most
+    ``max_attempts`` candidates are parsed, and only the first
+    ``max_positions`` ambiguous characters are searched; later ones take
+    their cheapest option.
+    """
+    text = " ".join(text.translate(CANONICAL).split())
+    ambiguous = [i for i, ch in enumerate(text) if ch in CONFUSIONS or ch not in _LEXABLE]
+    positions = ambiguous[:max_positions]
+    choices = [_options(text, i) for i in positions]
+    fixed = list(text)
+    for i in ambiguous[max_positions:]:
+        fixed[i] = _options(text, i)[0][1]
+
+    def build(state: tuple[int, ...]) -> str:
+        chars = fixed.copy()
+        for position, options, pick in zip(positions, choices, state):
+            chars[position] = options[pick][1]
+        return "".join(chars)
+
+    # Best-first enumeration of choice vectors: each successor advances one
+    # position to its next more expensive option.
+    start = (0,) * len(positions)
+    heap = [(sum((options[0][0] for options in choices), 0.0), start)]
+    seen = {start}
+    attempts = 0
+    while heap and attempts < max_attempts:
+        cost, state = heapq.heappop(heap)
+        candidate = build(state)
+        attempts += 1
+        try:
+            tree = parse(candidate)
+        except (LexerError, ParserError):
+            tree = None
+        if tree is not None and (names is None or _reads_only(tree, names)):
+            return Correction(" ".join(candidate.split()), cost, attempts, True)
+        for i, pick in enumerate(state):
+            if pick + 1 < len(choices[i]):
+                successor = state[:i] + (pick + 1,) + state[i + 1:]
+                if successor not in seen:
+                    seen.add(successor)
+                    delta = choices[i][pick + 1][0] - choices[i][pick][0]
+                    heapq.heappush(heap, (cost + delta, successor))
+    return Correction(text, 0.0, attempts, False)
+
+
+def correct(text: str, **kwargs) -> str:
+    """Shorthand for ``correct_expression(text, **kwargs).text``."""
+    return correct_expression(text, **kwargs).text
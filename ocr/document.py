@@ -0,0 +1,168 @@
+"""Document mode: OCR a page of statements line by line.
+
+:func:`get_expression_from_image` treats an image as one expression, so a
+worksheet with ``a = 2`` on one line and ``b = a * 3`` on the next comes
+back as a single string that does not parse.  :func:`read_document` instead
+splits the cleaned page into text lines with
+:func:`~utils.image_cleaner.split_lines` and OCRs every line as a single
+text line (``--psm 7``) on a thread pool, so a page takes roughly as long as
+its slowest line.  :func:`evaluate_document` then corrects, parses and
+evaluates the lines in order against one :class:`SymbolTable`.
+
+OCR runs concurrently only if the engine allows it: :class:`PytesseractEngine`
+starts a process per call and :class:`WorkerPoolEngine` hands each call to an
+idle worker, while the single in-process :class:`TesserocrEngine` serialises
+calls.  Set ``ITC_OCR_WORKERS`` (with ``tesserocr`` installed) to get a pool.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from compiler.evaluator import evaluate
+from compiler.parser import parse
+from error_handler import EvaluationError, LexerError, ParserError, format_error
+from symbol_table import SymbolTable
+from utils.image_cleaner import clean_image, load_image, split_lines
+from utils.metrics import get_metrics
+
+from .correction import correct_expression
+from .extract_text import ImageInput, OCREngine, get_default_engine
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .cache import OCRCache
+
+LINE_CONFIG = "--psm 7"
+DOCUMENT_SETTINGS = {"mode": "document", "preprocess": "clean_image", "config": LINE_CONFIG,
+                     "segmentation": "projection"}
+
+
+@dataclass
+class LineResult:
+    """Outcome of one text line of a document.
+
+    ``text`` is the corrected statement, ``error`` a message formatted with
+    :func:`~error_handler.format_error` when it failed to parse or evaluate.
+    """
+
+    line: int
+    text: str
+    value: Optional[Any] = None
+    error: Optional[str] = None
+
+
+def _pool_size(engine: OCREngine, lines: int, workers: Optional[int]) -> int:
+    if workers is None:
+        workers = getattr(engine, "size", None) or os.cpu_count() or 1
+    return max(1, min(workers, lines))
+
+
+def ocr_lines(images: Sequence[Any], *, engine: Optional[OCREngine] = None,
+              workers: Optional[int] = None) -> list[Optional[str]]:
+    """OCR each line image concurrently and return the texts in input order.
+
+    Whitespace is normalised; a line whose OCR raised (a crashed worker, a
+    Tesseract error) comes back as ``None`` and is counted as an ``ocr``
+    error.  ``workers`` defaults to the engine's pool size or the CPU count.
+    """
+    engine = engine or get_default_engine()
+    if engine is None or not images:
+        return []
+    metrics = get_metrics()
+
+    def read(image: Any) -> Optional[str]:
+        try:
+            return " ".join(engine.image_to_string(image, config=LINE_CONFIG).split())
+        except Exception as exc:
+            metrics.error(exc, "ocr")
+            return None
+
+    size = _pool_size(engine, len(images), workers)
+    if size == 1:
+        return [read(image) for image in images]
+    with ThreadPoolExecutor(max_workers=size, thread_name_prefix="itc-line") as pool:
+        return list(pool.map(read, images))
+
+
+def read_document(src: ImageInput, *, engine: Optional[OCREngine] = None,
+                  workers: Optional[int] = None,
+                  cache: "OCRCache | None" = None) -> Optional[list[Optional[str]]]:
+    """Return the raw OCR text of every line in ``src``, top to bottom.
+
+    ``None`` means the image could not be loaded or cleaned, or no OCR
+    engine is available; lines whose OCR failed are ``None``.  With
+    ``cache`` the line texts are stored under the content hash of ``src``,
+    unless any of them failed.
+    """
+    engine = engine or get_default_engine()
+    if engine is None:
+        return None
+    key = cache.key_for(src, DOCUMENT_SETTINGS) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached.split("\n") if cached else []
+
+    metrics = get_metrics()
+    with metrics.stage("load"):
+        image = load_image(src)
+    if image is None:
+        return None
+    with metrics.stage("clean"):
+        cleaned = clean_image(image)
+    if cleaned is None:
+        return None
+    crops = [crop for _, crop in split_lines(cleaned)]
+    with metrics.stage("ocr"):
+        texts = ocr_lines(crops, engine=engine, workers=workers)
+
+    if cache is not None and None not in texts:
+        cache.put(key, "\n".join(texts))  # type: ignore[arg-type]
+    return texts
+
+
+def evaluate_lines(texts: Sequence[Optional[str]],
+                   symbols: SymbolTable | None = None) -> list[LineResult]:
+    """Correct, parse and evaluate ``texts`` in order into a shared table.
+
+    A variable assigned on one line can be read on the following ones, and
+    look-alike correction only reads names that are already defined.  Blank
+    lines are skipped; a failing line (including a ``None`` one whose OCR
+    failed) is reported and the rest still run.
+    """
+    symbols = symbols if symbols is not None else SymbolTable()
+    metrics = get_metrics()
+    results = []
+    for lineno, raw in enumerate(texts, start=1):
+        if raw is None:
+            results.append(LineResult(lineno, "", error=format_error(lineno, "OCR failed")))
+            continue
+        if not raw.strip():
+            continue
+        text = correct_expression(raw, names=symbols).text
+        result = LineResult(lineno, text)
+        try:
+            with metrics.stage("parse"):
+                tree = parse(text, backend="pratt")
+            with metrics.stage("evaluate"):
+                result.value = evaluate(tree, symbols)
+        except (LexerError, ParserError, EvaluationError, ZeroDivisionError) as exc:
+            result.error = format_error(lineno, str(exc))
+        results.append(result)
+    return results
+
+
+def evaluate_document(src: ImageInput, symbols: SymbolTable | None = None, *,
+                      engine: Optional[OCREngine] = None, workers: Optional[int] = None,
+                      cache: "OCRCache | None" = None) -> Optional[list[LineResult]]:
+    """OCR every line of ``src`` in parallel and evaluate them in order.
+
+    Returns one :class:`LineResult` per non-blank line, or ``None`` when the
+    image could not be read.
+    """
+    texts = read_document(src, engine=engine, workers=workers, cache=cache)
+    if texts is None:
+        return None
+    return evaluate_lines(texts, symbols)
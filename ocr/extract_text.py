@@ -1,82 +1,390 @@
-"""Tesseract OCR helper for extracting math expressions from images."""
+"""Tesseract OCR helper for extracting math expressions from images.
+
+OCR goes through an :class:`OCREngine`.  :class:`PytesseractEngine` starts a
+``tesseract`` process per image; :class:`TesserocrEngine` (when the optional
+``tesserocr`` bindings are installed) keeps one initialised engine in memory;
+:class:`WorkerPoolEngine` runs a pool of persistent worker processes, each
+holding its own initialised engine, and hands images to them in memory.
+"""
 from __future__ import annotations
 
-from typing import Optional, Union
+import multiprocessing
+import os
+import queue
+import shlex
+import threading
+import warnings
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+from utils.image_cleaner import clean_image, is_preprocessed, load_image
+from utils.lazy import lazy_import
+
+from .correction import correct_expression
+
+# OCR backends are imported on first use; see :mod:`utils.lazy`.
+pytesseract = lazy_import("pytesseract", globals())
+Image = lazy_import("PIL.Image", globals())
+np = lazy_import("numpy", globals(), "np")
+tesserocr = lazy_import("tesserocr", globals())
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .cache import OCRCache
+
+# A path, encoded image bytes/buffer or a decoded ndarray.
+ImageInput = Union[str, bytes, bytearray, memoryview, "np.ndarray"]
+
+# Settings folded into cache keys; change them whenever the OCR or the
+# preprocessing applied before it changes so stale entries are not reused.
+TEXT_SETTINGS = {"mode": "text", "preprocess": None, "config": ""}
+EXPRESSION_SETTINGS = {"mode": "expression", "preprocess": "clean_image", "config": "",
+                       "correction": "confusion"}
+PREPROCESSED_SETTINGS = {**EXPRESSION_SETTINGS, "preprocess": None}
+
+
+class OCREngine:
+    """Interface for OCR backends: image (PIL or ndarray) in, text out."""
+
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources held by the engine."""
+
+
+class PytesseractEngine(OCREngine):
+    """Run the ``tesseract`` executable once per image via :mod:`pytesseract`."""
+
+    def __init__(self, lang: str = "eng") -> None:
+        if not pytesseract:  # pragma: no cover - dependency not installed
+            raise RuntimeError("pytesseract is required for PytesseractEngine")
+        self.lang = lang
+
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        return pytesseract.image_to_string(image, lang=self.lang, config=config)
+
+
+def _parse_config(config: str) -> tuple[Optional[int], dict[str, str]]:
+    """Split a Tesseract CLI ``config`` string into a PSM and ``-c`` variables."""
+    psm: Optional[int] = None
+    variables: dict[str, str] = {}
+    args = shlex.split(config)
+    for i, arg in enumerate(args):
+        if arg == "--psm" and i + 1 < len(args):
+            psm = int(args[i + 1])
+        elif arg == "-c" and i + 1 < len(args) and "=" in args[i + 1]:
+            key, value = args[i + 1].split("=", 1)
+            variables[key] = value
+    return psm, variables
+
+
+class TesserocrEngine(OCREngine):
+    """Keep one Tesseract API instance initialised and feed it images in memory."""
+
+    def __init__(self, lang: str = "eng") -> None:
+        if not tesserocr or not Image:  # pragma: no cover - dependency not installed
+            raise RuntimeError("tesserocr is required for TesserocrEngine")
+        self.lang = lang
+        self._api = tesserocr.PyTessBaseAPI(lang=lang)
+        self._lock = threading.Lock()
+
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        if np and isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        psm, variables = _parse_config(config)
+        with self._lock:
+            self._api.SetPageSegMode(psm if psm is not None else tesserocr.PSM.AUTO)
+            # Variables persist on the API object, so restore them afterwards.
+            previous = {key: self._api.GetVariableAsString(key) for key in variables}
+            for key, value in variables.items():
+                self._api.SetVariable(key, value)
+            try:
+                self._api.SetImage(image)
+                text = self._api.GetUTF8Text()
+            finally:
+                for key, value in previous.items():
+                    if value is not None:
+                        self._api.SetVariable(key, value)
+        return text
+
+    def close(self) -> None:
+        self._api.End()
+
+
+def default_engine_factory() -> OCREngine:
+    """Return the fastest in-process engine available."""
+    if tesserocr:
+        return TesserocrEngine()
+    return PytesseractEngine()
+
+
+def _worker_main(conn: Any, factory: Callable[[], OCREngine]) -> None:
+    engine = factory()
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            kind, image, config = message
+            if kind == "ping":
+                conn.send(("ok", None))
+                continue
+            try:
+                conn.send(("ok", engine.image_to_string(image, config=config)))
+            except Exception as exc:
+                conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        engine.close()
+
+
+class _Worker:
+    def __init__(self, context: Any, factory: Callable[[], OCREngine]) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, factory), daemon=True)
+        self.process.start()
+        child.close()
+
+    def request(self, message: tuple, timeout: Optional[float]) -> tuple[str, Any]:
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            raise TimeoutError("OCR worker did not answer in time")
+        return self.conn.recv()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
 
-try:
-    import pytesseract
-    from PIL import Image
-    import numpy as np
-    from utils.image_cleaner import clean_image
-except ImportError:  # pragma: no cover - environment might not have deps
-    pytesseract = None  # type: ignore
-    Image = None  # type: ignore
-    np = None  # type: ignore
 
+class WorkerPoolEngine(OCREngine):
+    """Pool of persistent OCR worker processes.
 
-ImageInput = Union[str, "np.ndarray"]
+    Each worker builds its engine with ``factory`` once and then serves
+    requests sent over a pipe.  With :class:`TesserocrEngine` workers,
+    language-model loading is paid once per worker instead of once per
+    image; the default factory therefore requires ``tesserocr``, because
+    :class:`PytesseractEngine` workers would still start a process and write
+    a temp file per image, plus the pipe round trip.  Calls are thread-safe:
+    each borrows an idle worker for the duration of the request.  A worker
+    that crashes or exceeds ``timeout`` seconds is replaced and the request
+    retried once on the fresh worker.  Every ``health_interval`` seconds a
+    background thread runs :meth:`health_check` on the idle workers.
+    """
 
+    def __init__(self, size: Optional[int] = None, *,
+                 factory: Callable[[], OCREngine] = default_engine_factory,
+                 timeout: Optional[float] = 60.0,
+                 health_interval: Optional[float] = 30.0) -> None:
+        if factory is default_engine_factory and not tesserocr:
+            raise RuntimeError("WorkerPoolEngine needs tesserocr; pytesseract workers "
+                               "would still start a tesseract process per image")
+        self.size = size or os.cpu_count() or 1
+        self.factory = factory
+        self.timeout = timeout
+        self.restarts = 0
+        self._context = multiprocessing.get_context()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: list[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(self.size):
+            worker = _Worker(self._context, factory)
+            self._workers.append(worker)
+            self._idle.put(worker)
+        self._stopped = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        if health_interval:
+            self._monitor = threading.Thread(target=self._monitor_health, args=(health_interval,),
+                                             name="itc-ocr-health", daemon=True)
+            self._monitor.start()
 
-def extract_text_from_image(image_path: str) -> Optional[str]:
-    """Return raw OCR text extracted from ``image_path``."""
-    if pytesseract is None or Image is None:
+    def _monitor_health(self, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            self.health_check()
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.process.kill()
+        worker.stop()
+        fresh = _Worker(self._context, self.factory)
+        with self._lock:
+            self._workers[self._workers.index(worker)] = fresh
+            self.restarts += 1
+        return fresh
+
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        if self._closed:
+            raise RuntimeError("OCR worker pool is closed")
+        if Image and np and isinstance(image, Image.Image):
+            image = np.asarray(image)  # arrays pickle faster than PIL images
+        worker = self._idle.get()
+        try:
+            for attempt in range(2):
+                try:
+                    status, payload = worker.request(("ocr", image, config), self.timeout)
+                    break
+                except (EOFError, OSError, TimeoutError) as exc:
+                    worker = self._replace(worker)
+                    if attempt:
+                        raise RuntimeError(f"OCR worker failed twice: {exc}") from exc
+        finally:
+            self._idle.put(worker)
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def health_check(self, timeout: float = 5.0) -> int:
+        """Ping every idle worker, replace unresponsive ones and return the healthy count."""
+        checked: list[_Worker] = []
+        healthy = 0
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if worker.process.is_alive() and worker.request(("ping", None, ""), timeout)[0] == "ok":
+                    healthy += 1
+                else:
+                    worker = self._replace(worker)
+            except (EOFError, OSError, TimeoutError):
+                worker = self._replace(worker)
+            checked.append(worker)
+        for worker in checked:
+            self._idle.put(worker)
+        return healthy
+
+    def close(self) -> None:
+        self._closed = True
+        self._stopped.set()
+        if self._monitor is not None:
+            self._monitor.join()
+        for worker in self._workers:
+            worker.stop()
+
+    def __enter__(self) -> "WorkerPoolEngine":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+_default_engine: Optional[OCREngine] = None
+
+
+def get_default_engine() -> Optional[OCREngine]:
+    """Return the process-wide OCR engine, or ``None`` if no backend is installed.
+
+    Set ``ITC_OCR_WORKERS`` to a positive number to use a
+    :class:`WorkerPoolEngine` of that size instead of an in-process engine.
+    The setting is ignored, with a warning, when ``tesserocr`` is missing.
+    """
+    global _default_engine
+    if _default_engine is None:
+        if not pytesseract and not tesserocr:
+            return None
+        workers = int(os.environ.get("ITC_OCR_WORKERS", "0") or 0)
+        if workers > 0 and not tesserocr:
+            warnings.warn("ITC_OCR_WORKERS is ignored without tesserocr; "
+                          "see requirements-optional.txt", RuntimeWarning, stacklevel=2)
+            workers = 0
+        _default_engine = WorkerPoolEngine(workers) if workers > 0 else default_engine_factory()
+    return _default_engine
+
+
+def set_default_engine(engine: Optional[OCREngine]) -> None:
+    """Replace the process-wide OCR engine used when none is passed explicitly."""
+    global _default_engine
+    _default_engine = engine
+
+
+def extract_text_from_image(image_path: str, *, cache: "OCRCache | None" = None,
+                            engine: Optional[OCREngine] = None) -> Optional[str]:
+    """Return raw OCR text extracted from ``image_path``.
+
+    When ``cache`` is given, results are looked up by the image's content hash
+    before running Tesseract and stored afterwards.  ``engine`` defaults to
+    :func:`get_default_engine`.
+    """
+    engine = engine or get_default_engine()
+    if engine is None or not Image:
         return None
+    key = cache.key_for(image_path, TEXT_SETTINGS) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
     try:
         img = Image.open(image_path)
     except Exception:
         return None
     try:
-        text = pytesseract.image_to_string(img)
+        text = engine.image_to_string(img)
     finally:
         img.close()
-    return text.strip()
+    text = text.strip()
+    if cache is not None:
+        cache.put(key, text)
+    return text
 
 
-def _load_image(src: ImageInput) -> Optional["Image.Image"]:
-    """Return a PIL image loaded from ``src`` which may be a path or ndarray."""
-    if Image is None:
+def _prepare_image(src: ImageInput, preprocessed: bool) -> Optional["np.ndarray"]:
+    """Decode ``src`` once and clean it unless it is already ``preprocessed``."""
+    if not np:
         return None
-    if isinstance(src, str):
-        try:
-            if np is not None:
-                arr = clean_image(src)
-                if arr is not None:
-                    return Image.fromarray(arr)
-            return Image.open(src)
-        except Exception:
-            return None
-    if np is not None and isinstance(src, np.ndarray):
-        try:
-            arr = clean_image(src)
-            if arr is not None:
-                return Image.fromarray(arr)
-            return Image.fromarray(src)
-        except Exception:
-            return None
-    return None
+    try:
+        img = load_image(src)
+        if img is None or preprocessed:
+            return img
+        return clean_image(img)
+    except Exception:
+        return None
+
 
+def get_expression_from_image(src: ImageInput, *, cache: "OCRCache | None" = None,
+                              engine: Optional[OCREngine] = None,
+                              preprocessed: Optional[bool] = None) -> Optional[str]:
+    """Return a cleaned math expression string extracted from ``src``.
 
-def get_expression_from_image(src: ImageInput) -> Optional[str]:
-    """Return a cleaned math expression string extracted from ``src``."""
-    if pytesseract is None:
+    ``src`` may be a path, encoded image bytes or any buffer, or an ndarray.
+    It is decoded once and the resulting array is handed to the OCR engine
+    directly.  ``preprocessed`` says whether ``src`` is already the output of
+    :func:`~utils.image_cleaner.clean_image`; such input is not cleaned again.
+    ``None`` detects it for arrays (binary single-channel ``uint8``).
+
+    When ``cache`` is given, results are looked up by the content hash of
+    ``src`` (file bytes or array data) before running Tesseract.  ``engine``
+    defaults to :func:`get_default_engine`.
+    """
+    engine = engine or get_default_engine()
+    if engine is None:
         return None
 
-    img = _load_image(src)
+    if preprocessed is None:
+        preprocessed = bool(np) and isinstance(src, np.ndarray) and is_preprocessed(src)
+    settings = PREPROCESSED_SETTINGS if preprocessed else EXPRESSION_SETTINGS
+    key = cache.key_for(src, settings) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached or None
+
+    img = _prepare_image(src, preprocessed)
     if img is None:
         return None
 
-    try:
-        text = pytesseract.image_to_string(img)
-    finally:
-        img.close()
-
-    # Remove whitespace and newlines
-    cleaned = text.replace("\n", " ").replace("\r", " ").strip()
-    cleaned = " ".join(cleaned.split())
+    text = engine.image_to_string(img)
 
-    # Common OCR corrections
-    replacements = {"x": "*", "X": "*", "l": "1"}
-    for old, new in replacements.items():
-        cleaned = cleaned.replace(old, new)
+    # Normalise whitespace and undo look-alike confusions the parser rejects.
+    cleaned = correct_expression(text, names=()).text
 
+    if cache is not None:
+        cache.put(key, cleaned)
     return cleaned or None
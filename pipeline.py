@@ -0,0 +1,76 @@
+"""Image ➡ record pipeline shared by the HTTP service and the video stream mode.
+
+:func:`compile_image` takes an encoded image or a decoded array and returns a
+JSON-ready record with the extracted ``expression``, the ``ast`` repr, the
+evaluated ``value``, an ``error`` message and per-stage ``timings``.
+:class:`StandInEngine` replaces Tesseract with fixed text for load tests.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from compiler.evaluator import evaluate
+from compiler.parser import parse
+from error_handler import EvaluationError, LexerError, ParserError
+from ocr.cache import OCRCache
+from ocr.extract_text import OCREngine, get_expression_from_image
+from symbol_table import SymbolTable
+from utils.image_cleaner import ImageSource, clean_image, load_image
+from utils.metrics import get_metrics
+
+DECODE_ERROR = "Could not decode image"
+
+
+class StandInEngine(OCREngine):
+    """OCR stand-in returning fixed ``text`` after sleeping ``latency`` seconds."""
+
+    def __init__(self, text: str = "1+2", latency: float = 0.0) -> None:
+        self.text = text
+        self.latency = latency
+
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.text
+
+
+def compile_image(data: ImageSource, engine: Optional[OCREngine] = None,
+                  cache: Optional[OCRCache] = None, *, adaptive: bool = False) -> dict[str, Any]:
+    """Run the full pipeline on encoded image ``data`` and return a JSON-ready record.
+
+    ``data`` may also be a decoded array.  Parsing uses the hand-written
+    backend, which is re-entrant and faster than PLY on short expressions.
+    """
+    record: dict[str, Any] = {"expression": None, "ast": None, "value": None,
+                              "error": None, "timings": {}}
+    timings = record["timings"]
+
+    metrics = get_metrics()
+    with metrics.stage("load", timings):
+        image = load_image(data)
+    if image is None:
+        record["error"] = DECODE_ERROR
+        metrics.error("ImageLoadError", "load")
+        return record
+    with metrics.stage("clean", timings):
+        cleaned = clean_image(image, adaptive=adaptive)
+
+    with metrics.stage("ocr", timings):
+        text = get_expression_from_image(cleaned, engine=engine, cache=cache, preprocessed=True)
+    record["expression"] = text
+    if not text:
+        record["error"] = "OCR failed or returned no text"
+        metrics.error("EmptyOCRResult", "ocr")
+        return record
+
+    try:
+        with metrics.stage("parse", timings):
+            ast = parse(text, backend="pratt")
+        record["ast"] = repr(ast)
+
+        with metrics.stage("evaluate", timings):
+            record["value"] = evaluate(ast, SymbolTable())
+    except (LexerError, ParserError, EvaluationError, ZeroDivisionError) as exc:
+        record["error"] = f"Failed to evaluate expression: {exc}"
+    return record
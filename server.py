@@ -0,0 +1,307 @@
+"""Asyncio HTTP service exposing the OCR ➡ parse ➡ evaluate pipeline.
+
+``POST /compile`` takes an encoded image (PNG, JPEG, ...) as the request body
+and answers with JSON holding the extracted ``expression``, the ``ast`` repr,
+the evaluated ``value``, an ``error`` message and per-stage ``timings``.
+``GET /health`` reports the admission queue depth and ``GET /metrics`` serves
+stage timings, cache hits, errors and queue counters in Prometheus format.
+
+Requests first enter a bounded admission queue; when it is full the server
+answers ``429`` straight away instead of letting latency grow without bound.
+Batcher tasks drain the queue in micro-batches (up to ``batch_size`` requests
+or whatever arrives within ``batch_window`` seconds) and run each batch in an
+executor, so blocking OCR never stalls the event loop.  Each request is
+answered as soon as its own image is compiled; identical uploads within a
+batch are compiled once.  A request that takes
+longer than ``timeout`` seconds is answered with ``504``.
+
+Run ``python server.py --stand-in-ocr "1+2"`` to load-test the service with
+:class:`StandInEngine` instead of Tesseract.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Optional
+
+from ocr.cache import OCRCache
+from ocr.extract_text import OCREngine, get_default_engine
+from pipeline import DECODE_ERROR, StandInEngine, compile_image
+from utils.metrics import Metrics, get_metrics, set_metrics
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    504: "Gateway Timeout",
+}
+
+
+class _Job:
+    __slots__ = ("data", "future", "abandoned")
+
+    def __init__(self, data: bytes, future: "asyncio.Future[dict[str, Any]]") -> None:
+        self.data = data
+        self.future = future
+        self.abandoned = False
+
+
+class CompileService:
+    """Admission queue, micro-batcher and HTTP front end for :func:`compile_image`.
+
+    ``concurrency`` batches run at once, each in its own executor job.
+    """
+
+    def __init__(self, engine: Optional[OCREngine] = None, *, cache: Optional[OCRCache] = None,
+                 max_queue: int = 64, batch_size: int = 8, batch_window: float = 0.005,
+                 timeout: float = 10.0, concurrency: int = 4,
+                 executor: Optional[Executor] = None) -> None:
+        self.engine = engine or get_default_engine()
+        self.cache = cache
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.executor = executor or ThreadPoolExecutor(max_workers=concurrency)
+        self.max_queue = max_queue
+        self.stats = {"accepted": 0, "rejected": 0, "timed_out": 0, "batches": 0}
+        self._queue: Optional["asyncio.Queue[_Job]"] = None
+        self._batchers: list["asyncio.Task[None]"] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # -- lifecycle --------------------------------------------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        """Start the batchers and listen on ``host:port`` (``port=0`` picks one)."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._batchers = [asyncio.create_task(self._batcher()) for _ in range(self.concurrency)]
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._batchers:
+            task.cancel()
+        await asyncio.gather(*self._batchers, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+
+    # -- batching ---------------------------------------------------------
+    def _run_batch(self, jobs: list[_Job], loop: asyncio.AbstractEventLoop) -> None:
+        """Compile ``jobs`` in one executor call, resolving each future as soon as it is done.
+
+        Batching buys one executor hand-off per batch rather than per request
+        and lets identical uploads in a batch (retries, clients polling the
+        same board) share one compilation.  No request waits for the rest of
+        its batch.
+        """
+        results: dict[bytes, dict[str, Any]] = {}
+        for job in jobs:
+            if job.abandoned:
+                continue  # client already got a 504
+            result = results.get(job.data)
+            if result is None:
+                try:
+                    result = compile_image(job.data, self.engine, self.cache)
+                except Exception as exc:
+                    result = {"expression": None, "ast": None, "value": None,
+                              "error": f"{type(exc).__name__}: {exc}", "timings": {}}
+                results[job.data] = result
+            loop.call_soon_threadsafe(self._resolve, job, result)
+
+    @staticmethod
+    def _resolve(job: _Job, result: dict[str, Any]) -> None:
+        if not job.future.done():
+            job.future.set_result(result)
+
+    async def _batcher(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(jobs) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    jobs.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self.stats["batches"] += 1
+            try:
+                await loop.run_in_executor(self.executor, self._run_batch, jobs, loop)
+            except Exception as exc:  # pragma: no cover - executor failure
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(exc)
+
+    async def submit(self, data: bytes) -> tuple[int, dict[str, Any]]:
+        """Queue ``data`` for compilation and return ``(status, body)``."""
+        assert self._queue is not None
+        job = _Job(data, asyncio.get_running_loop().create_future())
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            return 429, {"error": "Server busy, retry later"}
+        self.stats["accepted"] += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job.future), self.timeout)
+        except asyncio.TimeoutError:
+            job.abandoned = True
+            self.stats["timed_out"] += 1
+            return 504, {"error": f"Timed out after {self.timeout}s"}
+        return (400 if result["error"] == DECODE_ERROR else 200), result
+
+    # -- HTTP -------------------------------------------------------------
+    def prometheus(self) -> str:
+        """Pipeline metrics plus admission and batching counters in Prometheus format."""
+        assert self._queue is not None
+        lines = [get_metrics().prometheus().rstrip("\n")]
+        for name, value in self.stats.items():
+            metric = f"itc_server_{name}_total"
+            lines += [f"# HELP {metric} Requests or batches counted as {name}.",
+                      f"# TYPE {metric} counter", f"{metric} {value}"]
+        lines += ["# HELP itc_server_queue_depth Requests waiting in the admission queue.",
+                  "# TYPE itc_server_queue_depth gauge", f"itc_server_queue_depth {self._queue.qsize()}"]
+        return "\n".join(lines) + "\n"
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, Any]:
+        if path == "/compile":
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            if not body:
+                return 400, {"error": "Request body must be an encoded image"}
+            return await self.submit(body)
+        if path == "/metrics":
+            return 200, self.prometheus()
+        if path == "/health":
+            assert self._queue is not None
+            return 200, {"status": "ok", "queued": self._queue.qsize(), **self.stats}
+        return 404, {"error": f"No route for {path}"}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Image too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await self._route(method.upper(), target.split("?", 1)[0], body)
+                except Exception as exc:  # pragma: no cover - defensive
+                    status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Any,
+                       keep_alive: bool) -> None:
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload, default=str).encode(), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+
+async def serve(service: CompileService, host: str, port: int) -> None:
+    server = await service.start(host, port)
+    print(f"Serving on http://{host}:{service.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser_ = argparse.ArgumentParser(description=__doc__,
+                                      formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser_.add_argument("--host", default="127.0.0.1")
+    parser_.add_argument("--port", type=int, default=8000)
+    parser_.add_argument("--concurrency", type=int, default=4, help="batches compiled in parallel")
+    parser_.add_argument("--queue-size", type=int, default=64, help="admission queue bound")
+    parser_.add_argument("--batch-size", type=int, default=8)
+    parser_.add_argument("--batch-window", type=float, default=0.005, help="seconds to fill a batch")
+    parser_.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser_.add_argument("--no-metrics", action="store_true",
+                         help="disable per-stage instrumentation unless ITC_METRICS is set")
+    parser_.add_argument("--stand-in-ocr", metavar="TEXT",
+                         help="skip Tesseract and 'recognise' TEXT in every image")
+    parser_.add_argument("--stand-in-latency", type=float, default=0.0,
+                         help="seconds the stand-in OCR engine sleeps per image")
+    args = parser_.parse_args(argv)
+
+    if not args.no_metrics and not get_metrics().enabled:
+        set_metrics(Metrics())
+    engine = None
+    cache = None
+    if args.stand_in_ocr is not None:
+        engine = StandInEngine(args.stand_in_ocr, args.stand_in_latency)
+    else:
+        from ocr.cache import get_default_cache
+
+        cache = get_default_cache()
+    service = CompileService(engine, cache=cache, max_queue=args.queue_size,
+                             batch_size=args.batch_size, batch_window=args.batch_window,
+                             timeout=args.timeout, concurrency=args.concurrency)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:  # pragma: no cover - interactive shutdown
+        pass
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry
+    raise SystemExit(main())
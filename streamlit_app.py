@@ -1,73 +1,208 @@
 from __future__ import annotations
 
-import tempfile
-from pathlib import Path
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
 
 import streamlit as st
-from PIL import Image
 
-from utils.image_cleaner import preprocess_image
-from ocr.extract_text import get_expression_from_image
+from utils.image_cleaner import ImageSource, preprocess_image
+from ocr.cache import get_default_cache
+from ocr.extract_text import EXPRESSION_SETTINGS, get_expression_from_image
 from compiler import lexer  # noqa: F401 - register lexer tokens
-from compiler.parser import parser
+from compiler.parser import parse
 from compiler.evaluator import evaluate
-from ast.visualize_ast import get_ast_plot
+from ast.render import render_svg
 from symbol_table import SymbolTable
 
+# Stage names in execution order, used for progress reporting.
+STAGES = ("clean", "ocr", "parse", "render", "evaluate")
 
-def run_pipeline(img_path: str) -> tuple[str | None, object | None, float | None]:
-    """Run OCR ➡ parse ➡ evaluate pipeline on ``img_path``."""
-    cleaned = preprocess_image(img_path)
+Progress = Callable[[str, float], None]
+
+# Compile jobs kept per session; finished ones are cheap to redo from the stage caches.
+MAX_JOBS = 8
+
+
+def run_pipeline(img: ImageSource) -> tuple[str | None, object | None, float | None]:
+    """Run OCR ➡ parse ➡ evaluate pipeline on ``img`` (a path, bytes or array)."""
+    cleaned = preprocess_image(img)
     if cleaned is None:
         return None, None, None
 
-    expr = get_expression_from_image(cleaned)
+    expr = get_expression_from_image(cleaned, cache=get_default_cache(), preprocessed=True)
     if not expr:
         return None, None, None
 
     symbols = SymbolTable()
     try:
-        ast = parser.parse(expr)
+        ast = parse(expr)
         result = evaluate(ast, symbols)
         return expr, ast, result
     except Exception:
         return expr, None, None
 
 
+def upload_digest(data: bytes) -> str:
+    """Content hash identifying an upload across reruns and sessions."""
+    return hashlib.sha256(data).hexdigest()
+
+
+# Each stage is cached by the upload digest (or the expression derived from it)
+# plus its parameters; arguments starting with ``_`` are not hashed by Streamlit.
+@st.cache_data(show_spinner=False, max_entries=32)
+def clean_stage(digest: str, adaptive: bool, _data: bytes):
+    return preprocess_image(_data, adaptive=adaptive)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def ocr_stage(digest: str, adaptive: bool, _data: bytes) -> Optional[str]:
+    cache = get_default_cache()
+    key = cache.key_for(_data, {**EXPRESSION_SETTINGS, "adaptive": adaptive})
+    expr = cache.get(key)
+    if expr is None:
+        cleaned = clean_stage(digest, adaptive, _data)
+        expr = get_expression_from_image(cleaned, preprocessed=True) if cleaned is not None else None
+        if expr:
+            cache.put(key, expr)
+    return expr or None
+
+
+# The hand-written backend is faster than PLY on short expressions.
+@st.cache_data(show_spinner=False, max_entries=256)
+def parse_stage(expr: str):
+    return parse(expr, backend="pratt")
+
+
+# Rendering is cached by the tree's structural hash inside :mod:`ast.render`.
+def render_stage(expr: str) -> str:
+    return render_svg(parse_stage(expr))
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def evaluate_stage(expr: str):
+    return evaluate(parse_stage(expr), SymbolTable())
+
+
+@dataclass
+class CompileResult:
+    """Outputs of :func:`compile_upload`; ``error`` is the message of the stage that failed."""
+
+    expression: Optional[str] = None
+    ast: object = None
+    plot: Optional[str] = None
+    value: object = None
+    error: Optional[str] = None
+
+
+def compile_upload(data: bytes, *, adaptive: bool = False,
+                   progress: Optional[Progress] = None) -> CompileResult:
+    """Run every stage on the uploaded ``data``, reporting ``(stage, fraction)``."""
+    report = progress or (lambda stage, fraction: None)
+    digest = upload_digest(data)
+    result = CompileResult()
+
+    report("clean", 0.0)
+    if clean_stage(digest, adaptive, data) is None:
+        result.error = "Could not decode image."
+        return result
+    report("ocr", 1 / len(STAGES))
+    result.expression = ocr_stage(digest, adaptive, data)
+    if result.expression is None:
+        result.error = "Could not extract expression from image."
+        return result
+
+    try:
+        report("parse", 2 / len(STAGES))
+        result.ast = parse_stage(result.expression)
+        report("render", 3 / len(STAGES))
+        result.plot = render_stage(result.expression)
+        report("evaluate", 4 / len(STAGES))
+        result.value = evaluate_stage(result.expression)
+    except Exception as exc:
+        result.error = str(exc)
+    report("done", 1.0)
+    return result
+
+
+@dataclass
+class CompileJob:
+    """A :func:`compile_upload` call running on the background executor."""
+
+    future: "Future[CompileResult]"
+    stage: str = "queued"
+    fraction: float = 0.0
+
+    def update(self, stage: str, fraction: float) -> None:
+        self.stage, self.fraction = stage, fraction
+
+
+@st.cache_resource
+def _executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="compile")
+
+
+def submit_compile(data: bytes, *, adaptive: bool = False) -> CompileJob:
+    """Start compiling ``data`` off the script thread and return the job."""
+    job = CompileJob(Future())
+    job.future = _executor().submit(compile_upload, data, adaptive=adaptive, progress=job.update)
+    return job
+
+
+def _job_for(data: bytes, adaptive: bool) -> CompileJob:
+    # Jobs survive reruns, so widget interactions re-attach to running work.
+    # Only the MAX_JOBS most recently used are kept.
+    jobs: OrderedDict = st.session_state.setdefault("compile_jobs", OrderedDict())
+    key = (upload_digest(data), adaptive)
+    job = jobs.get(key)
+    if job is None or (job.future.done() and job.future.exception() is not None):
+        job = jobs[key] = submit_compile(data, adaptive=adaptive)
+    jobs.move_to_end(key)
+    while len(jobs) > MAX_JOBS:
+        jobs.popitem(last=False)
+    return job
+
+
+def _wait(job: CompileJob) -> CompileResult:
+    if not job.future.done():
+        bar = st.progress(job.fraction, text="Compiling…")
+        while not job.future.done():
+            bar.progress(job.fraction, text=f"Running {job.stage}…")
+            time.sleep(0.05)
+        bar.empty()
+    return job.future.result()
+
+
 def main() -> None:
     st.title("Image-to-Code Compiler")
     st.write("Upload an image containing a math expression. The app will OCR, parse, and evaluate it.")
 
     uploaded = st.file_uploader("Choose an image", type=["png", "jpg", "jpeg"])
-    if uploaded is not None:
-        img = Image.open(uploaded)
-        st.image(img, caption="Uploaded Image", use_column_width=True)
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(uploaded.name).suffix) as tmp:
-            img.save(tmp.name)
-            tmp_path = tmp.name
-
-        cleaned = preprocess_image(tmp_path)
-        expr = get_expression_from_image(cleaned) if cleaned is not None else None
-
-        if expr is None:
-            st.error("Could not extract expression from image.")
-            return
-
-        st.text_area("Extracted code", expr, height=100)
-        if st.button("Compile"):
-            symbols = SymbolTable()
-            try:
-                ast = parser.parse(expr)
-                plot = get_ast_plot(ast)
-                st.image(plot, caption="AST")
-                result = evaluate(ast, symbols)
-                st.success(f"Result: {result}")
-            except Exception as exc:
-                st.error(str(exc))
-        Path(tmp_path).unlink(missing_ok=True)
+    if uploaded is None:
+        return
+    data = uploaded.getvalue()
+    st.image(data, caption="Uploaded Image", use_column_width=True)
+    adaptive = st.checkbox("Crop to text and scale by glyph height", value=False)
+
+    # Compilation starts as soon as the image arrives, so pressing Compile on
+    # an already processed upload only displays cached results.
+    result = _wait(_job_for(data, adaptive))
+    if result.expression is None:
+        st.error(result.error or "Could not extract expression from image.")
+        return
+
+    st.text_area("Extracted code", result.expression, height=100)
+    if st.button("Compile"):
+        if result.plot is not None:
+            st.image(result.plot, caption="AST")
+        if result.error:
+            st.error(result.error)
+        else:
+            st.success(f"Result: {result.value}")
 
 
 if __name__ == "__main__":
     main()
-
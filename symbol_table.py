@@ -5,23 +5,35 @@ class SymbolTable:
         self._table: dict[str, object] = {}
         self.parent = parent
 
+    def __contains__(self, name: str) -> bool:
+        """Return whether ``name`` is declared in this scope (not its parents)."""
+        return name in self._table
+
     def add_variable(self, name: str, value: object) -> None:
         if name in self._table:
             raise KeyError(f"Variable '{name}' already declared")
         self._table[name] = value
 
     def get_value(self, name: str) -> object:
-        if name in self._table:
-            return self._table[name]
-        if self.parent is not None:
-            return self.parent.get_value(name)
+        table: SymbolTable | None = self
+        while table is not None:
+            if name in table._table:
+                return table._table[name]
+            table = table.parent
         raise KeyError(f"Variable '{name}' not found")
 
     def set_value(self, name: str, value: object) -> None:
-        if name in self._table:
-            self._table[name] = value
-            return
-        if self.parent is not None:
-            self.parent.set_value(name, value)
-            return
+        table: SymbolTable | None = self
+        while table is not None:
+            if name in table._table:
+                table._table[name] = value
+                return
+            table = table.parent
         raise KeyError(f"Variable '{name}' not found")
+
+    def assign(self, name: str, value: object) -> None:
+        """Bind ``name`` in this scope, declaring it if it is not local yet."""
+        if name in self._table:
+            self.set_value(name, value)
+        else:
+            self.add_variable(name, value)
@@ -0,0 +1,39 @@
+import pytest
+
+from compiler.parser import parse, BinOp, Number
+from compiler.pratt import tokenize
+from error_handler import LexerError, ParserError
+
+CORPUS = [
+    "1", "007", "1.50", "x", "a_1 = 2", "1 + 2 * 3", "(1 + 2) * 3", "8 / 4 / 2",
+    "10 - 3 - 2", "a = (b + 1) * (c - 2) / d", "1 * 2 + 3 * 4 - 5 / 6", "((x))",
+    "a\n+ 2", "\t1*\t2", "x = 1 + 2 * (3 - y) - 4 / z * 5",
+    # error cases
+    "", "   ", "1 +", "(1", "1)", "= 1", "a = b = 1", "-1", "1.", "1.5.2", "2a",
+    "a b", "1 $", "1 1 $", "1\r+2", "a==1", "()", "x=", "1 + \n", "a = $", "(1)$",
+]
+
+
+def _outcome(text, backend):
+    try:
+        return parse(text, backend=backend)
+    except (LexerError, ParserError) as exc:
+        return type(exc), str(exc)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_backends_agree(text):
+    assert _outcome(text, "pratt") == _outcome(text, "ply")
+
+
+def test_tokenize_matches_lexer_token_types():
+    assert [t[0] for t in tokenize("a = 12.5 * (b - 3)")] == [
+        "ID", "ASSIGN", "NUMBER", "TIMES", "LPAREN", "ID", "MINUS", "NUMBER", "RPAREN",
+    ]
+
+
+def test_long_left_chain_and_unknown_backend():
+    ast = parse("+".join(["1"] * 5000), backend="pratt")
+    assert isinstance(ast, BinOp) and ast.right == Number(1)
+    with pytest.raises(ValueError):
+        parse("1", backend="nope")
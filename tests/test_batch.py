@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from batch import iter_image_paths, process_batch, run_batch
+
+
+def test_iter_image_paths_sources_and_manifest(tmp_path):
+    (tmp_path / "imgs" / "sub").mkdir(parents=True)
+    for name in ("b.png", "a.jpg", "notes.txt", "sub/c.jpeg"):
+        (tmp_path / "imgs" / name).write_bytes(b"")
+    manifest = tmp_path / "list.txt"
+    manifest.write_text("# comment\n\nimgs/a.jpg\n")
+
+    paths = list(iter_image_paths([str(tmp_path / "imgs")], manifest=str(manifest)))
+    names = [p.replace(str(tmp_path), "") for p in paths]
+    assert names == ["/imgs/a.jpg", "/imgs/b.png", "/imgs/sub/c.jpeg", "/imgs/a.jpg"]
+
+    globbed = list(iter_image_paths([str(tmp_path / "imgs" / "*.png")]))
+    assert globbed == [str(tmp_path / "imgs" / "b.png")]
+
+
+def test_process_batch_preserves_order(tmp_path):
+    paths = [str(tmp_path / f"missing{i}.png") for i in range(7)]
+    records = list(process_batch(paths, workers=2, chunksize=2))
+    assert [r["path"] for r in records] == paths
+    assert all(r["error"] for r in records)
+
+
+def test_run_batch_writes_jsonl(tmp_path):
+    out = tmp_path / "out.jsonl"
+    total, failed = run_batch([str(tmp_path / "missing.png")], str(out), workers=1)
+    assert (total, failed) == (1, 1)
+    record = json.loads(out.read_text())
+    assert set(record) >= {"expression", "ast", "value", "error", "timings"}
+
+
+def test_batch_cli_fails_when_any_image_fails(tmp_path):
+    import main
+
+    out = str(tmp_path / "out.jsonl")
+    assert main.main(["--batch", str(tmp_path / "missing.png"), "--output", out, "--workers", "1"]) == 1
+
+
+def test_worker_initializer_loads_heavy_dependencies():
+    code = ("import sys, batch; batch._init_worker(); "
+            "print(all(m in sys.modules for m in ('cv2', 'numpy', 'PIL', 'pytesseract')))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[1],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "True"
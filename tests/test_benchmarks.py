@@ -0,0 +1,61 @@
+import json
+import random
+
+from benchmarks.generator import generate_cases, random_expression
+from benchmarks.run import compare, main, over_budget
+from compiler.evaluator import evaluate
+from compiler.parser import parse
+
+
+def _doc(**medians):
+    return {"results": {name: {"median": value} for name, value in medians.items()}}
+
+
+def test_random_expressions_have_requested_size_and_evaluate():
+    rng = random.Random(3)
+    for size in (0, 1, 5, 40):
+        for _ in range(20):
+            text = random_expression(rng, size)
+            assert sum(text.count(op) for op in "+-*/") == size
+            evaluate(parse(text))
+
+
+def test_generated_images_are_reproducible():
+    first, second = generate_cases(2, 4, seed=7), generate_cases(2, 4, seed=7)
+    assert [c.text for c in first] == [c.text for c in second]
+    assert (first[0].image == second[0].image).all()
+    assert first[0].image.ndim == 3 and first[0].image.dtype.name == "uint8"
+
+
+def test_compare_flags_regressions_with_per_benchmark_thresholds():
+    baseline = _doc(lexer=1.0, parser=1.0, clean_image=1.0)
+    current = _doc(lexer=1.05, parser=1.3, clean_image=1.3, evaluator=9.0)
+    results = {c.name: c for c in compare(current, baseline, threshold=0.1,
+                                          thresholds={"clean_image": 0.5})}
+    assert set(results) == {"lexer", "parser", "clean_image"}
+    assert not results["lexer"].regressed
+    assert results["parser"].regressed and abs(results["parser"].ratio - 1.3) < 1e-9
+    assert not results["clean_image"].regressed
+
+
+def test_cli_writes_json_and_fails_on_regression(tmp_path):
+    out = tmp_path / "out.json"
+    assert main(["--only", "evaluator", "--count", "3", "--repeat", "1", "--output", str(out)]) == 0
+    document = json.loads(out.read_text())
+    assert document["results"]["evaluator"]["items"] == 3
+
+    baseline = tmp_path / "baseline.json"
+    document["results"]["evaluator"]["median"] /= 100
+    baseline.write_text(json.dumps(document))
+    args = ["--only", "evaluator", "--count", "3", "--repeat", "1", "--output", str(out),
+            "--baseline", str(baseline)]
+    assert main(args) == 1
+    assert main(args + ["--threshold-for", "evaluator=1000"]) == 0
+
+
+def test_absolute_budgets():
+    current = _doc(startup=0.5, lexer=2.0)
+    assert over_budget(current, {"startup": 0.4}) == [("startup", 0.5, 0.4)]
+    assert over_budget(current, {"startup": 0.6, "parser": 0.1}) == []
+    out = ["--only", "evaluator", "--count", "3", "--repeat", "1", "--output", "-"]
+    assert main(out + ["--max-seconds", "evaluator=1e-12"]) == 1
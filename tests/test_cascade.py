@@ -0,0 +1,89 @@
+import numpy as np
+
+from ocr.cache import OCRCache, get_default_cache, set_default_cache
+from ocr.cascade import LINE_CONFIG, CascadeRunner, Tier
+from ocr.extract_text import OCREngine
+
+
+class TierEngine(OCREngine):
+    """Returns text by Tesseract config and records every call."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = []
+
+    def image_to_string(self, image, config=""):
+        self.calls.append((image.ndim, config))
+        return self.texts.get(config, "")
+
+
+def _image():
+    return np.full((20, 40, 3), 255, np.uint8)
+
+
+def test_stops_at_first_tier_that_parses():
+    prepared = []
+
+    def gray(image):
+        prepared.append("gray")
+        return image[..., 0]
+
+    tiers = (Tier("line", gray, LINE_CONFIG), Tier("block", gray, "--psm 6"),
+             Tier("never", gray, "--psm 11"))
+    engine = TierEngine({LINE_CONFIG: "2 + + )", "--psm 6": "2x3"})
+    result = CascadeRunner(tiers, engine=engine).run(_image())
+    assert (result.text, result.tier, result.valid) == ("2*3", "block", True)
+    assert [name for name, _, _ in result.attempts] == ["line", "block"]
+    assert prepared == ["gray"]  # shared preparation runs once
+    assert engine.calls == [(2, LINE_CONFIG), (2, "--psm 6")]
+
+
+class WhitelistEngine(OCREngine):
+    """Reads ``text`` the way Tesseract does under a whitelist: other glyphs become "x"."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def image_to_string(self, image, config=""):
+        allowed = config.partition("tessedit_char_whitelist=")[2]
+        if not allowed:
+            return self.text
+        return "".join(ch if ch in allowed or ch == " " else "x" for ch in self.text)
+
+
+def test_cheap_tier_keeps_identifiers():
+    result = CascadeRunner(engine=WhitelistEngine("y = 2*3")).run(_image())
+    assert (result.text, result.tier) == ("y = 2*3", "gray-line")
+
+
+def test_stats_summarise_tiers():
+    runner = CascadeRunner((Tier("a", lambda im: im, "a"), Tier("b", lambda im: im, "b")),
+                           engine=TierEngine({"a": "1+1"}))
+    runner.run(_image())
+    runner.engine.texts = {"a": "", "b": "+ * )"}
+    failed = runner.run(_image())
+    assert not failed.valid and failed.tier is None
+    summary = runner.stats.summary()
+    assert (summary["images"], summary["failed"]) == (2, 1)
+    assert summary["tiers"]["a"]["tried"] == 2 and summary["tiers"]["a"]["resolved"] == 1
+    assert summary["tiers"]["b"]["tried"] == 1 and summary["tiers"]["b"]["resolved"] == 0
+
+
+def test_process_image_record_reports_tier(tmp_path, monkeypatch):
+    import cv2
+
+    import main
+    from ocr import cascade
+
+    path = str(tmp_path / "expr.png")
+    cv2.imwrite(path, _image())
+    runner = CascadeRunner(engine=TierEngine({LINE_CONFIG: "4*5"}))
+    monkeypatch.setattr(cascade, "_default_runner", runner)
+    previous = get_default_cache()
+    set_default_cache(OCRCache(None))
+    try:
+        record = main.process_image_record(path, cascade=True)
+        assert (record["expression"], record["value"], record["tier"]) == ("4*5", 20, "gray-line")
+        assert main.process_image_record(path, cascade=True)["cached"]
+    finally:
+        set_default_cache(previous)
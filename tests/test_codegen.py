@@ -0,0 +1,31 @@
+import pytest
+
+from compiler.parser import parser
+from compiler.evaluator import evaluate
+from compiler.codegen import compile_ast
+from symbol_table import SymbolTable
+from error_handler import EvaluationError
+
+
+@pytest.mark.parametrize("text", ["1 + 2 * 3", "(8 - 2) / 4", "10 / (1 + 1) - 3 * 2"])
+def test_matches_evaluate(text):
+    ast = parser.parse(text)
+    assert compile_ast(ast)() == evaluate(ast)
+
+
+def test_reuse_with_different_bindings():
+    fn = compile_ast(parser.parse("a = x * 2 + y"))
+    for x, y in [(1, 2), (3.5, -1)]:
+        sym = SymbolTable()
+        sym.add_variable("x", x)
+        sym.add_variable("y", y)
+        assert fn(sym) == x * 2 + y
+        assert sym.get_value("a") == x * 2 + y
+
+
+def test_legacy_tuple_and_errors():
+    assert compile_ast(("*", ("+", 1, 2), 4))() == 12
+    with pytest.raises(EvaluationError):
+        compile_ast(parser.parse("b + 1"))()
+    with pytest.raises(ValueError):
+        compile_ast(("%", 1, 2))
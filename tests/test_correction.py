@@ -0,0 +1,37 @@
+import pytest
+
+from ocr.correction import correct, correct_expression
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("2x3", "2*3"),
+    ("2 × (3 — 1)", "2 * (3 - 1)"),
+    ("1O + 5", "10 + 5"),
+    ("(4+5]*2", "(4+5)*2"),
+    ("12,5 + 1", "12.5 + 1"),
+    ("3 ' + 4", "3 + 4"),
+    ("y = 3x2", "y = 3*2"),
+    ("  7\n/ 2 ", "7 / 2"),
+])
+def test_corrects_lookalikes(raw, expected):
+    assert correct(raw) == expected
+
+
+def test_keeps_text_that_already_parses():
+    result = correct_expression("x = 5")
+    assert (result.text, result.cost, result.attempts, result.valid) == ("x = 5", 0.0, 1, True)
+    assert correct("box + 1") == "box + 1"
+
+
+def test_names_restrict_identifiers():
+    assert correct("l+1") == "l+1"
+    assert correct("l+1", names=()) == "1+1"
+    assert correct("SO/Z", names=()) == "50/2"
+    assert correct("n = l*2", names=()) == "n = 1*2"
+
+
+def test_budget_is_bounded():
+    result = correct_expression("hello world" * 20, max_attempts=10)
+    assert not result.valid and result.attempts == 10
+    long = correct_expression("x" * 5000 + "+1", names=(), max_attempts=5)
+    assert long.attempts <= 5
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import numpy as np
+
+from ocr.cache import OCRCache
+from ocr.document import LINE_CONFIG, evaluate_document, evaluate_lines, ocr_lines
+from ocr.extract_text import OCREngine
+from symbol_table import SymbolTable
+from utils.image_cleaner import find_text_lines, split_lines
+
+
+def _page(widths, line_height=12, gap=20):
+    """White page with one black bar per line, ``widths`` pixels wide."""
+    page = np.full((gap + len(widths) * (line_height + gap), 400, 3), 255, np.uint8)
+    for i, width in enumerate(widths):
+        top = gap + i * (line_height + gap)
+        page[top:top + line_height, 20:20 + width] = 0
+    return page
+
+
+class WidthEngine(OCREngine):
+    """Reads a bar as the text whose index is its width in hundreds of pixels."""
+
+    def __init__(self, texts, delay=0.0):
+        self.texts = texts
+        self.delay = delay
+        self.threads = set()
+
+    def image_to_string(self, image, config=""):
+        assert config == LINE_CONFIG
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        columns = np.count_nonzero((image < 128).any(axis=0))
+        return self.texts[round(columns / 200) - 1] + "\n"
+
+
+def test_find_text_lines_merges_split_glyphs_and_drops_specks():
+    binary = np.full((100, 50), 255, np.uint8)
+    binary[10:20, 5:40] = 0
+    binary[40:44, 5:40] = 0  # "=" top bar
+    binary[46:50, 5:40] = 0  # "=" bottom bar
+    binary[80, 10] = 0  # speck
+    assert find_text_lines(binary) == [(10, 20), (40, 50)]
+    (first, crop), _ = split_lines(binary, margin=3)
+    assert first == (10, 20) and crop.shape[0] == 16
+    assert find_text_lines(np.full((5, 5), 255, np.uint8)) == []
+
+
+def test_ocr_lines_runs_concurrently_and_keeps_order():
+    images = [np.full((4, 4), i, np.uint8) for i in range(6)]
+
+    class IndexEngine(WidthEngine):
+        def image_to_string(self, image, config=""):
+            self.threads.add(threading.get_ident())
+            time.sleep(0.05)
+            return f" {int(image[0, 0])} "
+
+    engine = IndexEngine([])
+    start = time.perf_counter()
+    assert ocr_lines(images, engine=engine, workers=6) == [str(i) for i in range(6)]
+    assert time.perf_counter() - start < 0.25
+    assert len(engine.threads) > 1
+
+
+def test_evaluate_lines_shares_symbols_and_reports_errors():
+    symbols = SymbolTable()
+    results = evaluate_lines(["a = 2", "", "b = a x 3", "l + b", "b / 0", "b + 1"], symbols)
+    assert [r.line for r in results] == [1, 3, 4, 5, 6]
+    assert [r.value for r in results] == [2, 6, 7, None, 7]
+    assert results[1].text == "b = a * 3" and results[2].text == "1 + b"
+    assert results[3].error.startswith("Error at line 5")
+    assert symbols.get_value("b") == 6
+
+
+def test_evaluate_document_end_to_end():
+    engine = WidthEngine(["x = 4", "y = x * x", "y - x"])
+    cache = OCRCache(None)
+    results = evaluate_document(_page([100, 200, 300]), engine=engine, cache=cache)
+    assert [(r.text, r.value) for r in results] == [("x = 4", 4), ("y = x * x", 16), ("y - x", 12)]
+    again = evaluate_document(_page([100, 200, 300]), engine=WidthEngine([]), cache=cache)
+    assert [r.value for r in again] == [4, 16, 12]
+
+
+def test_failed_lines_are_reported_and_not_cached():
+    class FlakyEngine(WidthEngine):
+        def image_to_string(self, image, config=""):
+            if np.count_nonzero((image < 128).any(axis=0)) > 500:
+                raise RuntimeError("OCR worker failed twice")
+            return super().image_to_string(image, config)
+
+    cache = OCRCache(None)
+    results = evaluate_document(_page([100, 200, 300]), engine=FlakyEngine(["x = 4", "x + 1"]),
+                                cache=cache)
+    assert [r.value for r in results] == [4, 5, None]
+    assert results[2].error == "Error at line 3: OCR failed"
+    again = evaluate_document(_page([100, 200, 300]), engine=WidthEngine(["x = 1", "x", "x * 3"]),
+                              cache=cache)
+    assert [r.value for r in again] == [1, 1, 3]
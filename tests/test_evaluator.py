@@ -1,7 +1,10 @@
+import io
+import itertools
+
 import pytest
 
-from compiler.parser import parser
-from compiler.evaluator import evaluate
+from compiler.parser import parser, Assignment, BinOp, Number, Var
+from compiler.evaluator import evaluate, evaluate_iterative, evaluate_stream
 from symbol_table import SymbolTable
 from error_handler import EvaluationError
 
@@ -24,3 +27,54 @@ def test_undefined_variable_error():
     with pytest.raises(EvaluationError):
         ast = parser.parse("b + 1")
         evaluate(ast)
+
+
+def test_evaluate_stream_shares_symbols():
+    source = io.StringIO("a = 2\n\nb = a * 3\nb + 1\n")
+    results = list(evaluate_stream(source))
+    assert [(r.line, r.value) for r in results] == [(1, 2), (3, 6), (4, 7)]
+
+
+def test_evaluate_stream_errors_carry_line_numbers():
+    with pytest.raises(EvaluationError, match="line 2"):
+        list(evaluate_stream(["a = 1", "a / 0"]))
+    results = list(evaluate_stream("x = 1\ny +\nx", stop_on_error=False))
+    assert results[1].error == "Error at line 2: Syntax error at EOF"
+    assert results[2].value == 1
+
+
+def test_evaluate_stream_is_lazy():
+    lines = itertools.chain(["n = 0"], itertools.repeat("n = n + 1"))
+    results = itertools.islice(evaluate_stream(lines), 1000)
+    assert list(results)[-1].value == 999
+
+
+def test_deep_trees_do_not_recurse():
+    node = Number(1)
+    for _ in range(20000):
+        node = BinOp("+", node, Number(1))
+    assert evaluate(node) == 20001
+    assert evaluate_iterative(BinOp("-", Number(1), node)) == -20000
+
+
+@pytest.mark.parametrize("node", [
+    ("+", ("*", 2, 3), Var("x")),
+    Assignment("y", BinOp("/", Var("x"), Number(4))),
+    BinOp("add", Number(1), Number(2.5)),
+])
+def test_iterative_matches_recursive(node):
+    sym_a, sym_b = SymbolTable(), SymbolTable()
+    sym_a.add_variable("x", 2)
+    sym_b.add_variable("x", 2)
+    assert evaluate_iterative(node, sym_a) == evaluate(node, sym_b)
+    assert sym_a._table == sym_b._table
+
+
+def test_iterative_errors_match_recursive():
+    for node in [BinOp("%", Var("nope"), Number(1)), BinOp("%", Number(1), Number(2)), "bad"]:
+        errors = []
+        for fn in (evaluate, evaluate_iterative):
+            with pytest.raises(Exception) as info:
+                fn(node)
+            errors.append((info.type, str(info.value)))
+        assert errors[0] == errors[1]
@@ -0,0 +1,53 @@
+import pytest
+
+from compiler.evaluator import evaluate
+from compiler.flat import FlatArchive, encode, from_bytes, load
+from compiler.parser import parse
+from error_handler import EvaluationError
+from symbol_table import SymbolTable
+
+SOURCES = ["1 + 2 * 3", "(8 - 2) / 4", "a = 2.5 * 4", "b = a - 1", "a * b + 10 / a"]
+
+
+def test_round_trip_and_evaluate_match_dataclass_ast():
+    trees = [parse(text) for text in SOURCES]
+    archive = encode(trees)
+    assert len(archive) == len(SOURCES)
+    assert [expr.to_ast() for expr in archive] == trees
+    assert archive.names == ("a", "b")  # interned once each
+    assert archive.nbytes == 8 * (len(SOURCES) + 1) + 9 * len(archive.codes) + 8  # one float
+
+    expected_symbols = SymbolTable()
+    expected = [evaluate(tree, expected_symbols) for tree in trees]
+    symbols = SymbolTable()
+    assert archive.evaluate_all(symbols) == expected
+    assert symbols.get_value("b") == expected_symbols.get_value("b")
+
+
+def test_mmap_archive_evaluates_without_rebuilding(tmp_path):
+    path = tmp_path / "corpus.itcflat"
+    encode([parse(text) for text in SOURCES] + [("*", ("+", 1, 2), 4)]).dump(path)
+    with load(path) as archive:
+        assert isinstance(archive.codes, memoryview)
+        assert archive[-1].evaluate() == 12
+        assert archive.evaluate_all()[:2] == [7, 1.5]
+        assert from_bytes(path.read_bytes())[4].to_ast() == parse(SOURCES[4])
+
+
+def test_deep_trees_and_errors(tmp_path):
+    deep = "+".join(["1"] * 20000)
+    archive = encode([parse(deep, backend="pratt"), parse("y + 1"), parse("1 / 0")])
+    assert archive[0].evaluate() == 20000
+    with pytest.raises(EvaluationError, match="Undefined variable 'y'"):
+        archive[1].evaluate()
+    with pytest.raises(ZeroDivisionError):
+        archive[2].evaluate()
+    with pytest.raises(ValueError):
+        encode([("%", 1, 2)])
+    with pytest.raises(ValueError):
+        encode([2 ** 70])
+    bad = tmp_path / "bad.itcflat"
+    bad.write_bytes(b"not an archive" * 8)
+    with pytest.raises(ValueError, match="bad magic"):
+        load(bad)
+    assert isinstance(encode([]), FlatArchive) and len(from_bytes(encode([]).to_bytes())) == 0
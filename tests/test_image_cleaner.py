@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+
+from utils.image_cleaner import (
+    choose_scale,
+    clean_image,
+    decode_image,
+    estimate_glyph_height,
+    find_text_bbox,
+    is_preprocessed,
+)
+
+
+def _photo(shape, text, origin, scale, thickness):
+    img = np.full((*shape, 3), 200, np.uint8)
+    img += np.random.default_rng(0).integers(0, 20, img.shape, dtype=np.uint8)
+    cv2.putText(img, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), thickness)
+    return img
+
+
+def test_bbox_and_glyph_height_on_large_photo():
+    img = _photo((1200, 1600), "12 + 34", (600, 600), 2, 4)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    x, y, w, h = find_text_bbox(gray)
+    (tw, th), _ = cv2.getTextSize("12 + 34", cv2.FONT_HERSHEY_SIMPLEX, 2, 4)
+    assert 590 <= x <= 610 and 600 - th - 10 <= y <= 600
+    assert abs(w - tw) < 20
+    # getTextSize pads the height, digits themselves are ~75% of it.
+    assert 0.6 * th <= estimate_glyph_height(gray) <= th
+
+
+def test_adaptive_clean_crops_large_images_and_keeps_small_ones():
+    big = clean_image(_photo((1200, 1600), "1+2", (600, 600), 2, 4), adaptive=True)
+    assert big.size < 1200 * 1600 // 50
+    small = clean_image(_photo((40, 120), "1+2", (5, 30), 1, 2), adaptive=True)
+    assert small.shape[0] >= 40
+    assert set(np.unique(small)) <= {0, 255}
+
+
+def test_choose_scale_is_clamped():
+    assert choose_scale(None) == 2.0
+    assert choose_scale(8) == 4.0
+    assert choose_scale(640) == 0.5
+    assert choose_scale(16) == 2.0
+
+
+def test_decode_and_clean_from_bytes_match_array():
+    img = _photo((60, 160), "7*3", (5, 40), 1, 2)
+    ok, encoded = cv2.imencode(".png", img)
+    assert ok
+    data = encoded.tobytes()
+    assert np.array_equal(decode_image(data), img)
+    cleaned = clean_image(memoryview(data))
+    assert np.array_equal(cleaned, clean_image(img))
+    assert is_preprocessed(cleaned)
+    assert not is_preprocessed(img)
+
+
+
+def test_16_bit_bytes_and_paths_decode_alike(tmp_path):
+    img = _photo((60, 160), "7*3", (5, 40), 1, 2)[..., 0].astype(np.uint16) * 257
+    path = tmp_path / "deep.png"
+    cv2.imwrite(str(path), img)
+    data = path.read_bytes()
+    decoded = decode_image(data)
+    assert decoded.dtype == np.uint8 and np.array_equal(decoded, cv2.imread(str(path)))
+    assert np.array_equal(clean_image(data), clean_image(str(path)))
@@ -0,0 +1,87 @@
+import json
+import logging
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from error_handler import ParserError
+from main import process_image_record
+from ocr.cache import OCRCache, get_default_cache, set_default_cache
+from ocr.extract_text import OCREngine, get_default_engine, set_default_engine
+from utils.metrics import Metrics, get_metrics, logger, set_metrics
+
+
+class FixedEngine(OCREngine):
+    def __init__(self, text):
+        self.text = text
+
+    def image_to_string(self, image, config=""):
+        return self.text
+
+
+@pytest.fixture
+def metrics():
+    previous = (get_metrics(), get_default_cache(), get_default_engine())
+    instance = Metrics()
+    set_metrics(instance)
+    set_default_cache(OCRCache(None))
+    yield instance
+    set_metrics(previous[0])
+    set_default_cache(previous[1])
+    set_default_engine(previous[2])
+
+
+def test_disabled_metrics_only_fill_timings():
+    metrics = Metrics(enabled=False)
+    timings = {}
+    with metrics.stage("parse", timings):
+        pass
+    metrics.cache(True)
+    metrics.error(ParserError("x"), "parse")
+    assert set(timings) == {"parse"}
+    snap = metrics.snapshot()
+    assert snap["stages"] == {} and snap["cache"] == {"hits": 0, "misses": 0} and snap["errors"] == []
+
+
+def test_stages_errors_and_exports(caplog):
+    metrics = Metrics(track_memory=True)
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        with metrics.stage("clean"):
+            bytearray(1 << 20)
+        with pytest.raises(ParserError):
+            with metrics.stage("parse"):
+                raise ParserError("Syntax error at EOF")
+    metrics.cache(True)
+    metrics.cache(False)
+
+    snap = metrics.snapshot()
+    assert snap["stages"]["clean"]["count"] == 1
+    assert snap["stages"]["clean"]["peak_memory"] >= 1 << 20
+    assert snap["errors"] == [{"type": "ParserError", "stage": "parse", "count": 1}]
+    events = [json.loads(r.message) for r in caplog.records]
+    assert [e["stage"] for e in events] == ["clean", "parse"] and events[1]["error"] == "ParserError"
+
+    text = metrics.prometheus()
+    assert 'itc_stage_wall_seconds_count{stage="clean"} 1' in text
+    assert 'itc_cache_requests_total{result="hit"} 1' in text
+    assert 'itc_errors_total{type="ParserError",stage="parse"} 1' in text
+    assert "# TYPE itc_stage_cpu_seconds_total counter" in text
+    tracemalloc.stop()
+
+
+def test_process_image_record_is_instrumented(metrics, tmp_path):
+    path = str(tmp_path / "img.png")
+    cv2.imwrite(path, np.full((20, 40), 255, np.uint8))
+    set_default_engine(FixedEngine("2 *"))
+
+    first = process_image_record(path)
+    second = process_image_record(path)
+    assert "Syntax error" in first["error"] and second["cached"]
+    assert set(first["timings"]) == {"load", "clean", "ocr", "lex", "parse"}
+
+    snap = metrics.snapshot()
+    assert snap["stages"]["parse"]["count"] == 2 and snap["stages"]["ocr"]["count"] == 1
+    assert snap["cache"] == {"hits": 1, "misses": 1}
+    assert snap["errors"] == [{"type": "ParserError", "stage": "parse", "count": 2}]
@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+
+from ocr.cache import OCRCache
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = OCRCache(tmp_path, memory_entries=1)
+    key = cache.make_key(b"image", {"config": ""})
+    assert cache.get(key) is None
+    cache.put(key, "1+2")
+    assert cache.get(key) == "1+2"
+
+    other = cache.make_key(b"other", {"config": ""})
+    cache.put(other, "3")  # pushes ``key`` out of the memory tier
+    assert cache.get(key) == "1+2"
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.misses == 1
+
+    # A fresh instance sees the persisted entries.
+    assert OCRCache(tmp_path).get(other) == "3"
+
+
+def test_key_depends_on_content_and_settings(tmp_path):
+    cache = OCRCache()
+    path = tmp_path / "img.png"
+    path.write_bytes(b"abc")
+    assert cache.key_for(str(path), {"psm": 7}) == cache.key_for(b"abc", {"psm": 7})
+    assert cache.key_for(b"abc", {"psm": 7}) != cache.key_for(b"abc", {"psm": 6})
+    arr = np.zeros((2, 3), dtype=np.uint8)
+    assert cache.key_for(arr, {}) != cache.key_for(arr.reshape(3, 2), {})
+    assert cache.key_for(str(tmp_path / "missing.png"), {}) is None
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = OCRCache(tmp_path, max_bytes=10, memory_entries=0)
+    keys = [cache.make_key(bytes([i]), {}) for i in range(3)]
+    for age, key in zip((200, 100), keys):
+        cache.put(key, "abcd")
+        old = os.path.getmtime(tmp_path / f"{key}.txt") - age
+        os.utime(tmp_path / f"{key}.txt", (old, old))
+    cache.put(keys[2], "abcd")
+    assert cache.stats()["disk_bytes"] <= 10
+    assert cache.get(keys[-1]) == "abcd"
+    assert cache.get(keys[0]) is None
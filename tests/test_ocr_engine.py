@@ -0,0 +1,77 @@
+import os
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr import extract_text
+from ocr.extract_text import OCREngine, WorkerPoolEngine, _parse_config, get_expression_from_image
+
+
+class EchoEngine(OCREngine):
+    """Reports the image size and the worker's pid instead of running OCR."""
+
+    def image_to_string(self, image, config=""):
+        if image.shape == (13, 13):
+            os._exit(1)  # simulate a crashing engine
+        return f"{image.shape[0]}+{image.shape[1]} {os.getpid()}"
+
+
+def test_pool_reuses_persistent_workers():
+    with WorkerPoolEngine(2, factory=EchoEngine) as pool:
+        pids = {pool.image_to_string(np.zeros((3, 4), np.uint8)).split()[1] for _ in range(10)}
+        assert len(pids) <= 2
+        assert pool.image_to_string(np.zeros((3, 4), np.uint8)).startswith("3+4")
+        assert pool.health_check() == 2
+
+
+def test_pool_restarts_crashed_workers():
+    with WorkerPoolEngine(1, factory=EchoEngine, timeout=5) as pool:
+        with pytest.raises(RuntimeError):
+            pool.image_to_string(np.zeros((13, 13), np.uint8))
+        assert pool.restarts == 2
+        assert pool.image_to_string(np.zeros((2, 2), np.uint8)).startswith("2+2")
+        assert pool.health_check() == 1
+
+
+def test_pool_health_monitor_replaces_dead_idle_workers():
+    with WorkerPoolEngine(1, factory=EchoEngine, health_interval=0.05) as pool:
+        pool._workers[0].process.kill()
+        deadline = time.monotonic() + 5
+        while not pool.restarts and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert pool.restarts == 1
+        assert pool.image_to_string(np.zeros((2, 2), np.uint8)).startswith("2+2")
+
+
+def test_pool_refuses_pytesseract_workers(monkeypatch):
+    monkeypatch.setattr(extract_text, "tesserocr", None)
+    with pytest.raises(RuntimeError, match="tesserocr"):
+        WorkerPoolEngine(1)
+
+
+def test_expression_uses_given_engine():
+    with WorkerPoolEngine(1, factory=EchoEngine) as pool:
+        img = np.full((10, 20, 3), 255, np.uint8)
+        text = get_expression_from_image(img, engine=pool)
+        assert text.split()[0] == "20+40"
+
+
+def test_parse_config():
+    assert _parse_config("--psm 7 -c tessedit_char_whitelist=0123") == (
+        7, {"tessedit_char_whitelist": "0123"})
+
+
+class ShapeEngine(OCREngine):
+    def image_to_string(self, image, config=""):
+        return "+".join(map(str, image.shape))
+
+
+def test_preprocessed_input_is_not_cleaned_again():
+    cleaned = np.zeros((8, 6), np.uint8)
+    cleaned[2:4] = 255
+    assert get_expression_from_image(cleaned, engine=ShapeEngine()) == "8+6"
+    assert get_expression_from_image(cleaned, engine=ShapeEngine(), preprocessed=False) == "16+12"
+    ok, encoded = cv2.imencode(".png", np.full((5, 7, 3), 200, np.uint8))
+    assert get_expression_from_image(encoded.tobytes(), engine=ShapeEngine()) == "10+14"
@@ -0,0 +1,60 @@
+import pytest
+
+from compiler.parser import parser, BinOp, Number, Var
+from compiler.evaluator import evaluate
+from compiler.codegen import compile_ast
+from compiler.optimizer import (
+    count_nodes,
+    eliminate_common_subexpressions,
+    fold_constants,
+    optimize,
+    simplify,
+)
+from symbol_table import SymbolTable
+from error_handler import EvaluationError
+
+
+def _symbols(**values):
+    sym = SymbolTable()
+    for name, value in values.items():
+        sym.add_variable(name, value)
+    return sym
+
+
+def test_fold_and_simplify():
+    assert fold_constants(parser.parse("(2*3)+(2*3)*x")) == parser.parse("6+6*x")
+    assert simplify(parser.parse("(x*1)+0")) == Var("x")
+    # Identities that would change the result type are kept.
+    assert simplify(parser.parse("x/1")) == parser.parse("x/1")
+    assert simplify(parser.parse("x+0.0")) == parser.parse("x+0.0")
+    assert fold_constants(parser.parse("1/0")) == parser.parse("1/0")
+
+
+def test_cse_shares_subtrees_and_reports_counts():
+    ast = parser.parse("(x+y)*(x+y) - (x+y)")
+    dag = eliminate_common_subexpressions(ast)
+    assert dag.left.left is dag.left.right is dag.right
+    result = optimize(parser.parse("(2*3)+(2*3)*x"))
+    assert (result.nodes_before, result.nodes_after) == (9, 4)
+    assert count_nodes(result.ast) == 4
+
+
+@pytest.mark.parametrize("text", ["a = (x+y)*(x+y) - (x+y)*1 + 0", "(2*3)+(2*3)*x", "x/(y-y+1)"])
+def test_optimized_value_matches(text):
+    ast = parser.parse(text)
+    optimized = optimize(ast).ast
+    assert evaluate(optimized, _symbols(x=3, y=4)) == evaluate(ast, _symbols(x=3, y=4))
+    assert compile_ast(optimized)(_symbols(x=3, y=4)) == evaluate(ast, _symbols(x=3, y=4))
+
+
+def test_shared_subtree_errors_still_raised():
+    dag = optimize(parser.parse("(z+1)*(z+1)")).ast
+    with pytest.raises(EvaluationError):
+        compile_ast(dag)()
+
+
+def test_deep_tree_is_handled_iteratively():
+    node = Number(1)
+    for _ in range(50000):
+        node = BinOp("+", node, Number(1))
+    assert optimize(node).ast == Number(50001)
@@ -12,3 +12,36 @@ def test_parse_expression():
     ast = parser.parse("1 + 2 * 3")
     assert isinstance(ast, BinOp)
     assert ast.op == "+"
+
+
+def test_thread_local_parsers_share_tables():
+    from compiler.lexer import get_lexer, lexer
+    from compiler.parser import get_parser
+
+    assert get_parser() is get_parser() and get_parser() is not parser
+    assert get_parser().action is parser.action
+    assert get_lexer() is get_lexer() and get_lexer() is not lexer
+    assert get_lexer().lexre is lexer.lexre
+
+
+def test_parse_from_many_threads():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from compiler.evaluator import evaluate
+    from compiler.parser import parse
+
+    barrier = threading.Barrier(16)
+
+    def work(seed):
+        barrier.wait()
+        for i in range(300):
+            a, b, c = seed, i, seed + i
+            text = f"v{seed} = ({a} + {b}) * {c} - {b} / {c + 1}"
+            expected = (a + b) * c - b / (c + 1)
+            if evaluate(parse(text).value) != expected:
+                return False
+        return True
+
+    with ThreadPoolExecutor(16) as pool:
+        assert all(pool.map(work, range(16)))
@@ -0,0 +1,82 @@
+import pytest
+
+from compiler.reactive import ReactiveSymbolTable, free_variables
+from compiler.parser import parser
+from error_handler import DependencyCycleError, EvaluationError
+
+
+def test_free_variables():
+    assert free_variables(parser.parse("a = x * (y + x) - 2")) == {"x", "y"}
+
+
+def test_only_affected_formulas_are_recomputed():
+    table = ReactiveSymbolTable()
+    table.add_variable("x", 1)
+    table.add_variable("w", 10)
+    assert table.define("y = x * 2") == 2
+    assert table.define("z = y + x") == 3
+    table.define("v = w + 1")
+    assert table.dependents("x") == ["y", "z"]
+
+    table.set_value("x", 5)
+    assert (table.get_value("y"), table.get_value("z"), table.get_value("v")) == (10, 15, 11)
+
+
+def test_overriding_a_formula_with_a_value():
+    table = ReactiveSymbolTable()
+    table.add_variable("x", 1)
+    table.define("y = x + 1")
+    table.define("z = y * 3")
+    table.set_value("y", 4)
+    table.set_value("x", 100)
+    assert (table.get_value("y"), table.get_value("z")) == (4, 12)
+
+
+def test_cycles_are_rejected_and_rolled_back():
+    table = ReactiveSymbolTable()
+    table.add_variable("b", 1)
+    table.define("a = b + 1")
+    with pytest.raises(DependencyCycleError):
+        table.define("b = a * 2")
+    with pytest.raises(DependencyCycleError):
+        table.define("c = c + 1")
+    table.set_value("b", 2)
+    assert table.get_value("a") == 3
+    with pytest.raises(EvaluationError):
+        table.define("d = missing + 1")
+
+
+def test_redefinition_reorders_only_downstream_formulas():
+    table = ReactiveSymbolTable()
+    table.add_variable("x", 1)
+    table.add_variable("y", 10)
+    table.define("a = x + 1")
+    table.define("b = a * 2")
+    table.define("c = y + 1")
+    table.define("a = c + x")  # a now sits above c, so b must move up too
+    assert table.dependents("y") == ["c", "a", "b"]
+    assert table.get_value("b") == 24
+    with pytest.raises(DependencyCycleError, match="a, b, c"):
+        table.define("c = b + 1")
+    table.set_value("y", 0)
+    assert table.get_value("b") == 4
+
+
+def test_division_by_zero_is_an_evaluation_error_and_rolls_back():
+    table = ReactiveSymbolTable()
+    table.add_variable("x", 1)
+    table.add_variable("y", 0)
+    with pytest.raises(EvaluationError):
+        table.define("d = x / y")
+    with pytest.raises(KeyError):
+        table.get_value("d")
+    assert table.dependents("x") == []
+
+    table.set_value("y", 2)
+    table.define("d = x / y")
+    table.define("e = d + 1")
+    with pytest.raises(EvaluationError):
+        table.set_value("y", 0)
+    assert (table.get_value("y"), table.get_value("d"), table.get_value("e")) == (2, 0.5, 1.5)
+    table.set_value("x", 4)
+    assert table.get_value("e") == 3
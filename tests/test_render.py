@@ -0,0 +1,31 @@
+from ast.render import layout, render_dot, render_svg, structural_hash
+from compiler.parser import BinOp, Number, Var, Assignment, parse
+
+
+def test_dataclass_and_tuple_trees_render_alike():
+    tree = parse("y = 1 + x * 2")
+    dot = render_dot(tree)
+    for line in ('n0 [label="y ="]', 'n1 [label="+"]', 'n3 [label="*"]', "n3 -> n5"):
+        assert line in dot
+    assert structural_hash(("+", 1, 2)) == structural_hash(BinOp("+", Number(1), Number(2)))
+    assert structural_hash(parse("1+2+3")) != structural_hash(parse("1+(2+3)"))
+
+
+def test_layout_centres_parents_without_overlap():
+    tree = layout(parse("(a + b) * (c - 12345678)"))
+    leaves = [i for i in range(len(tree.labels)) if i not in tree.parents]
+    xs = [tree.x[i] for i in leaves]
+    assert xs == sorted(xs) and len(set(xs)) == len(xs)
+    assert tree.x[0] == (tree.x[1] + tree.x[4]) / 2
+    assert tree.height == 3
+
+
+def test_svg_is_cached_by_structure_and_handles_deep_trees():
+    svg = render_svg(parse("a = 3 * 4"))
+    assert svg.startswith("<svg") and "a =" in svg
+    assert render_svg(Assignment("a", BinOp("*", Number(3), Number(4)))) is svg
+
+    deep = Var("x")
+    for i in range(100_000):
+        deep = BinOp("+", deep, Number(i))
+    assert render_svg(deep).count("<ellipse") == 200_001
@@ -0,0 +1,60 @@
+import pytest
+
+from compiler.parser import parser
+from compiler.evaluator import evaluate
+from compiler.optimizer import optimize
+from compiler.resolver import Frame, Scope, compile_resolved, resolve
+from symbol_table import SymbolTable
+from error_handler import EvaluationError
+
+
+def test_resolve_addresses_nested_scopes():
+    outer = Scope(["x", "y"])
+    inner = Scope(["y"], parent=outer)
+    ast = parser.parse("z = x + y")
+    addresses = resolve(ast, inner)
+    assert addresses[id(ast.value.left)] == (1, 0)
+    assert addresses[id(ast.value.right)] == (0, 0)
+    assert addresses[id(ast)] == (0, 1)
+    with pytest.raises(EvaluationError):
+        resolve(parser.parse("w + 1"), inner)
+
+
+def test_compiled_frames_match_symbol_tables():
+    outer_table = SymbolTable()
+    outer_table.add_variable("x", 3)
+    table = SymbolTable(outer_table)
+    table.add_variable("y", 4)
+    ast = parser.parse("x = (x + y) * (x + y) - y / 2")
+
+    scope = Scope.from_symbol_table(table)
+    frame = Frame.from_symbol_table(table, scope)
+    fn = compile_resolved(optimize(ast).ast, scope)
+    assert fn(frame) == evaluate(ast, table)
+    # The assignment shadows ``x`` locally, exactly like ``evaluate``.
+    assert frame.get("x") == table.get_value("x")
+    assert frame.parent.get("x") == 3
+
+
+def test_repeated_shadowing_assignment_matches_evaluate():
+    outer_table = SymbolTable()
+    outer_table.add_variable("x", 3)
+    table = SymbolTable(outer_table)
+    scope = Scope.from_symbol_table(table)
+    frame = Frame.from_symbol_table(table, scope)
+    ast = parser.parse("x = x + 1")
+    step = compile_resolved(ast, scope)
+    assert [step(frame) for _ in range(3)] == [evaluate(ast, table) for _ in range(3)] == [4, 5, 6]
+    assert frame.parent.get("x") == 3
+
+
+def test_reassignment_reuses_slot_and_unbound_reads_fail():
+    scope = Scope(["n"])
+    step = compile_resolved(parser.parse("n = n + 1"), scope)
+    frame = Frame(scope, [0])
+    for _ in range(5):
+        step(frame)
+    assert frame.values == [5]
+    scope.declare("later")
+    with pytest.raises(EvaluationError):
+        compile_resolved(parser.parse("later * 2"), scope)(Frame(scope, [0]))
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+
+import cv2
+import numpy as np
+
+from pipeline import StandInEngine
+from server import CompileService
+from utils.metrics import Metrics, get_metrics, set_metrics
+
+PNG = cv2.imencode(".png", np.full((20, 40), 255, np.uint8))[1].tobytes()
+
+
+async def _request(port, method="POST", path="/compile", body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n"
+                 "Connection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    if b"application/json" not in head:
+        return int(head.split()[1]), payload.decode()
+    return int(head.split()[1]), json.loads(payload)
+
+
+def _run(service, *requests):
+    async def scenario():
+        await service.start("127.0.0.1", 0)
+        try:
+            return await asyncio.gather(*(_request(service.port, *r) for r in requests))
+        finally:
+            await service.close()
+    return asyncio.run(scenario())
+
+
+def test_compile_endpoint_and_batching():
+    service = CompileService(StandInEngine("2*(3+4)", latency=0.01), batch_window=0.05, concurrency=1)
+    responses = _run(service, *[("POST", "/compile", PNG)] * 4)
+    assert [status for status, _ in responses] == [200] * 4
+    assert all(body["value"] == 14 and body["error"] is None for _, body in responses)
+    assert service.stats["batches"] < 4
+
+
+def test_batch_answers_each_request_when_done_and_shares_duplicates():
+    class CountingEngine(StandInEngine):
+        calls = 0
+
+        def image_to_string(self, image, config=""):
+            CountingEngine.calls += 1
+            return super().image_to_string(image, config)
+
+    other = cv2.imencode(".png", np.full((20, 41), 255, np.uint8))[1].tobytes()
+    service = CompileService(CountingEngine(latency=0.2), batch_window=0.05, concurrency=1)
+
+    async def timed(body):
+        await _request(service.port, body=body)
+        return time.perf_counter()
+
+    async def scenario():
+        await service.start("127.0.0.1", 0)
+        try:
+            return await asyncio.gather(timed(PNG), timed(PNG), timed(other))
+        finally:
+            await service.close()
+
+    first, duplicate, last = asyncio.run(scenario())
+    assert service.stats["batches"] == 1 and CountingEngine.calls == 2
+    assert abs(duplicate - first) < 0.1 and last - first > 0.1
+
+
+def test_errors_and_routes():
+    service = CompileService(StandInEngine("1 +"))
+    (status, body), (bad, undecoded), (missing, _), (health, info) = _run(
+        service, ("POST", "/compile", PNG), ("POST", "/compile", b"not an image"),
+        ("GET", "/nope"), ("GET", "/health"))
+    assert status == 200 and "Syntax error" in body["error"]
+    assert bad == 400 and undecoded["error"] == "Could not decode image"
+    assert missing == 404
+    assert health == 200 and info["status"] == "ok"
+
+
+def test_invalid_content_length_returns_400():
+    async def raw(length):
+        reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+        writer.write(f"POST /compile HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return int(response.split()[1])
+
+    async def scenario():
+        await service.start("127.0.0.1", 0)
+        try:
+            return [await raw(length) for length in ("abc", "-5")]
+        finally:
+            await service.close()
+
+    service = CompileService(StandInEngine())
+    assert asyncio.run(scenario()) == [400, 400]
+
+
+def test_queue_full_returns_429():
+    service = CompileService(StandInEngine(latency=0.2), max_queue=1, batch_size=1, concurrency=1)
+    statuses = [status for status, _ in _run(service, *[("POST", "/compile", PNG)] * 5)]
+    assert 429 in statuses and 200 in statuses
+    assert service.stats["rejected"] == statuses.count(429)
+
+
+def test_slow_request_times_out():
+    service = CompileService(StandInEngine(latency=0.3), timeout=0.05)
+    [(status, body)] = _run(service, ("POST", "/compile", PNG))
+    assert status == 504 and "Timed out" in body["error"]
+
+
+def test_metrics_endpoint_reports_stages_and_queue():
+    previous = get_metrics()
+    set_metrics(Metrics())
+    try:
+        service = CompileService(StandInEngine("1/0"))
+
+        async def scenario():
+            await service.start("127.0.0.1", 0)
+            try:
+                results = await asyncio.gather(*(_request(service.port, body=PNG) for _ in range(2)))
+                return results[0][1], await _request(service.port, "GET", "/metrics")
+            finally:
+                await service.close()
+        body, (status, text) = asyncio.run(scenario())
+    finally:
+        set_metrics(previous)
+    assert "division by zero" in body["error"]
+    assert status == 200
+    assert 'itc_stage_wall_seconds_count{stage="ocr"} 2' in text
+    assert 'itc_errors_total{type="ZeroDivisionError",stage="evaluate"} 2' in text
+    assert "itc_server_accepted_total 2" in text and "itc_server_queue_depth 0" in text
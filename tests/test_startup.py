@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import ply.lex as lex
+from ply.yacc import ParserReflect
+
+import compiler.lexer
+import compiler.parser
+from compiler import lextab, parsetab
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("cv2", "numpy", "PIL", "pytesseract", "pandas", "tesserocr", "graphviz", "ast.render")
+
+
+def _run(code):
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                          text=True, check=True)
+
+
+def test_importing_main_defers_heavy_dependencies():
+    result = _run(f"import main, sys; print([m for m in {HEAVY!r} if m in sys.modules])")
+    assert result.stdout.strip() == "[]"
+    assert result.stderr == ""  # no table generation or warnings
+
+
+def test_shipped_tables_match_grammar():
+    pdict = dict(vars(compiler.parser), start="statement")
+    reflect = ParserReflect(pdict)
+    reflect.get_all()
+    assert reflect.signature() == parsetab._lr_signature
+
+    # Rules of equal length may be ordered differently; compare the alternatives.
+    fresh = lex.lex(module=compiler.lexer)
+    shipped = {rule for regex, _ in lextab._lexstatere["INITIAL"] for rule in regex.split("|(?P")}
+    assert shipped == {rule for regex in fresh.lexstateretext["INITIAL"] for rule in regex.split("|(?P")}
+    assert lextab._lextokens == fresh.lextokens
+    assert lextab._lexstateignore == fresh.lexstateignore
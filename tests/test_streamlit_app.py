@@ -0,0 +1,54 @@
+import cv2
+import numpy as np
+
+import streamlit_app
+from ocr.cache import OCRCache
+
+
+def _png(seed):
+    img = np.full((20, 40), 255, np.uint8)
+    img[5:15, seed % 30:seed % 30 + 5] = 0
+    return cv2.imencode(".png", img)[1].tobytes()
+
+
+def test_compile_upload_caches_stages(monkeypatch):
+    calls = []
+
+    def fake_ocr(cleaned, **kwargs):
+        calls.append(cleaned.shape)
+        return "2*(3+4)"
+
+    monkeypatch.setattr(streamlit_app, "get_expression_from_image", fake_ocr)
+    monkeypatch.setattr(streamlit_app, "get_default_cache", lambda: OCRCache(None))
+    data = _png(3)
+    stages = []
+    result = streamlit_app.compile_upload(data, progress=lambda stage, f: stages.append(stage))
+    assert result.expression == "2*(3+4)" and result.value == 14
+    assert stages == [*streamlit_app.STAGES, "done"]
+
+    again = streamlit_app.compile_upload(data)
+    assert again.value == 14 and len(calls) == 1
+    streamlit_app.compile_upload(data, adaptive=True)
+    assert len(calls) == 2
+
+
+def test_submit_compile_runs_in_background(monkeypatch):
+    monkeypatch.setattr(streamlit_app, "get_expression_from_image", lambda cleaned, **kw: "1 +")
+    monkeypatch.setattr(streamlit_app, "get_default_cache", lambda: OCRCache(None))
+    job = streamlit_app.submit_compile(_png(11))
+    result = job.future.result(timeout=10)
+    assert job.stage == "done" and job.fraction == 1.0
+    assert result.expression == "1 +" and "Syntax error" in result.error
+
+
+def test_session_keeps_only_recent_jobs(monkeypatch):
+    monkeypatch.setattr(streamlit_app, "get_expression_from_image", lambda cleaned, **kw: "1")
+    monkeypatch.setattr(streamlit_app, "get_default_cache", lambda: OCRCache(None))
+    monkeypatch.setattr(streamlit_app.st, "session_state", {})
+    first = streamlit_app._job_for(_png(0), False)
+    for seed in range(1, streamlit_app.MAX_JOBS + 3):
+        streamlit_app._job_for(_png(seed), False)
+        assert streamlit_app._job_for(_png(0), False) is first  # recently used, kept
+    jobs = streamlit_app.st.session_state["compile_jobs"]
+    assert len(jobs) == streamlit_app.MAX_JOBS
+    assert (streamlit_app.upload_digest(_png(1)), False) not in jobs
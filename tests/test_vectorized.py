@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from compiler.parser import parser
+from compiler.evaluator import evaluate
+from compiler.vectorized import evaluate_columns
+from symbol_table import SymbolTable
+from error_handler import EvaluationError
+
+
+def test_matches_row_by_row_evaluation():
+    ast = parser.parse("a = x * 2 + y / 4")
+    columns = {"x": np.arange(5), "y": np.array([1.0, 2.0, 3.0, 4.0, 5.0])}
+    result = evaluate_columns(ast, columns)
+    expected = []
+    for x, y in zip(columns["x"].tolist(), columns["y"].tolist()):
+        sym = SymbolTable()
+        sym.add_variable("x", x)
+        sym.add_variable("y", y)
+        expected.append(evaluate(ast, sym))
+    assert result.tolist() == expected
+    assert columns["a"] is result
+
+
+def test_int_float_promotion_and_broadcasting():
+    assert evaluate_columns(parser.parse("x * 3 - 1"), {"x": [1, 2]}).dtype == np.int64
+    assert evaluate_columns(parser.parse("x * 1.5"), {"x": [1, 2]}).dtype == np.float64
+    assert evaluate_columns(parser.parse("x / 1"), {"x": [2, 4]}).dtype == np.float64
+    assert evaluate_columns(parser.parse("2 + 3"), {}, length=3).tolist() == [5, 5, 5]
+
+
+def test_zero_division_modes():
+    ast = parser.parse("x / y")
+    columns = {"x": [1, 0, 4], "y": [0, 0, 2]}
+    nan = evaluate_columns(ast, columns)
+    assert np.isnan(nan[:2]).all() and nan[2] == 2
+    inf = evaluate_columns(ast, columns, zero_division="inf")
+    assert np.isinf(inf[0]) and np.isnan(inf[1])
+    with pytest.raises(EvaluationError):
+        evaluate_columns(ast, columns, zero_division="raise")
+    with pytest.raises(EvaluationError):
+        evaluate_columns(parser.parse("z + 1"), columns)
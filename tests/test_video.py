@@ -0,0 +1,112 @@
+import random
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.generator import render_expression
+from pipeline import StandInEngine
+from video import FrameGate, StreamProcessor, dhash, hamming
+
+
+def _frame(text, rng):
+    canvas = np.full((240, 640, 3), 255, np.uint8)
+    image = render_expression(text, noise=4.0, rng=rng)
+    canvas[60:60 + image.shape[0], 40:40 + image.shape[1]] = image
+    return canvas
+
+
+def _write_video(path, texts, repeat=8):
+    rng = random.Random(0)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25, (640, 240))
+    assert writer.isOpened()
+    for text in texts:
+        for _ in range(repeat):
+            writer.write(_frame(text, rng))
+    writer.release()
+    return str(path)
+
+
+class CountingEngine(StandInEngine):
+    def __init__(self, latency=0.0):
+        super().__init__("1+2", latency)
+        self.calls = 0
+
+    def image_to_string(self, image, config=""):
+        self.calls += 1
+        return super().image_to_string(image, config)
+
+
+def test_dhash_tolerates_noise_but_not_new_text():
+    rng = random.Random(1)
+    a1, a2 = (cv2.cvtColor(_frame("12+34", rng), cv2.COLOR_BGR2GRAY) for _ in range(2))
+    b = cv2.cvtColor(_frame("98/7", rng), cv2.COLOR_BGR2GRAY)
+    assert hamming(dhash(a1), dhash(a2)) <= 6
+    assert hamming(dhash(a1), dhash(b)) > 12
+    gate = FrameGate(stable_frames=2)
+    first, second = _frame("12+34", rng), _frame("98/7", rng)
+    assert [gate.changed(first) for _ in range(4)] == [False, False, True, False]
+    blank = np.full((240, 640, 3), 255, np.uint8)
+    assert not any(gate.changed(blank) for _ in range(3))  # no text
+    assert [gate.changed(second) for _ in range(3)] == [False, False, True]
+
+
+def test_gradually_written_text_is_ocrd_once_finished():
+    image = render_expression("a = 12 + 34 * 5", noise=0.0, rng=random.Random(2))
+    height, width = image.shape[:2]
+    ink = np.cumsum((image < 128).any(axis=2).sum(axis=0))
+    gate = FrameGate()
+    shown, hits = [], []
+    # Reveal 4 px per frame, then hold the finished expression for 30 frames.
+    for index, revealed in enumerate([*range(0, width, 4), *[width] * 30]):
+        canvas = np.full((240, 640, 3), 255, np.uint8)
+        canvas[60:60 + height, 40:40 + revealed] = image[:, :revealed]
+        noise = np.random.default_rng(index).normal(0, 4, canvas.shape)
+        shown.append(int(ink[revealed - 1]) if revealed else 0)
+        if gate.changed(np.clip(canvas + noise, 0, 255).astype(np.uint8)):
+            hits.append(index)
+    assert hits and shown[hits[-1]] == ink[-1]
+    # OCR only ever follows frames that added no ink (pauses between glyphs).
+    assert all(shown[i - gate.stable_frames] == shown[i] for i in hits)
+    assert len(hits) < len(shown) // 10
+
+
+def test_file_stream_ocrs_only_when_text_changes(tmp_path):
+    path = _write_video(tmp_path / "board.avi", ["12+34", "98/7", "5*6-1"])
+    engine = CountingEngine()
+    processor = StreamProcessor(path, engine=engine)
+    results = processor.run()
+    summary = processor.stats.summary()
+    # Each text is OCR'd once, after it has been still for three frames.
+    assert engine.calls == 3 and [r.frame for r in results] == [3, 11, 19]
+    assert results[0].value == 3
+    assert summary["frames_processed"] == 24 and summary["frames_dropped"] == 0
+    assert summary["frames_unchanged"] == 21 and summary["ocr_per_minute"] > 0
+
+
+def test_callbacks_stream_results_and_stats_without_history(tmp_path):
+    path = _write_video(tmp_path / "board.avi", ["12+34"], repeat=20)
+    seen, reports = [], []
+    processor = StreamProcessor(path, engine=CountingEngine(latency=0.01))
+    returned = processor.run(on_result=seen.append, on_stats=reports.append, stats_interval=1e-9)
+    assert returned == [] and len(seen) == 1
+    # A static scene is skipped by the gate but still reported on.
+    assert len(reports) == 20 and reports[-1]["frames_unchanged"] == 19
+
+
+def test_realtime_drops_frames_instead_of_queueing(tmp_path):
+    path = _write_video(tmp_path / "board.avi", ["12+34", "98/7"], repeat=10)
+    processor = StreamProcessor(path, engine=CountingEngine(latency=0.2), realtime=True)
+    start = time.perf_counter()
+    processor.run()
+    summary = processor.stats.summary()
+    assert summary["frames_read"] == 20
+    assert summary["frames_dropped"] > 0
+    assert summary["frames_processed"] + summary["frames_dropped"] == 20
+    assert time.perf_counter() - start < 2.0
+
+
+def test_missing_source_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        StreamProcessor(str(tmp_path / "missing.avi")).run()
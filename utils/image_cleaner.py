@@ -9,22 +9,78 @@ directly to :mod:`pytesseract` or other OCR engines.
 from __future__ import annotations
 
 
-from typing import Optional
+from typing import Optional, Tuple, Union
 
-try:
-    import cv2
-    import numpy as np
-except ImportError:  # pragma: no cover - environment might not have deps
-    cv2 = None  # type: ignore
-    np = None  # type: ignore
+from utils.lazy import lazy_import
+
+# Imported on first use; see :mod:`utils.lazy`.
+cv2 = lazy_import("cv2", globals())
+np = lazy_import("numpy", globals(), "np")
 
 
 ImageArray = "np.ndarray"
+ImageSource = Union[str, bytes, bytearray, memoryview, "np.ndarray"]
+BBox = Tuple[int, int, int, int]
+
+# Tesseract is most accurate when glyphs are roughly 30 px tall; adaptive
+# cleaning scales text towards this height instead of a fixed 2x.
+TARGET_GLYPH_HEIGHT = 32
+MIN_SCALE = 0.5
+MAX_SCALE = 4.0
+
+
+def decode_image(data: Union[bytes, bytearray, memoryview]) -> Optional["np.ndarray"]:
+    """Decode encoded image ``data`` (PNG, JPEG, ...) straight from memory.
+
+    The buffer is wrapped without copying before OpenCV decodes it, so no
+    temp file or intermediate PIL image is involved.  Like ``cv2.imread`` on
+    a path, the result is always 8-bit BGR, so bytes and paths clean alike.
+    """
+    if not cv2 or not np:
+        return None
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if not buf.size:
+        return None
+    return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+
+def load_image(src: ImageSource) -> Optional["np.ndarray"]:
+    """Return ``src`` (a path, encoded bytes/buffer or ndarray) as an ndarray."""
+    if not cv2 or not np:
+        return None
+    if isinstance(src, np.ndarray):
+        return src
+    if isinstance(src, str):
+        return cv2.imread(src)
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        return decode_image(src)
+    return None
+
+
+def is_preprocessed(image: "np.ndarray") -> bool:
+    """Return whether ``image`` already looks like :func:`clean_image` output.
+
+    Cleaned images are single-channel ``uint8`` arrays containing only black
+    and white pixels.
+    """
+    if not np or not isinstance(image, np.ndarray):
+        return False
+    if image.ndim != 2 or image.dtype != np.uint8:
+        return False
+    return not np.count_nonzero((image != 0) & (image != 255))
+
+
+def to_grayscale(image: "np.ndarray") -> "np.ndarray":
+    """Return ``image`` (gray, BGR or BGRA) as a single-channel array."""
+    if not cv2 or image.ndim == 2:
+        return image
+    code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code)
 
 
 def binarize(image: "np.ndarray") -> "np.ndarray":
     """Return a thresholded version of ``image`` using Otsu."""
-    if cv2 is None:
+    if not cv2:
         return image
     _, thresh = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
     return thresh
@@ -32,23 +88,157 @@ def binarize(image: "np.ndarray") -> "np.ndarray":
 
 def remove_noise(image: "np.ndarray") -> "np.ndarray":
     """Denoise small elements using median blur."""
-    if cv2 is None:
+    if not cv2:
         return image
     return cv2.medianBlur(image, 3)
 
 
-def clean_image(image: "np.ndarray | str") -> Optional["np.ndarray"]:
-    """Clean ``image`` which may be a path or array."""
-    if cv2 is None or np is None:
+def _glyph_stats(gray: "np.ndarray") -> tuple[Optional[BBox], Optional[float]]:
+    """Return the bounding box of the text in ``gray`` and its median glyph height.
+
+    Ink is separated from the background with Otsu and grouped into connected
+    components; specks and components spanning the whole image (borders,
+    shadows) are ignored.
+    """
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if cv2.countNonZero(ink) > ink.size // 2:
+        ink = cv2.bitwise_not(ink)  # light text on a dark background
+    count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    if count <= 1:
+        return None, None
+    stats = stats[1:]  # drop the background component
+    img_h, img_w = gray.shape[:2]
+    heights = stats[:, cv2.CC_STAT_HEIGHT]
+    widths = stats[:, cv2.CC_STAT_WIDTH]
+    keep = (
+        (stats[:, cv2.CC_STAT_AREA] >= 4)
+        & (heights >= 3)
+        & (heights < 0.9 * img_h)
+        & (widths < 0.9 * img_w)
+    )
+    stats = stats[keep]
+    if not len(stats):
+        return None, None
+    x0 = int(stats[:, cv2.CC_STAT_LEFT].min())
+    y0 = int(stats[:, cv2.CC_STAT_TOP].min())
+    x1 = int((stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH]).max())
+    y1 = int((stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT]).max())
+    # Glyphs are the components at least half as tall as the tallest one, so
+    # operators like '-' or '.' do not drag the estimate down.
+    heights = stats[:, cv2.CC_STAT_HEIGHT]
+    glyphs = heights[heights >= heights.max() / 2]
+    return (x0, y0, x1 - x0, y1 - y0), float(np.median(glyphs))
+
+
+def find_text_bbox(gray: "np.ndarray") -> Optional[BBox]:
+    """Return ``(x, y, w, h)`` enclosing the text in ``gray`` or ``None``."""
+    if not cv2:
+        return None
+    return _glyph_stats(gray)[0]
+
+
+def estimate_glyph_height(gray: "np.ndarray") -> Optional[float]:
+    """Return the median height in pixels of the glyphs in ``gray``."""
+    if not cv2:
+        return None
+    return _glyph_stats(gray)[1]
+
+
+def choose_scale(glyph_height: Optional[float], target: int = TARGET_GLYPH_HEIGHT) -> float:
+    """Return the resize factor bringing ``glyph_height`` close to ``target``."""
+    if not glyph_height:
+        return 2.0
+    return min(MAX_SCALE, max(MIN_SCALE, target / glyph_height))
+
+
+def _crop_and_scale(gray: "np.ndarray", margin: int, target: int) -> "np.ndarray":
+    bbox, glyph_height = _glyph_stats(gray)
+    if bbox is not None:
+        x, y, w, h = bbox
+        pad = max(margin, int(glyph_height or 0) // 2)
+        img_h, img_w = gray.shape[:2]
+        gray = gray[max(0, y - pad):min(img_h, y + h + pad), max(0, x - pad):min(img_w, x + w + pad)]
+    scale = choose_scale(glyph_height, target)
+    if abs(scale - 1.0) < 0.05:
+        return gray
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def _line_height(runs: list[tuple[int, int]]) -> float:
+    # Like glyph heights: only runs at least half as tall as the tallest count,
+    # so the pieces of a split "=" do not drag the estimate down.
+    heights = np.array([bottom - top for top, bottom in runs])
+    return float(np.median(heights[heights >= heights.max() / 2]))
+
+
+def find_text_lines(binary: "np.ndarray", *, min_height_ratio: float = 0.3,
+                    merge_gap_ratio: float = 0.25) -> list[tuple[int, int]]:
+    """Return ``(top, bottom)`` row ranges of the text lines in ``binary``.
+
+    ``binary`` is :func:`clean_image` output (dark ink on white).  Rows
+    containing ink form runs; runs separated by less than ``merge_gap_ratio``
+    times the typical line height are merged (so ``=`` or ``÷`` stay whole) and
+    runs shorter than ``min_height_ratio`` times it are dropped as specks.
+    """
+    if not np:
+        return []
+    ink = binary < 128
+    if np.count_nonzero(ink) > ink.size // 2:
+        ink = ~ink  # light text on a dark background
+    rows = np.flatnonzero(ink.any(axis=1))
+    if not rows.size:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) > 1)
+    tops = rows[np.r_[0, breaks + 1]].tolist()
+    bottoms = (rows[np.r_[breaks, rows.size - 1]] + 1).tolist()
+    runs = list(zip(tops, bottoms))
+    height = _line_height(runs)
+    merged = [runs[0]]
+    for top, bottom in runs[1:]:
+        if top - merged[-1][1] < merge_gap_ratio * height:
+            merged[-1] = (merged[-1][0], bottom)
+        else:
+            merged.append((top, bottom))
+    height = _line_height(merged)
+    return [(top, bottom) for top, bottom in merged if bottom - top >= min_height_ratio * height]
+
+
+def split_lines(binary: "np.ndarray", *, margin: int = 4) -> list[tuple[tuple[int, int], "np.ndarray"]]:
+    """Crop ``binary`` into ``((top, bottom), line_image)`` pairs, top to bottom.
+
+    Each crop keeps up to ``margin`` blank rows above and below the line,
+    without reaching into its neighbours.
+    """
+    lines = find_text_lines(binary)
+    crops = []
+    for i, (top, bottom) in enumerate(lines):
+        upper = lines[i - 1][1] if i else 0
+        lower = lines[i + 1][0] if i + 1 < len(lines) else binary.shape[0]
+        start = max(upper, top - margin)
+        crops.append(((top, bottom), binary[start:min(lower, bottom + margin)]))
+    return crops
+
+
+def clean_image(image: ImageSource, *, adaptive: bool = False, margin: int = 8,
+                target_glyph_height: int = TARGET_GLYPH_HEIGHT) -> Optional["np.ndarray"]:
+    """Clean ``image`` which may be a path, encoded bytes/buffer or array.
+
+    By default the whole image is upscaled 2x.  With ``adaptive=True`` the
+    image is first cropped to the detected text region (plus ``margin``
+    pixels) and scaled so glyphs are about ``target_glyph_height`` pixels
+    tall, which keeps large photos from sending mostly blank pixels to OCR.
+    """
+    if not cv2 or not np:
+        return None
+    img = load_image(image)
+    if img is None:
         return None
-    if isinstance(image, str):
-        img = cv2.imread(image)
-        if img is None:
-            return None
+    gray = to_grayscale(img)
+    if adaptive:
+        gray = _crop_and_scale(gray, margin, target_glyph_height)
     else:
-        img = image
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_LINEAR)
+        gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_LINEAR)
     gray = remove_noise(gray)
     thresh = binarize(gray)
     return thresh
@@ -0,0 +1,60 @@
+"""Deferred imports of heavy optional dependencies.
+
+OpenCV, NumPy, PIL and pytesseract (which may pull in pandas) take most of the
+start-up time of a short CLI run, yet a cached or text-only run needs none of
+them.  Modules therefore bind them with :func:`lazy_import` instead of a
+top-level ``try: import ... except ImportError`` block::
+
+    cv2 = lazy_import("cv2", globals())
+
+and test availability with ``if not cv2:`` rather than ``if cv2 is None:``.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Stand-in for an optional module, imported on first attribute access or truth test.
+
+    Loading rebinds ``namespace[alias]`` to the real module, or to ``None``
+    if it is not installed, so later lookups go straight to the module.
+    """
+
+    __slots__ = ("_name", "_namespace", "_alias")
+
+    def __init__(self, name: str, namespace: dict[str, Any], alias: str) -> None:
+        self._name = name
+        self._namespace = namespace
+        self._alias = alias
+
+    def _load(self) -> Optional[Any]:
+        try:
+            module = importlib.import_module(self._name)
+        except ImportError:
+            module = None
+        if self._namespace.get(self._alias) is self:
+            self._namespace[self._alias] = module
+        return module
+
+    def __bool__(self) -> bool:
+        return self._load() is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._load()
+        if module is None:
+            raise AttributeError(f"optional dependency {self._name!r} is not installed")
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
+
+
+def lazy_import(name: str, namespace: dict[str, Any], alias: Optional[str] = None) -> LazyModule:
+    """Return a :class:`LazyModule` for ``name`` to be bound as ``namespace[alias]``.
+
+    ``alias`` defaults to the last component of ``name`` (``"PIL.Image"`` ->
+    ``"Image"``).
+    """
+    return LazyModule(name, namespace, alias or name.rpartition(".")[2])
@@ -0,0 +1,247 @@
+"""Pluggable per-stage instrumentation for the OCR ➡ parse ➡ evaluate pipeline.
+
+Pipeline code wraps each stage in :meth:`Metrics.stage`::
+
+    metrics = get_metrics()
+    with metrics.stage("ocr", timings):
+        text = get_expression_from_image(cleaned)
+
+When instrumentation is disabled (the default) a stage only stores its wall
+time in the optional ``timings`` dict, exactly like the hand-written
+``perf_counter`` calls it replaces, and cache/error counters return at once.
+When enabled, every stage also records CPU time and peak memory, exceptions
+leaving a stage are counted by type, and each observation is emitted as a JSON
+line on the ``itc.metrics`` logger.  :meth:`Metrics.prometheus` renders the
+aggregates in the Prometheus text exposition format.
+
+Set ``ITC_METRICS=1`` to enable the process-wide instance, or
+``ITC_METRICS=memory`` to also trace allocations with :mod:`tracemalloc`
+(accurate per-stage peaks, but noticeably slower).  Without tracing only the
+process-wide peak RSS is reported.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Optional, Union
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore
+
+STAGES = ("load", "clean", "ocr", "lex", "parse", "evaluate")
+
+logger = logging.getLogger("itc.metrics")
+
+
+class _Timer:
+    """Stage context used when instrumentation is disabled."""
+
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name: str, timings: Optional[dict[str, float]]) -> None:
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.timings is not None:
+            self.timings[self.name] = time.perf_counter() - self.start
+        return False
+
+
+class _Stage(_Timer):
+    __slots__ = ("metrics", "cpu", "memory")
+
+    def __init__(self, metrics: "Metrics", name: str, timings: Optional[dict[str, float]]) -> None:
+        super().__init__(name, timings)
+        self.metrics = metrics
+
+    def __enter__(self) -> "_Stage":
+        if self.metrics.track_memory:
+            self.memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.cpu = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        wall = time.perf_counter() - self.start
+        cpu = time.thread_time() - self.cpu
+        peak = None
+        if self.metrics.track_memory:
+            peak = max(0, tracemalloc.get_traced_memory()[1] - self.memory)
+        if self.timings is not None:
+            self.timings[self.name] = wall
+        self.metrics._observe(self.name, wall, cpu, peak, exc_type)
+        return False
+
+
+class Metrics:
+    """Collects per-stage timings, OCR cache hits and errors.
+
+    ``enabled=False`` turns every method into a near no-op.  With
+    ``track_memory`` stages should not be nested, since each one resets the
+    :mod:`tracemalloc` peak.
+    """
+
+    def __init__(self, *, enabled: bool = True, track_memory: bool = False) -> None:
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages: dict[str, dict[str, float]] = defaultdict(
+                lambda: {"count": 0, "wall": 0.0, "cpu": 0.0, "wall_max": 0.0, "peak_memory": 0})
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.errors: defaultdict[tuple[str, str], int] = defaultdict(int)
+
+    # -- recording --------------------------------------------------------
+    def stage(self, name: str, timings: Optional[dict[str, float]] = None) -> _Timer:
+        """Context manager timing stage ``name``; its wall time goes into ``timings``."""
+        if not self.enabled:
+            return _Timer(name, timings)
+        return _Stage(self, name, timings)
+
+    def cache(self, hit: bool) -> None:
+        """Count one OCR cache lookup."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def error(self, error: Union[BaseException, type, str], stage: str = "") -> None:
+        """Count an error that was handled without raising out of a stage."""
+        if not self.enabled:
+            return
+        name = error if isinstance(error, str) else (
+            error.__name__ if isinstance(error, type) else type(error).__name__)
+        with self._lock:
+            self.errors[(name, stage)] += 1
+        self._log({"event": "error", "type": name, "stage": stage})
+
+    def _observe(self, name: str, wall: float, cpu: float, peak: Optional[int],
+                 exc_type: Optional[type]) -> None:
+        with self._lock:
+            entry = self.stages[name]
+            entry["count"] += 1
+            entry["wall"] += wall
+            entry["cpu"] += cpu
+            entry["wall_max"] = max(entry["wall_max"], wall)
+            if peak is not None:
+                entry["peak_memory"] = max(entry["peak_memory"], peak)
+            if exc_type is not None:
+                self.errors[(exc_type.__name__, name)] += 1
+        event: dict[str, Any] = {"event": "stage", "stage": name, "wall": wall, "cpu": cpu}
+        if peak is not None:
+            event["peak_memory"] = peak
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        self._log(event)
+
+    @staticmethod
+    def _log(event: dict[str, Any]) -> None:
+        if logger.isEnabledFor(logging.INFO):
+            event["time"] = time.time()
+            logger.info(json.dumps(event))
+
+    # -- export -----------------------------------------------------------
+    def snapshot(self) -> dict[str, Any]:
+        """Return the aggregates as a JSON-serialisable dict."""
+        with self._lock:
+            return {
+                "stages": {name: dict(entry) for name, entry in self.stages.items()},
+                "cache": {"hits": self.cache_hits, "misses": self.cache_misses},
+                "errors": [{"type": t, "stage": s, "count": n} for (t, s), n in sorted(self.errors.items())],
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+
+    def prometheus(self, prefix: str = "itc") -> str:
+        """Render the aggregates in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        stages = snap["stages"]
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            metric = f"{prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            return metric
+
+        metric = family("stage_wall_seconds", "summary", "Wall-clock time per pipeline stage.")
+        for name, entry in stages.items():
+            lines.append(f'{metric}_sum{{stage="{name}"}} {entry["wall"]!r}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {entry["count"]}')
+        metric = family("stage_cpu_seconds_total", "counter", "CPU time per pipeline stage.")
+        for name, entry in stages.items():
+            lines.append(f'{metric}{{stage="{name}"}} {entry["cpu"]!r}')
+        if self.track_memory:
+            metric = family("stage_peak_memory_bytes", "gauge",
+                            "Largest traced allocation peak seen during a stage.")
+            for name, entry in stages.items():
+                lines.append(f'{metric}{{stage="{name}"}} {entry["peak_memory"]}')
+        metric = family("cache_requests_total", "counter", "OCR cache lookups by result.")
+        lines.append(f'{metric}{{result="hit"}} {snap["cache"]["hits"]}')
+        lines.append(f'{metric}{{result="miss"}} {snap["cache"]["misses"]}')
+        metric = family("errors_total", "counter", "Errors by exception type and stage.")
+        for error in snap["errors"]:
+            lines.append(f'{metric}{{type="{error["type"]}",stage="{error["stage"]}"}} {error["count"]}')
+        if snap["peak_rss_bytes"] is not None:
+            metric = family("process_peak_rss_bytes", "gauge", "Peak resident set size of the process.")
+            lines.append(f"{metric} {snap['peak_rss_bytes']}")
+        return "\n".join(lines) + "\n"
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or ``None`` if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+_default_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide instance configured from ``ITC_METRICS``."""
+    global _default_metrics
+    if _default_metrics is None:
+        setting = os.environ.get("ITC_METRICS", "").strip().lower()
+        enabled = setting not in ("", "0", "false", "no", "off")
+        _default_metrics = Metrics(enabled=enabled, track_memory=setting == "memory")
+    return _default_metrics
+
+
+def set_metrics(metrics: Optional[Metrics]) -> None:
+    """Replace the process-wide instance; ``None`` rebuilds it from the environment."""
+    global _default_metrics
+    _default_metrics = metrics
+
+
+def log_json_to(path: str) -> logging.Handler:
+    """Write the JSON events of the ``itc.metrics`` logger to ``path``, one per line."""
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
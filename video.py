@@ -0,0 +1,318 @@
+"""Run the pipeline on a camera feed or video file, OCRing only when the text changes.
+
+Cleaning and OCR cost far more than a frame interval, so every frame first
+passes two cheap gates on a small grayscale copy:
+
+1. the scene must have settled: after any motion (a hand crossing the
+   board, text being written) nothing happens until ``stable_frames``
+   frames in a row are still, and then only that one frame is examined;
+2. the text region is then located and its difference hash
+   (:func:`dhash`) compared with the region last sent to OCR, so a hand
+   that has left the board again or a lighting change does not trigger
+   OCR either.
+
+Only frames whose text region changed are compiled with
+:func:`pipeline.compile_image`.  In ``realtime`` mode (the default for
+cameras) a capture thread keeps reading and hands over only the newest
+frame, so frames arriving while OCR runs are dropped rather than queued.
+Files are processed frame by frame unless ``realtime`` is requested.
+:class:`StreamStats` reports sustained frames per second and OCR calls per
+minute::
+
+    python video.py 0                      # first camera
+    python video.py lecture.mp4 --realtime
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Iterator, Optional, Union
+
+from ocr.cache import OCRCache
+from ocr.extract_text import OCREngine
+from pipeline import StandInEngine, compile_image
+from utils.image_cleaner import find_text_bbox, to_grayscale
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:  # pragma: no cover - environment might not have deps
+    cv2 = None  # type: ignore
+    np = None  # type: ignore
+
+# Frames are gated on a copy this many pixels wide.
+GATE_WIDTH = 320
+HASH_SIZE = 16
+# A pixel of the small copy "moved" when it changed by more than this many grey levels.
+MOTION_LEVEL = 40
+
+
+def dhash(gray: "np.ndarray", size: int = HASH_SIZE) -> int:
+    """Difference hash of ``gray``: ``size * size`` bits of horizontal gradient signs."""
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+@dataclass
+class FrameResult:
+    """Pipeline record for one OCR'd frame; ``time`` is seconds since the stream started."""
+
+    frame: int
+    time: float
+    expression: Optional[str]
+    value: Any
+    error: Optional[str]
+
+
+class StreamStats:
+    """Frame and OCR counters of a stream; ``summary()`` derives the rates."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.read = 0
+        self.dropped = 0
+        self.processed = 0
+        self.unchanged = 0
+        self.ocr_calls = 0
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def summary(self) -> dict[str, float]:
+        with self._lock:
+            elapsed = max(time.perf_counter() - self.start, 1e-9)
+            return {
+                "elapsed": elapsed,
+                "frames_read": self.read,
+                "frames_dropped": self.dropped,
+                "frames_processed": self.processed,
+                "frames_unchanged": self.unchanged,
+                "ocr_calls": self.ocr_calls,
+                "input_fps": self.read / elapsed,
+                "fps": self.processed / elapsed,
+                "ocr_per_minute": self.ocr_calls * 60.0 / elapsed,
+            }
+
+
+class FrameGate:
+    """Decide whether a frame's text differs from the last OCR'd one.
+
+    A frame counts as still when fewer than ``motion_pixels`` pixels of the
+    small copy changed by more than :data:`MOTION_LEVEL` grey levels since
+    the previous frame.  After any motion the region check runs once, on
+    the frame completing a run of ``stable_frames`` still frames, so text
+    written gradually is examined when it is finished and a hand crossing
+    the board is never OCR'd mid-motion.
+    """
+
+    def __init__(self, *, motion_pixels: int = 4, region_threshold: int = 12,
+                 stable_frames: int = 3) -> None:
+        self.motion_pixels = motion_pixels
+        self.region_threshold = region_threshold
+        self.stable_frames = stable_frames
+        self._previous: Optional["np.ndarray"] = None
+        self._still = 0
+        self._region_hash: Optional[int] = None
+
+    def changed(self, frame: "np.ndarray") -> bool:
+        gray = to_grayscale(frame)
+        scale = GATE_WIDTH / gray.shape[1]
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            self._still = 0
+            return False
+        moved = np.count_nonzero(cv2.absdiff(previous, gray) > MOTION_LEVEL) >= self.motion_pixels
+        self._still = 0 if moved else self._still + 1
+        if self._still != self.stable_frames:
+            return False
+        bbox = find_text_bbox(gray)
+        if bbox is None:
+            return False
+        x, y, w, h = bbox
+        region_hash = dhash(gray[y:y + h, x:x + w])
+        if self._region_hash is not None and hamming(self._region_hash, region_hash) <= self.region_threshold:
+            return False
+        self._region_hash = region_hash
+        return True
+
+
+Source = Union[int, str]
+
+
+class StreamProcessor:
+    """Read frames from ``source`` (camera index or file/URL) and compile changed ones."""
+
+    def __init__(self, source: Source, *, engine: Optional[OCREngine] = None,
+                 cache: Optional[OCRCache] = None, realtime: Optional[bool] = None,
+                 gate: Optional[FrameGate] = None) -> None:
+        if cv2 is None:  # pragma: no cover - dependency not installed
+            raise RuntimeError("OpenCV is required for video mode")
+        self.source = source
+        self.engine = engine
+        self.cache = cache
+        self.realtime = isinstance(source, int) if realtime is None else realtime
+        self.gate = gate or FrameGate()
+        self.stats = StreamStats()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _frames(self, capture: Any) -> Iterator[tuple[int, "np.ndarray"]]:
+        """Yield every frame of ``capture`` in order."""
+        index = 0
+        while not self._stop.is_set():
+            ok, frame = capture.read()
+            if not ok:
+                return
+            self.stats.add(read=1)
+            yield index, frame
+            index += 1
+
+    def _latest(self, capture: Any) -> Iterator[tuple[int, "np.ndarray"]]:
+        """Yield the newest frame whenever the consumer is ready, dropping the rest."""
+        slot: list[Optional[tuple[int, "np.ndarray"]]] = [None]
+        done = threading.Event()
+        ready = threading.Condition()
+        # Files are paced at their frame rate to behave like a live source.
+        fps = capture.get(cv2.CAP_PROP_FPS) if isinstance(self.source, str) else 0
+        interval = 1.0 / fps if fps and fps > 0 else 0.0
+
+        def reader() -> None:
+            next_time = time.perf_counter()
+            try:
+                for item in self._frames(capture):
+                    with ready:
+                        if slot[0] is not None:
+                            self.stats.add(dropped=1)
+                        slot[0] = item
+                        ready.notify()
+                    if interval:
+                        next_time += interval
+                        time.sleep(max(0.0, next_time - time.perf_counter()))
+            finally:
+                with ready:
+                    done.set()
+                    ready.notify()
+
+        thread = threading.Thread(target=reader, name="itc-capture", daemon=True)
+        thread.start()
+        try:
+            while True:
+                with ready:
+                    while slot[0] is None and not done.is_set():
+                        ready.wait()
+                    item, slot[0] = slot[0], None
+                if item is None:
+                    return
+                yield item
+        finally:
+            self._stop.set()
+            thread.join()
+
+    def run(self, *, max_frames: Optional[int] = None,
+            on_result: Optional[Callable[[FrameResult], None]] = None,
+            on_stats: Optional[Callable[[dict[str, float]], None]] = None,
+            stats_interval: float = 0.0) -> list[FrameResult]:
+        """Process the stream until it ends, ``max_frames`` are read or :meth:`stop`.
+
+        ``on_result`` sees each OCR'd frame's record as it is produced;
+        without it the records are collected and returned instead, so an
+        endless feed with a callback keeps no history.  ``on_stats`` receives
+        :meth:`StreamStats.summary` every ``stats_interval`` seconds, checked
+        on every processed frame, whether or not it was OCR'd.
+        """
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            raise RuntimeError(f"Could not open video source {self.source!r}")
+        self._stop.clear()
+        self.stats = StreamStats()
+        results: list[FrameResult] = []
+        emit = on_result or results.append
+        last_report = self.stats.start
+        frames = self._latest(capture) if self.realtime else self._frames(capture)
+        try:
+            for index, frame in frames:
+                self.stats.add(processed=1)
+                if not self.gate.changed(frame):
+                    self.stats.add(unchanged=1)
+                else:
+                    self.stats.add(ocr_calls=1)
+                    record = compile_image(frame, self.engine, self.cache, adaptive=True)
+                    emit(FrameResult(index, time.perf_counter() - self.stats.start,
+                                     record["expression"], record["value"], record["error"]))
+                if on_stats is not None and stats_interval > 0:
+                    now = time.perf_counter()
+                    if now - last_report >= stats_interval:
+                        last_report = now
+                        on_stats(self.stats.summary())
+                if max_frames is not None and index + 1 >= max_frames:
+                    break
+        finally:
+            if hasattr(frames, "close"):
+                frames.close()
+            capture.release()
+        return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser_ = argparse.ArgumentParser(description=__doc__,
+                                      formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser_.add_argument("source", help="camera index or video file / stream URL")
+    parser_.add_argument("--realtime", action="store_true",
+                         help="drop frames that arrive while OCR is busy (always on for cameras)")
+    parser_.add_argument("--max-frames", type=int, help="stop after this many frames")
+    parser_.add_argument("--motion-pixels", type=int, default=4,
+                         help="changed pixels (of the 320 px copy) that count as motion")
+    parser_.add_argument("--stable-frames", type=int, default=3,
+                         help="frames the scene must stay still after a change before OCR")
+    parser_.add_argument("--region-threshold", type=int, default=12,
+                         help="hash bits the text region may differ from the last OCR'd one")
+    parser_.add_argument("--stats-interval", type=float, default=10.0,
+                         help="seconds between rate reports on stderr (0 disables)")
+    parser_.add_argument("--stand-in-ocr", metavar="TEXT",
+                         help="skip Tesseract and 'recognise' TEXT in every frame")
+    args = parser_.parse_args(argv)
+
+    source: Source = int(args.source) if args.source.isdigit() else args.source
+    engine = StandInEngine(args.stand_in_ocr) if args.stand_in_ocr is not None else None
+    processor = StreamProcessor(source, engine=engine, realtime=args.realtime or None,
+                                gate=FrameGate(motion_pixels=args.motion_pixels,
+                                               region_threshold=args.region_threshold,
+                                               stable_frames=args.stable_frames))
+
+    def report(result: FrameResult) -> None:
+        print(json.dumps(asdict(result)), flush=True)
+
+    def report_stats(summary: dict[str, float]) -> None:
+        print(json.dumps(summary), file=sys.stderr, flush=True)
+
+    try:
+        processor.run(max_frames=args.max_frames, on_result=report,
+                      on_stats=report_stats, stats_interval=args.stats_interval)
+    except KeyboardInterrupt:  # pragma: no cover - interactive shutdown
+        pass
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(json.dumps(processor.stats.summary()), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry
+    raise SystemExit(main())